@@ -0,0 +1,199 @@
+"""
+run_benchmarks.py
+---------------------------------------------------
+Time the preprocessing and feature stages on
+synthetic QA data and compare with a saved baseline.
+
+For every stage and size, reports rows/sec and the
+peak RSS while the stage runs. Results are saved to
+results/benchmark_<timestamp>.json; --save-baseline
+stores them as the baseline the next runs compare
+against. Throughput drops and memory growth beyond
+--threshold are flagged, and the exit code is 1.
+Runs offline (NLTK data must be installed locally).
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 10000 100000
+---------------------------------------------------
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+from datetime import datetime
+import pandas as pd
+from benchmarks.synthetic import SyntheticQAGenerator
+from src.data.preprocessing import TextPreprocessor, clean_text, clean_series
+from src.data.implementation_preprocessor import preprocess_dataframe
+from src.features.text_features import TextFeatureExtractor
+from src.utils.config import config
+from src.utils.telemetry import MemorySampler
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMNS = ["question", "context", "answer"]
+SIZES = [10_000, 100_000, 1_000_000]
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "baseline.json")
+# Relative change counted as a regression
+THRESHOLD = 0.2
+# Memory growth below this many MB is never flagged
+MEMORY_FLOOR_MB = 50
+
+
+def _bench_clean_text(df: pd.DataFrame) -> None:
+    for col in TEXT_COLUMNS:
+        for text in df[col]:
+            clean_text(text)
+
+
+def _bench_clean_series(df: pd.DataFrame) -> None:
+    for col in TEXT_COLUMNS:
+        clean_series(df[col])
+
+
+def _bench_preprocess(df: pd.DataFrame) -> None:
+    processor = TextPreprocessor()
+    for col in TEXT_COLUMNS:
+        for text in df[col]:
+            processor.preprocess(text)
+
+
+def _bench_preprocess_dataframe(df: pd.DataFrame) -> None:
+    preprocess_dataframe(df[TEXT_COLUMNS].copy(), TextPreprocessor())
+
+
+def _bench_text_features(df: pd.DataFrame) -> None:
+    extractor = TextFeatureExtractor()
+    for col in TEXT_COLUMNS:
+        extractor.transform(df[[col]].copy(), col)
+
+
+# Stage name -> function processing every text column of a DataFrame
+STAGES = {
+    "clean_text": _bench_clean_text,
+    "clean_series": _bench_clean_series,
+    "preprocess": _bench_preprocess,
+    "preprocess_dataframe": _bench_preprocess_dataframe,
+    "text_features": _bench_text_features,
+}
+
+
+def run_stage(name: str, df: pd.DataFrame) -> dict:
+    """Run one stage on df and measure its throughput and peak memory."""
+    sampler = MemorySampler(interval=0.05)
+    start_mb = sampler.start().peak_mb
+    start = time.perf_counter()
+    STAGES[name](df)
+    elapsed = time.perf_counter() - start
+    peak_mb = sampler.stop()
+    return {
+        "stage": name,
+        "rows": len(df),
+        "seconds": elapsed,
+        "rows_per_sec": len(df) / elapsed if elapsed else float("inf"),
+        "peak_rss_mb": peak_mb,
+        "peak_growth_mb": peak_mb - start_mb,
+    }
+
+
+def run_benchmarks(sizes: list, stages: list, generator: SyntheticQAGenerator) -> list:
+    """Run every stage on synthetic data of every size."""
+    # Load NLTK resources and fill caches outside the timed runs
+    warmup = generator.dataframe(200)
+    for name in stages:
+        STAGES[name](warmup)
+    results = []
+    for size in sizes:
+        logger.info(f"Generating {size} synthetic records...")
+        df = generator.dataframe(size)
+        for name in stages:
+            result = run_stage(name, df)
+            logger.info(f"{name:>20} @ {size:>9,} rows: {result['rows_per_sec']:>12,.0f} rows/s, "
+                        f"peak RSS {result['peak_rss_mb']:.0f} MB")
+            results.append(result)
+    return results
+
+
+def compare(results: list, baseline: dict, threshold: float = THRESHOLD) -> list:
+    """Return a message for every result that regressed against the baseline."""
+    reference = {(r["stage"], r["rows"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        base = reference.get((result["stage"], result["rows"]))
+        if base is None:
+            continue
+        label = f"{result['stage']} @ {result['rows']:,} rows"
+        if result["rows_per_sec"] < base["rows_per_sec"] * (1 - threshold):
+            regressions.append(f"{label}: {result['rows_per_sec']:,.0f} rows/s vs "
+                               f"{base['rows_per_sec']:,.0f} in the baseline")
+        growth = result["peak_growth_mb"] - base["peak_growth_mb"]
+        if growth > MEMORY_FLOOR_MB and result["peak_growth_mb"] > base["peak_growth_mb"] * (1 + threshold):
+            regressions.append(f"{label}: peak memory grew by {result['peak_growth_mb']:.0f} MB vs "
+                               f"{base['peak_growth_mb']:.0f} MB in the baseline")
+    return regressions
+
+
+def _environment() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpu_count": os.cpu_count(), "pandas": pd.__version__}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing and feature stages.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=list(STAGES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--html-density", type=float, default=0.2)
+    parser.add_argument("--duplication-rate", type=float, default=0.3)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    generator = SyntheticQAGenerator(args.seed, args.html_density, args.duplication_rate)
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "environment": _environment(),
+        "generator": generator.params(),
+        "results": run_benchmarks(args.sizes, args.stages, generator),
+    }
+
+    os.makedirs(config.paths["results"], exist_ok=True)
+    path = os.path.join(config.paths["results"], f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    logger.info(f"Results saved to {path}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        logger.info(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        logger.info("No baseline to compare with; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["generator"] != report["generator"]:
+        logger.warning("Baseline was generated with different data parameters; not comparing")
+        return 0
+    if baseline["environment"] != report["environment"]:
+        logger.warning("Baseline was recorded on a different environment; timings may not be comparable")
+    regressions = compare(report["results"], baseline, args.threshold)
+    for message in regressions:
+        logger.warning(f"Regression: {message}")
+    if not regressions:
+        logger.info(f"No regressions beyond {args.threshold:.0%} against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
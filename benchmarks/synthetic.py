@@ -0,0 +1,178 @@
+"""
+synthetic.py
+---------------------------------------------------
+Seeded generator of synthetic QA records with the
+columns of train.json (question, context, answer,
+type), for benchmarks and offline pipeline runs.
+
+Words are drawn from a Zipf-like distribution over
+an English word list plus generated words, so token
+caches and vocabularies behave like on real text.
+    - html_density: share of records whose context
+      and answer contain HTML tags and entities.
+    - duplication_rate: share of records reusing the
+      context paragraph of an earlier record, as
+      several questions are asked about one passage.
+The same arguments always produce the same records.
+---------------------------------------------------
+"""
+
+import json
+import random
+import argparse
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+LABELS = ["factual", "definition", "reasoning", "comparison", "procedural"]
+QUESTION_WORDS = ["What", "Why", "How", "When", "Where", "Which", "Who"]
+# Common words, with inflected forms so that lemmatization has work to do
+ENGLISH_WORDS = (
+    "the of and to in is was for on that with as by at from it be are were this "
+    "which or an has had have not but its their been they city cities country countries "
+    "river rivers running ran runs studies studied student students history historical "
+    "government governments population people children women men year years century "
+    "centuries war wars king kings church churches building buildings music songs "
+    "company companies system systems water energy process processes region regions "
+    "language languages species animals plants called known used including became "
+    "between during after before many most first largest located north south east west"
+).split()
+HTML_TAGS = ["p", "b", "i", "em", "strong", "span", "li", "h2"]
+HTML_ENTITIES = ["&amp;", "&quot;", "&lt;", "&gt;", "&#39;", "&nbsp;"]
+SYLLABLES = ["ka", "lo", "mi", "ren", "tor", "sa", "vel", "qui", "dor", "an", "bel", "cas"]
+VOCABULARY_SIZE = 20_000
+# Records generated at a time
+BATCH_SIZE = 10_000
+
+
+def _vocabulary(rng: random.Random, size: int) -> np.ndarray:
+    """English words followed by generated words, most frequent first."""
+    words = list(ENGLISH_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return np.array(words, dtype=object)
+
+
+class SyntheticQAGenerator:
+    """
+    Generate reproducible synthetic QA records.
+
+    Attributes:
+        seed (int): Random seed.
+        html_density (float): Share of records with HTML markup.
+        duplication_rate (float): Share of records reusing an earlier context.
+        context_words (int): Mean number of words of a context paragraph.
+    """
+
+    def __init__(self, seed: int = 42, html_density: float = 0.2,
+                 duplication_rate: float = 0.3, context_words: int = 80):
+        if not 0 <= html_density <= 1 or not 0 <= duplication_rate <= 1:
+            raise ValueError("html_density and duplication_rate must be between 0 and 1")
+        self.seed = seed
+        self.html_density = html_density
+        self.duplication_rate = duplication_rate
+        self.context_words = context_words
+
+    def params(self) -> dict:
+        return {"seed": self.seed, "html_density": self.html_density,
+                "duplication_rate": self.duplication_rate, "context_words": self.context_words}
+
+    def records(self, n: int) -> Iterator[dict]:
+        """Yield n records; the first k records do not depend on n."""
+        # numpy draws in bulk, random for the few per-record choices
+        rng = np.random.default_rng(self.seed)
+        scalar_rng = random.Random(self.seed)
+        vocabulary = _vocabulary(scalar_rng, VOCABULARY_SIZE)
+        ranks = np.arange(1, len(vocabulary) + 1)
+        weights = 1.0 / ranks ** 1.1
+        weights /= weights.sum()
+        contexts = []
+        for start in range(0, n, BATCH_SIZE):
+            # Random draws for a whole batch at once
+            lengths = rng.poisson(self.context_words, BATCH_SIZE) + 5
+            words = vocabulary[rng.choice(len(vocabulary), size=int(lengths.sum()) + 20 * BATCH_SIZE,
+                                          p=weights)].tolist()
+            sentence_lengths = iter(rng.integers(6, 20, int(lengths.sum())).tolist())
+            lengths = lengths.tolist()
+            html = (rng.random(BATCH_SIZE) < self.html_density).tolist()
+            duplicate = (rng.random(BATCH_SIZE) < self.duplication_rate).tolist()
+            picks = rng.random(BATCH_SIZE).tolist()
+            question_words = rng.integers(0, len(QUESTION_WORDS), BATCH_SIZE).tolist()
+            answer_lengths = rng.integers(1, 12, BATCH_SIZE).tolist()
+            labels = rng.integers(0, len(LABELS), BATCH_SIZE).tolist()
+            position = 0
+            for i in range(min(BATCH_SIZE, n - start)):
+                if contexts and duplicate[i]:
+                    context = contexts[int(picks[i] * len(contexts))]
+                else:
+                    context = self._paragraph(scalar_rng, words[position:position + lengths[i]],
+                                              sentence_lengths, html[i])
+                    position += lengths[i]
+                    # Keep a bounded pool of passages to reuse
+                    if len(contexts) < 10_000:
+                        contexts.append(context)
+                    else:
+                        contexts[int(picks[i] * len(contexts))] = context
+                answer = " ".join(words[position + 8:position + 8 + answer_lengths[i]])
+                yield {
+                    "question": f"{QUESTION_WORDS[question_words[i]]} {' '.join(words[position:position + 8])}?",
+                    "context": context,
+                    "answer": self._markup(scalar_rng, answer) if html[i] else answer,
+                    "type": LABELS[labels[i]],
+                }
+                position += 20
+
+    def dataframe(self, n: int) -> pd.DataFrame:
+        """Return n records as a DataFrame."""
+        return pd.DataFrame(self.records(n), columns=["question", "context", "answer", "type"])
+
+    def write_jsonl(self, path: str, n: int) -> None:
+        """Write n records as JSON lines, like data/raw/train.json."""
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records(n):
+                f.write(json.dumps(record) + "\n")
+
+    def _paragraph(self, rng: random.Random, words: list, sentence_lengths, html: bool) -> str:
+        """Join words into capitalized sentences, optionally with markup."""
+        sentences = []
+        start = 0
+        while start < len(words):
+            end = start + next(sentence_lengths)
+            sentence = " ".join(words[start:end])
+            sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+            start = end
+        if rng.random() < 0.05:
+            sentences.append(f"See https://example.org/{words[0]} for details.")
+        text = " ".join(sentences)
+        return self._markup(rng, text) if html else text
+
+    def _markup(self, rng: random.Random, text: str) -> str:
+        """Wrap some words of a text in tags and insert entities."""
+        tokens = text.split(" ")
+        for i in rng.choices(range(len(tokens)), k=max(1, len(tokens) // 10)):
+            if rng.random() < 0.3:
+                tokens[i] = f"{tokens[i]} {rng.choice(HTML_ENTITIES)}"
+            else:
+                tag = rng.choice(HTML_TAGS)
+                tokens[i] = f"<{tag}>{tokens[i]}</{tag}>"
+        return f"<div>{' '.join(tokens)}</div>"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic QA dataset as JSON lines.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--html-density", type=float, default=0.2)
+    parser.add_argument("--duplication-rate", type=float, default=0.3)
+    args = parser.parse_args()
+    generator = SyntheticQAGenerator(args.seed, args.html_density, args.duplication_rate)
+    generator.write_jsonl(args.output, args.rows)
+
+
+if __name__ == "__main__":
+    main()
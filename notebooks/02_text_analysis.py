@@ -1,23 +1,18 @@
+import sys
 import pandas as pd
 from pathlib import Path
 import re
-import json
 from nltk.corpus import stopwords
-from collections import Counter
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
-from sklearn.feature_extraction.text import CountVectorizer
 
-# Define the path to the training data JSON file
-train_path = Path("../data/raw/train.json")
-
-# Load the training data from JSON file
-with open(train_path, 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# Make the project modules importable from the notebooks directory
+sys.path.append(str(Path("..").resolve()))
+from src.data.data_loader import iter_training_chunks
+from src.features.corpus_stats import compute_corpus_stats
 
-# Convert the loaded data into a pandas DataFrame for EDA
-# This DataFrame will be used for text analysis and visualization
-df = pd.DataFrame(data)
+# Define the path to the training data JSON file (JSON lines, as in 01_eda.py)
+train_path = Path("../data/raw/train.json")
 
 # Prepare stopwords set for text cleaning
 stop_words = set(stopwords.words('english'))
@@ -38,40 +33,57 @@ def clean_text(text):
     return ' '.join(cleaned_words)
 
 
-# Apply text cleaning to the 'context' column
-# This creates a new column 'clean_text' with the processed text
-df['clean_text'] = df['context'].apply(clean_text)
+def count_sentences(text):
+    """
+    Counts the number of sentences in the text using period as a separator.
+    """
+    return len([s for s in re.split(r'[.!?]', text) if s.strip()])
+
+
+def count_words(text):
+    """
+    Counts the number of words in the text.
+    """
+    return len(text.split())
+
 
+# Sentence and word counts of every context; only these small columns are kept
+context_counts = []
 
-def vocab_stats(texts):
+
+def clean_chunks(chunks):
     """
-    Calculates vocabulary statistics:
-    - vocab_size: number of unique words
-    - total_words: total number of words
-    - diversity: ratio of unique words to total words
+    Adds the 'clean_text' column to each chunk of the training data and
+    records the sentence and word counts of its contexts.
     """
-    words = [word for text in texts for word in text.split()]
-    vocab_size = len(set(words))
-    total_words = len(words)
-    diversity = vocab_size / total_words if total_words > 0 else 0
-    return vocab_size, total_words, diversity
+    for chunk in chunks:
+        chunk['clean_text'] = chunk['context'].apply(clean_text)
+        context_counts.append(pd.DataFrame({
+            'sentence_count': chunk['context'].apply(count_sentences),
+            'word_count': chunk['context'].apply(count_words),
+        }))
+        yield chunk
+
 
+# Stream the training data chunk by chunk and compute vocabulary statistics
+# and top n-grams of every label in one pass, so memory stays bounded
+# (bounded sketches; pass exact=True for exact counts)
+chunks = iter_training_chunks(train_path, chunk_rows=100_000)
+corpus_stats = compute_corpus_stats(clean_chunks(chunks), 'clean_text', 'type', ngram_range=(1, 3))
 
 # Print vocabulary statistics for each label in 'type'
 # This helps to understand the lexical diversity of each class
-for label in df['type'].unique():
-    label_texts = df[df['type'] == label]['clean_text']
-    vocab_size, total_words, diversity = vocab_stats(label_texts)
+for label, row in corpus_stats.summary().iterrows():
     print(f"Label: {label}")
-    print(f"  Vocabulary size: {vocab_size}")
-    print(f"  Total words: {total_words}")
-    print(f"  Diversity: {diversity:.3f}")
+    print(f"  Vocabulary size: {row['vocab_size']}")
+    print(f"  Total words: {row['total_tokens']}")
+    print(f"  Diversity: {row['diversity']:.3f}")
 
 # Generate and save word clouds for each label
 # Word clouds visually represent the most frequent words for each class
-for label in df['type'].unique():
-    text = ' '.join(df[df['type'] == label]['clean_text'])
-    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
+for label in corpus_stats.labels:
+    frequencies = dict(corpus_stats.top_ngrams(1, 200, label=label))
+    wordcloud = WordCloud(width=800, height=400, background_color='white').generate_from_frequencies(frequencies)
     plt.figure(figsize=(10, 5))
     plt.imshow(wordcloud, interpolation='bilinear')
     plt.axis('off')
@@ -83,11 +95,7 @@ for label in df['type'].unique():
 # Generate and save top n-gram bar plots
 #  show the most frequent n-grams (1, 2, and 3 words) in the dataset
 for n in [1, 2, 3]:
-    vectorizer = CountVectorizer(ngram_range=(n, n), stop_words='english')
-    X = vectorizer.fit_transform(df['clean_text'])
-    sum_words = X.sum(axis=0)
-    words_freq = [(word, sum_words[0, idx]) for word, idx in vectorizer.vocabulary_.items()]
-    words_freq = sorted(words_freq, key=lambda x: x[1], reverse=True)[:10]
+    words_freq = corpus_stats.top_ngrams(n, 10)
     plt.figure(figsize=(10, 5))
     words, freqs = zip(*words_freq)
     plt.bar(words, freqs, color='skyblue')
@@ -103,30 +111,9 @@ for n in [1, 2, 3]:
 
 
 # Calculate sentence and word statistics for each context
-# This adds columns for sentence count, word count, and average sentence length
-
-def count_sentences(text):
-    """
-    Counts the number of sentences in the text using period as a separator.
-    """
-    return len([s for s in re.split(r'[.!?]', text) if s.strip()])
-
-
-def count_words(text):
-    """
-    Counts the number of words in the text.
-    """
-    return len(text.split())
-
-
-# Apply the functions to create new columns
-# These columns will be used for EDA summary statistics
-
-df['sentence_count'] = df['context'].apply(count_sentences)
-df['word_count'] = df['context'].apply(count_words)
-df['avg_sentence_length'] = df.apply(
-    lambda row: row['word_count'] / row['sentence_count'] if row['sentence_count'] > 0 else 0, axis=1)
+# avg_sentence_length is derived from the counts collected while streaming
+df = pd.concat(context_counts, ignore_index=True)
+df['avg_sentence_length'] = (df['word_count'] / df['sentence_count']).where(df['sentence_count'] > 0, 0)
 
 print("Sentence and word count statistics (first 5 rows):")
 print(df[['sentence_count', 'word_count', 'avg_sentence_length']].head())
-
@@ -0,0 +1,102 @@
+"""
+compare_tokenizers.py
+---------------------------------------------------
+Compare the tokenizer backends against NLTK on a
+sample of the training data: throughput and how
+closely each backend reproduces NLTK's tokens, on
+raw text and on clean_text output.
+Writes reports/tokenizer_comparison_results.md.
+---------------------------------------------------
+"""
+
+import os
+import time
+import argparse
+import logging
+from collections import Counter
+import pandas as pd
+from src.data.data_loader import iter_training_chunks
+from src.data.preprocessing import clean_series
+from src.data.tokenizers import TOKENIZERS, get_tokenizer
+from src.utils.config import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TEXT_COLUMNS = ["question", "context", "answer"]
+
+
+def load_sample(path: str, rows: int) -> pd.Series:
+    """Return the text columns of the first rows of a JSON lines file as one Series."""
+    chunk = next(iter_training_chunks(path, chunk_rows=rows))
+    columns = [col for col in TEXT_COLUMNS if col in chunk.columns]
+    return pd.concat([chunk[col] for col in columns], ignore_index=True).dropna().astype(str)
+
+
+def _token_f1(expected: list, actual: list) -> float:
+    """F1 of the token multisets of two tokenizations."""
+    if not expected and not actual:
+        return 1.0
+    overlap = sum((Counter(expected) & Counter(actual)).values())
+    if overlap == 0:
+        return 0.0
+    precision, recall = overlap / len(actual), overlap / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _to_markdown(df: pd.DataFrame) -> str:
+    """Format a DataFrame as a markdown table."""
+    header = "| " + " | ".join(df.columns) + " |"
+    separator = "|" + "|".join("---" for _ in df.columns) + "|"
+    lines = [
+        "| " + " | ".join(f"{v:,.3f}" if isinstance(v, float) else str(v) for v in row) + " |"
+        for row in df.itertuples(index=False)
+    ]
+    return "\n".join([header, separator, *lines])
+
+
+def compare(texts: list) -> pd.DataFrame:
+    """Measure every backend on texts, using NLTK as the reference."""
+    tokenized = {}
+    rows = []
+    for name in TOKENIZERS:
+        tokenizer = get_tokenizer(name)
+        start = time.perf_counter()
+        tokenized[name] = [tokenizer.words(text) for text in texts]
+        elapsed = time.perf_counter() - start
+        n_tokens = sum(len(tokens) for tokens in tokenized[name])
+        rows.append({
+            "tokenizer": name,
+            "texts_per_sec": len(texts) / elapsed if elapsed else float("inf"),
+            "tokens_per_sec": n_tokens / elapsed if elapsed else float("inf"),
+        })
+    reference = tokenized["nltk"]
+    for row in rows:
+        tokens = tokenized[row["tokenizer"]]
+        row["exact_match"] = sum(a == b for a, b in zip(reference, tokens)) / len(texts)
+        row["token_f1"] = sum(_token_f1(a, b) for a, b in zip(reference, tokens)) / len(texts)
+        row["count_abs_error"] = sum(abs(len(a) - len(b)) for a, b in zip(reference, tokens)) / len(texts)
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare tokenizer backends.")
+    parser.add_argument("--input", default=os.path.join(config.paths["raw_data"], "train.json"))
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--output", default=os.path.join(config.paths["reports"], "tokenizer_comparison_results.md"))
+    args = parser.parse_args()
+
+    raw = load_sample(args.input, args.rows)
+    sections = []
+    for label, texts in [("raw text", raw), ("clean_text output", clean_series(raw))]:
+        logger.info(f"Comparing tokenizers on {len(texts)} {label} samples...")
+        results = compare(texts.tolist())
+        sections.append(f"## {label}\n\n{_to_markdown(results)}\n")
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(f"# Tokenizer comparison\n\nSample: first {args.rows} rows of `{args.input}`\n\n")
+        f.write("\n".join(sections))
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
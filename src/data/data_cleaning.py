@@ -1,33 +1,60 @@
 import pandas as pd
 import logging
-from pathlib import Path
+from src.utils.helpers import get_artifact_store, save_artifact_chunks
 
 logging.basicConfig(level=logging.INFO)
 
-def main():
-    data_path = Path("data/processed/train_clean.csv")
-    output_path = Path("data/processed/train_no_nulls.csv")
+# Columnas críticas para mantener datos válidos
+CRITICAL_COLS = ["question_clean", "type_clean", "answer_clean", "context_clean"]
+# Número de filas leídas por bloque
+CHUNK_ROWS = 200_000
 
-    logging.info(f"Loading dataset from {data_path}")
-    df = pd.read_csv(data_path)
 
-    logging.info(f"Initial shape: {df.shape}")
+def clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Drop rows with nulls in the critical columns and cast them to str.
+    Empty strings count as nulls, as they did when the input was a CSV file.
+    Columns already stored as category or string keep their dtype.
+    """
+    # Eliminar filas con nulos (o texto vacío) en columnas importantes
+    critical = df[CRITICAL_COLS]
+    valid = critical.notna().all(axis=1) & (critical != "").all(axis=1)
+    df_clean = df[valid].copy()
 
-    # Columnas críticas para mantener datos válidos
-    critical_cols = ["question_clean", "type_clean", "answer_clean", "context_clean"]
+    # Reemplazar posibles no-string por string vacío o str conversion
+    # Las columnas compactas (category, string[pyarrow]) conservan su tipo
+    for col in CRITICAL_COLS:
+        if not isinstance(df_clean[col].dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            df_clean[col] = df_clean[col].astype(str)
 
-    # Eliminar filas con nulos en columnas importantes
-    df_clean = df.dropna(subset=critical_cols)
+    return df_clean
 
-    # Reemplazar posibles no-string por string vacío o str conversion
-    for col in critical_cols:
-        df_clean[col] = df_clean[col].astype(str)
 
-    logging.info(f"Final shape after cleaning: {df_clean.shape}")
+def main():
+    store = get_artifact_store("processed_data")
+    input_name = "train_clean"
+    output_name = "train_no_nulls"
+
+    logging.info(f"Streaming dataset from {store.path(input_name)}")
+    initial_rows = 0
+
+    def cleaned_chunks():
+        nonlocal initial_rows
+        for chunk in store.iter_chunks(input_name, CHUNK_ROWS):
+            initial_rows += len(chunk)
+            yield clean_chunk(chunk)
 
     # Guardar dataset limpio
-    df_clean.to_csv(output_path, index=False)
-    logging.info(f"Cleaned dataset saved at {output_path}")
+    final_rows = save_artifact_chunks(store, cleaned_chunks(), output_name)
+    # Same text columns as the input, so same preprocessing settings
+    metadata = store.read_metadata(input_name)
+    if metadata is not None:
+        store.write_metadata(output_name, metadata)
+
+    logging.info(f"Initial rows: {initial_rows}")
+    logging.info(f"Final rows after cleaning: {final_rows}")
+    logging.info(f"Cleaned dataset saved at {store.path(output_name)}")
+    return initial_rows
 
 if __name__ == "__main__":
     main()
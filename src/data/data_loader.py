@@ -6,11 +6,33 @@ integrity for the project.
 
 import os
 import json
+import random
+import logging
+import numpy as np
 import pandas as pd
-from typing import Tuple, Dict, Any
+from dataclasses import dataclass, field, asdict
+from typing import Tuple, Dict, Any, Iterator, Iterable, List
 from src.utils.config import Config
 
+# orjson is an optional, faster drop-in for json.loads
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 config = Config()
+logger = logging.getLogger(__name__)
+# Parser used for JSON lines; both accept the raw bytes of a line
+_json_loads = orjson.loads if orjson is not None else json.loads
+# Default number of rows per streamed chunk
+CHUNK_ROWS = 100_000
+# Label columns stored as category by optimize_dtypes
+LABEL_COLUMNS = ["type", "type_clean"]
+# Compact, pyarrow-backed dtype for text columns
+TEXT_DTYPE = "string[pyarrow]"
+# Constants combining column hashes into row fingerprints
+_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
 # Check if a file exists at the given path
 # Raises FileNotFoundError if the file does not exist
 def _validate_file_exists(filepath: str ) -> None:
@@ -35,21 +57,377 @@ def _check_dtypes(df: pd.DataFrame, expected_dtypes: Dict[str, Any]) -> None:
 # Check for missing values and duplicate rows in a DataFrame
 # Raises ValueError if any are found
 def _check_integrity(df: pd.DataFrame) -> None:
-    if df.isnull().sum().sum() > 0:
+    report = DataValidator().validate(df)
+    if report.null_counts:
         raise ValueError("DataFrame contains missing values")
-    if df.duplicated().sum() > 0:
+    if report.duplicate_rows:
         raise ValueError("DataFrame contains duplicate rows")
 
-# Load and validate training data from a JSON file
-# Checks file existence, loads data, and validates integrity
-def load_training_data(path):
-    """Load and validate training data from a JSON file."""
-    data = []
-    with open(path, "r", encoding="utf-8") as f:
+# Hash every row of a DataFrame into one 64-bit fingerprint
+# Equal rows get equal fingerprints; collisions are negligible below billions of rows.
+# Text is hashed with Python's built-in str hash, several times faster than
+# pd.util.hash_pandas_object on long strings but only stable within one process.
+def row_fingerprints(df: pd.DataFrame) -> np.ndarray:
+    fingerprints = np.full(len(df), len(df.columns), dtype=np.uint64)
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            hashes = pd.util.hash_array(series.to_numpy())
+        else:
+            values = series.to_numpy(dtype=object)
+            hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values)).view(np.uint64)
+            # NaN hashes by identity, so every missing value gets the same hash
+            hashes[pd.isna(values)] = _NULL_HASH
+        fingerprints = fingerprints * _HASH_MULTIPLIER ^ hashes
+    return fingerprints
+
+@dataclass
+class ValidationReport:
+    """
+    Result of validating a dataset chunk by chunk.
+
+    Attributes:
+        rows (int): Number of rows checked.
+        sampled (bool): Whether only a sample of the rows was checked.
+        missing_columns (list): Expected columns absent from the data.
+        dtype_errors (dict): Column -> {'expected', 'actual'} dtypes.
+        null_counts (dict): Column -> number of missing values (only columns with any).
+        duplicate_rows (int): Rows equal to an earlier row.
+        samples (dict): Problem kind -> a few offending rows, with their row index.
+    """
+    rows: int = 0
+    sampled: bool = False
+    missing_columns: List[str] = field(default_factory=list)
+    dtype_errors: Dict[str, dict] = field(default_factory=dict)
+    null_counts: Dict[str, int] = field(default_factory=dict)
+    duplicate_rows: int = 0
+    samples: Dict[str, list] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing_columns or self.dtype_errors or self.null_counts or self.duplicate_rows)
+
+    def to_dict(self) -> dict:
+        return {"ok": self.ok, **asdict(self)}
+
+    def raise_for_errors(self) -> None:
+        """Raise the error of the first kind of problem found, like the _check functions."""
+        if self.missing_columns:
+            raise ValueError(f"DataFrame is missing columns: {set(self.missing_columns)}")
+        for col, error in self.dtype_errors.items():
+            raise TypeError(f"Column '{col}' has incorrect dtype: expected {error['expected']}, "
+                            f"got {error['actual']}")
+        if self.null_counts:
+            raise ValueError(f"DataFrame contains missing values: {self.null_counts}")
+        if self.duplicate_rows:
+            raise ValueError(f"DataFrame contains {self.duplicate_rows} duplicate rows")
+
+
+class DataValidator:
+    """
+    Validate a dataset chunk by chunk, collecting every problem in a ValidationReport.
+
+    Duplicates are found across chunks by keeping a sorted array of row
+    fingerprints (8 bytes per distinct row) instead of the rows themselves.
+
+    Attributes:
+        expected_columns (list): Columns that must be present.
+        expected_dtypes (dict): Column -> expected dtype.
+        check_duplicates (bool): Whether to look for duplicate rows.
+        max_samples (int): Offending rows kept per kind of problem.
+        max_text_length (int): Length at which sampled text values are cut.
+    """
+
+    def __init__(self, expected_columns: list = None, expected_dtypes: Dict[str, Any] = None,
+                 check_duplicates: bool = True, max_samples: int = 5, max_text_length: int = 80):
+        self.expected_columns = expected_columns or []
+        self.expected_dtypes = expected_dtypes or {}
+        self.check_duplicates = check_duplicates
+        self.max_samples = max_samples
+        self.max_text_length = max_text_length
+        self._report = ValidationReport()
+        self._seen = np.empty(0, dtype=np.uint64)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Check one chunk and add its problems to the report."""
+        report = self._report
+        first = report.rows == 0
+        report.rows += len(chunk)
+        if first:
+            report.missing_columns = [c for c in self.expected_columns if c not in chunk.columns]
+        for col, dtype in self.expected_dtypes.items():
+            if col in chunk.columns and col not in report.dtype_errors \
+                    and not pd.api.types.is_dtype_equal(chunk[col].dtype, dtype):
+                report.dtype_errors[col] = {"expected": str(dtype), "actual": str(chunk[col].dtype)}
+
+        nulls = chunk.isna()
+        for col, count in nulls.sum().items():
+            if count:
+                report.null_counts[col] = report.null_counts.get(col, 0) + int(count)
+        self._add_samples("nulls", chunk[nulls.any(axis=1)])
+
+        if self.check_duplicates and len(chunk):
+            fingerprints = row_fingerprints(chunk)
+            # Rows repeating an earlier row of this chunk or of a previous one
+            positions = np.searchsorted(self._seen, fingerprints)
+            in_seen = positions < len(self._seen)
+            in_seen[in_seen] = self._seen[positions[in_seen]] == fingerprints[in_seen]
+            duplicated = pd.Series(fingerprints).duplicated().to_numpy() | in_seen
+            report.duplicate_rows += int(duplicated.sum())
+            self._add_samples("duplicates", chunk[duplicated])
+            new = np.unique(fingerprints[~duplicated])
+            self._seen = np.insert(self._seen, np.searchsorted(self._seen, new), new)
+
+    def watch(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Validate chunks as they are streamed through, yielding them unchanged."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    def validate(self, df: pd.DataFrame) -> ValidationReport:
+        """Check a whole DataFrame and return the report."""
+        self.update(df)
+        return self.report()
+
+    def report(self) -> ValidationReport:
+        return self._report
+
+    def _add_samples(self, kind: str, rows: pd.DataFrame) -> None:
+        samples = self._report.samples.setdefault(kind, [])
+        for index, row in rows.head(self.max_samples - len(samples)).iterrows():
+            sample = {"row": index}
+            for col, value in row.items():
+                if isinstance(value, str) and len(value) > self.max_text_length:
+                    value = value[:self.max_text_length] + "..."
+                sample[col] = None if pd.isna(value) else value
+            samples.append(sample)
+        if not samples:
+            del self._report.samples[kind]
+
+# Build one chunk from parsed rows, keeping a global row index
+def _rows_to_frame(rows: list, offset, dtypes: Dict[str, Any] = None) -> pd.DataFrame:
+    index = pd.RangeIndex(offset, offset + len(rows)) if isinstance(offset, int) else offset
+    df = pd.DataFrame(rows, index=index)
+    if dtypes:
+        df = df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+    return df
+
+# Return the memory used by a DataFrame, including the strings it holds, in MB
+def memory_usage_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+# Find the smallest dtype that holds the values of a numeric column exactly
+# Integral floats become integers; other floats become float32
+def smallest_numeric_dtype(values) -> np.dtype:
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        finite = np.isfinite(values).all()
+        if not (finite and values.size and np.array_equal(values, np.round(values))):
+            return np.dtype(np.float32)
+    if values.size == 0:
+        return np.dtype(np.int8)
+    low, high = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return values.dtype
+
+# Convert columns to compact dtypes to reduce memory
+# Labels become category, text becomes string[pyarrow], numbers are downcast
+def optimize_dtypes(df: pd.DataFrame, label_columns: list = None,
+                    numeric_dtypes: Dict[str, Any] = None,
+                    categories: Dict[str, list] = None) -> pd.DataFrame:
+    """
+    Return df with compact dtypes and log its memory before and after.
+
+    Args:
+        df (pd.DataFrame): Data to convert.
+        label_columns (list): Columns to store as category (default: LABEL_COLUMNS).
+        numeric_dtypes (dict): Dtypes to use for numeric columns instead of
+            the smallest one for df, so that all the chunks of a dataset get
+            the same dtypes (see smallest_numeric_dtype).
+        categories (dict): Categories of label columns, for the same reason;
+            values outside them would become NaN (see scan_dtypes).
+    """
+    label_columns = LABEL_COLUMNS if label_columns is None else label_columns
+    numeric_dtypes = numeric_dtypes or {}
+    categories = categories or {}
+    before = memory_usage_mb(df)
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if col in label_columns:
+            if col in categories:
+                dtype = pd.CategoricalDtype(categories[col])
+                if series.dtype != dtype:
+                    converted[col] = series.astype(dtype)
+            elif not isinstance(series.dtype, pd.CategoricalDtype):
+                converted[col] = series.astype("category")
+        elif col in numeric_dtypes:
+            converted[col] = series.astype(numeric_dtypes[col])
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            dtype = smallest_numeric_dtype(series.to_numpy())
+            if dtype != series.dtype:
+                converted[col] = series.astype(dtype)
+        elif pd.api.types.is_string_dtype(series.dtype) and pd.api.types.infer_dtype(series) in ("string", "empty"):
+            converted[col] = series.astype(TEXT_DTYPE)
+    df = df.assign(**converted) if converted else df
+    after = memory_usage_mb(df)
+    logger.info(f"optimize_dtypes: {before:.1f} MB -> {after:.1f} MB "
+                f"({len(converted)} columns converted)")
+    return df
+
+# Find the dtypes optimize_dtypes should give every chunk of a dataset
+# Each chunk is seen once; only column ranges and label values are kept
+def scan_dtypes(chunks: Iterable[pd.DataFrame], label_columns: list = None) -> Tuple[dict, dict]:
+    """
+    Return (numeric_dtypes, categories) holding the values of all chunks.
+
+    Passing them to optimize_dtypes gives every chunk the same schema, which
+    the Parquet store requires: a column downcast to int8 in one chunk cannot
+    hold 500 in the next.
+    """
+    label_columns = LABEL_COLUMNS if label_columns is None else label_columns
+    ranges, values = {}, {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            series = chunk[col]
+            if col in label_columns:
+                values.setdefault(col, set()).update(series.dropna().unique())
+            elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+                array = series.to_numpy()
+                low, high, is_float = ranges.get(col, (None, None, False))
+                if smallest_numeric_dtype(array).kind == "f":
+                    is_float = True
+                elif array.size:
+                    low = array.min() if low is None else min(low, array.min())
+                    high = array.max() if high is None else max(high, array.max())
+                ranges[col] = (low, high, is_float)
+    numeric_dtypes = {
+        col: np.dtype(np.float32) if is_float else smallest_numeric_dtype(np.array([] if low is None else [low, high]))
+        for col, (low, high, is_float) in ranges.items()
+    }
+    categories = {col: sorted(found) for col, found in values.items()}
+    return numeric_dtypes, categories
+
+# Stream training data from a JSON lines file in fixed-size chunks
+# Only one chunk of parsed rows is held in memory at a time
+def iter_training_chunks(path, chunk_rows: int = CHUNK_ROWS,
+                         dtypes: Dict[str, Any] = None,
+                         start_byte: int = 0, start_row: int = 0,
+                         sample_fraction: float = None, seed: int = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield the training data as DataFrames of at most chunk_rows rows.
+
+    Args:
+        path: Path to a JSON lines file.
+        chunk_rows (int): Maximum number of rows per chunk.
+        dtypes (dict): Optional column -> dtype mapping applied to every chunk.
+        start_byte (int): Byte offset of the first line to read, used to
+            read only lines appended since a previous run.
+        start_row (int): Index of the first row read.
+        sample_fraction (float): If set, parse only this random fraction of
+            the lines; rows keep their index in the file.
+        seed (int): Seed of the sample (default: config random seed).
+    """
+    _validate_file_exists(path)
+    if sample_fraction is not None:
+        yield from _iter_sampled_chunks(path, chunk_rows, dtypes, start_byte, start_row,
+                                        sample_fraction, seed)
+        return
+    rows = []
+    offset = start_row
+    with open(path, "rb") as f:
+        f.seek(start_byte)
         for line in f:
+            if not line.strip():
+                continue
+            rows.append(_json_loads(line))
+            if len(rows) >= chunk_rows:
+                yield _rows_to_frame(rows, offset, dtypes)
+                offset += len(rows)
+                rows = []
+    if rows:
+        yield _rows_to_frame(rows, offset, dtypes)
+
+# Stream the raw lines of a JSON lines file in chunks, with their byte range
+# Lines are not parsed, so the parsing can happen in worker processes
+def iter_line_chunks(path, chunk_rows: int = CHUNK_ROWS, start_byte: int = 0) -> Iterator[Tuple[int, int, list]]:
+    """
+    Yield (start byte, end byte, lines) for chunks of at most chunk_rows non-empty lines.
+
+    The end byte of a chunk is the start byte of the next one, so a job
+    interrupted after a chunk can resume from it with start_byte.
+    """
+    _validate_file_exists(path)
+    lines = []
+    with open(path, "rb") as f:
+        f.seek(start_byte)
+        position = chunk_start = start_byte
+        for line in f:
+            position += len(line)
             if line.strip():
-                data.append(json.loads(line))
-    return pd.DataFrame(data)
+                lines.append(line)
+            if len(lines) >= chunk_rows:
+                yield chunk_start, position, lines
+                chunk_start, lines = position, []
+    if lines:
+        yield chunk_start, position, lines
+
+# Stream a random sample of the lines of a JSON lines file
+# Skipped lines are never parsed, which is where most of the load time goes
+def _iter_sampled_chunks(path, chunk_rows: int, dtypes: Dict[str, Any], start_byte: int,
+                         start_row: int, sample_fraction: float, seed: int = None) -> Iterator[pd.DataFrame]:
+    rng = random.Random(config.constants["random_seed"] if seed is None else seed)
+    rows, index = [], []
+    row = start_row
+    with open(path, "rb") as f:
+        f.seek(start_byte)
+        for line in f:
+            if not line.strip():
+                continue
+            if rng.random() < sample_fraction:
+                rows.append(_json_loads(line))
+                index.append(row)
+                if len(rows) >= chunk_rows:
+                    yield _rows_to_frame(rows, pd.Index(index), dtypes)
+                    rows, index = [], []
+            row += 1
+    if rows:
+        yield _rows_to_frame(rows, pd.Index(index), dtypes)
+
+# Validate a JSON lines file chunk by chunk without loading it whole
+# With sample_fraction, only a random sample of the rows is checked (preflight)
+def validate_training_data(path, expected_columns: list = None,
+                           expected_dtypes: Dict[str, Any] = None,
+                           chunk_rows: int = CHUNK_ROWS, sample_fraction: float = None,
+                           seed: int = None) -> ValidationReport:
+    """
+    Check schema, dtypes, missing values and duplicate rows of a training file.
+
+    Returns:
+        ValidationReport: Counts of every problem with sample offending rows.
+    """
+    validator = DataValidator(expected_columns, expected_dtypes)
+    for chunk in iter_training_chunks(path, chunk_rows=chunk_rows,
+                                      sample_fraction=sample_fraction, seed=seed):
+        validator.update(chunk)
+    report = validator.report()
+    report.sampled = sample_fraction is not None
+    logger.info(f"Validated {report.rows} rows of {path}: "
+                f"{'ok' if report.ok else json.dumps(report.to_dict(), default=str)}")
+    return report
+
+# Load and validate training data from a JSON file
+# Checks file existence, loads data, and validates integrity
+def load_training_data(path, chunk_rows: int = CHUNK_ROWS, optimize: bool = False):
+    """Load training data from a JSON file; optimize=True applies optimize_dtypes."""
+    chunks = list(iter_training_chunks(path, chunk_rows=chunk_rows))
+    df = pd.concat(chunks) if chunks else pd.DataFrame()
+    return optimize_dtypes(df) if optimize else df
 
 
 # Load and validate test data from a JSON file
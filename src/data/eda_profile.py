@@ -0,0 +1,319 @@
+"""
+eda_profile.py
+---------------------------------------------------
+Streaming EDA profile of the raw QA data.
+
+The data is read chunk by chunk (optionally a
+random sample of its lines) and summarized in
+bounded memory:
+    - null counts and duplicate rows (DataValidator),
+    - distinct values per column (k-minimum-values),
+    - word length distribution of the text columns,
+      kept as an exact integer histogram, from which
+      the quantiles are read,
+    - label balance,
+    - a reservoir sample of rows for the plots.
+
+Writes reports/eda_summary.csv, reports/label_balance.csv
+and figures in reports/figures/.
+
+Usage:
+    python -m src.data.eda_profile --sample-fraction 0.1
+---------------------------------------------------
+"""
+
+import os
+import logging
+import argparse
+from collections import Counter
+import numpy as np
+import pandas as pd
+from src.data.data_loader import DataValidator, iter_training_chunks
+from src.features.corpus_stats import DistinctCounter
+from src.utils.config import config
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+INPUT_PATH = os.path.join(config.paths["raw_data"], "train.json")
+TEXT_COLUMNS = ["context", "question", "answer"]
+LABEL_COLUMN = "type"
+CHUNK_ROWS = 100_000
+# Rows kept by the reservoir sample used for the plots
+SAMPLE_SIZE = 10_000
+# Hashes kept per column to estimate the number of distinct values
+DISTINCT_K = 4096
+QUANTILES = (0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def word_lengths(texts: pd.Series) -> np.ndarray:
+    """Number of whitespace-separated words of every text; -1 for missing values."""
+    return np.fromiter((len(text.split()) if isinstance(text, str) else -1 for text in texts),
+                       dtype=np.int64, count=len(texts))
+
+
+class LengthHistogram:
+    """
+    Exact distribution of non-negative integer lengths.
+
+    Memory is one counter per distinct length up to the longest one, so
+    quantiles are exact without keeping the values.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, lengths: np.ndarray) -> None:
+        counts = np.bincount(lengths[lengths >= 0])
+        if len(counts) > len(self.counts):
+            counts[:len(self.counts)] += self.counts
+            self.counts = counts
+        else:
+            self.counts[:len(counts)] += counts
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def quantile(self, q: float) -> float:
+        """Return the q-quantile (lower value, like numpy's 'lower' method)."""
+        if self.count == 0:
+            return float("nan")
+        cumulative = np.cumsum(self.counts)
+        return float(np.searchsorted(cumulative, q * (self.count - 1), side="right"))
+
+    def summary(self) -> dict:
+        if self.count == 0:
+            return {}
+        values = np.arange(len(self.counts))
+        mean = float((values * self.counts).sum() / self.count)
+        std = float(np.sqrt((self.counts * (values - mean) ** 2).sum() / self.count))
+        summary = {"length_mean": mean, "length_std": std,
+                   "length_min": float(np.flatnonzero(self.counts)[0])}
+        for q in QUANTILES:
+            summary[f"length_p{int(q * 100)}"] = self.quantile(q)
+        summary["length_max"] = float(len(self.counts) - 1)
+        return summary
+
+
+class ReservoirSample:
+    """
+    Uniform random sample of a fixed number of rows of a stream (algorithm R).
+
+    Attributes:
+        size (int): Rows kept.
+        seen (int): Rows offered so far.
+        frame (pd.DataFrame): The sampled rows (in no particular order).
+    """
+
+    def __init__(self, size: int = SAMPLE_SIZE, seed: int = None):
+        self.size = size
+        self.seen = 0
+        self.frame = None
+        self._rng = np.random.default_rng(config.constants["random_seed"] if seed is None else seed)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        chunk = chunk.reset_index(drop=True)
+        if self.frame is None or len(self.frame) < self.size:
+            take = self.size - (0 if self.frame is None else len(self.frame))
+            head = chunk.iloc[:take]
+            self.frame = head.copy() if self.frame is None else pd.concat([self.frame, head], ignore_index=True)
+            self.seen += len(head)
+            chunk = chunk.iloc[take:]
+        if len(chunk) == 0:
+            return
+        # Row i of the stream replaces slot j ~ U[0, i] when j < size
+        positions = self.seen + np.arange(len(chunk))
+        slots = self._rng.integers(0, positions + 1)
+        kept = np.flatnonzero(slots < self.size)
+        # When several rows draw the same slot, the last one wins
+        last = pd.Series(kept, index=slots[kept]).groupby(level=0).last()
+        slots, rows = last.index.to_numpy(), last.to_numpy()
+        for j, col in enumerate(self.frame.columns):
+            self.frame.iloc[slots, j] = chunk[col].to_numpy()[rows]
+        self.seen += len(chunk)
+
+
+class EDAProfiler:
+    """
+    Chunk-by-chunk EDA statistics of a dataset.
+
+    Attributes:
+        text_columns (list): Columns whose word lengths are profiled.
+        label_column (str): Column whose balance is counted.
+        validator (DataValidator): Null counts and duplicate rows.
+        lengths (dict): Text column -> LengthHistogram.
+        distinct (dict): Column -> DistinctCounter.
+        labels (Counter): Rows per label.
+        sample (ReservoirSample): Rows (lengths and label) kept for plots.
+    """
+
+    def __init__(self, text_columns: list = None, label_column: str = LABEL_COLUMN,
+                 sample_size: int = SAMPLE_SIZE, seed: int = None, check_duplicates: bool = True):
+        self.text_columns = text_columns or TEXT_COLUMNS
+        self.label_column = label_column
+        self.validator = DataValidator(check_duplicates=check_duplicates)
+        self.lengths = {col: LengthHistogram() for col in self.text_columns}
+        self.distinct = {}
+        self.labels = Counter()
+        self.sample = ReservoirSample(sample_size, seed)
+        self.columns = []
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Add one chunk to the statistics."""
+        self.validator.update(chunk)
+        for col in chunk.columns:
+            if col not in self.distinct:
+                self.columns.append(col)
+                self.distinct[col] = DistinctCounter(DISTINCT_K)
+            values = chunk[col].dropna()
+            self.distinct[col].update(values.astype(str).to_numpy(dtype=object))
+        sample = {}
+        for col in self.text_columns:
+            if col in chunk.columns:
+                lengths = word_lengths(chunk[col])
+                self.lengths[col].update(lengths)
+                sample[f"{col}_length"] = lengths
+        if self.label_column in chunk.columns:
+            self.labels.update(chunk[self.label_column].dropna().astype(str))
+            sample[self.label_column] = chunk[self.label_column].to_numpy(dtype=object)
+        self.sample.update(pd.DataFrame(sample))
+
+    def profile(self, chunks) -> "EDAProfiler":
+        """Add every chunk of an iterable."""
+        for chunk in chunks:
+            self.update(chunk)
+            logger.info(f"Profiled {self.rows} rows")
+        return self
+
+    @property
+    def rows(self) -> int:
+        return self.validator.report().rows
+
+    def summary(self) -> pd.DataFrame:
+        """One row per column: nulls, distinct values and, for text columns, length statistics."""
+        report = self.validator.report()
+        records = []
+        for col in self.columns:
+            nulls = report.null_counts.get(col, 0)
+            record = {
+                "column": col,
+                "count": report.rows - nulls,
+                "nulls": nulls,
+                "null_pct": 100 * nulls / report.rows if report.rows else 0.0,
+                # The estimate can exceed the number of values by its error
+                "distinct": min(int(round(self.distinct[col].count())), report.rows - nulls),
+            }
+            if col in self.lengths:
+                record.update(self.lengths[col].summary())
+            records.append(record)
+        summary = pd.DataFrame(records)
+        summary.insert(1, "rows", report.rows)
+        summary.insert(2, "duplicate_rows", report.duplicate_rows)
+        return summary
+
+    def label_balance(self) -> pd.DataFrame:
+        counts = pd.Series(self.labels, name="count", dtype=np.int64).sort_values(ascending=False)
+        return pd.DataFrame({"count": counts, "share": counts / counts.sum()}).rename_axis(self.label_column)
+
+    def save(self, reports_dir: str = None) -> dict:
+        """Write the summary CSVs and figures; return their paths."""
+        reports_dir = reports_dir or config.paths["reports"]
+        figures_dir = os.path.join(reports_dir, "figures")
+        os.makedirs(figures_dir, exist_ok=True)
+        paths = {
+            "summary": os.path.join(reports_dir, "eda_summary.csv"),
+            "label_balance": os.path.join(reports_dir, "label_balance.csv"),
+            "length_distributions": os.path.join(figures_dir, "length_distributions.png"),
+            "missing_values": os.path.join(figures_dir, "missing_values.png"),
+            "label_distribution": os.path.join(figures_dir, "label_distribution.png"),
+            "lengths_by_label": os.path.join(figures_dir, "lengths_by_label.png"),
+        }
+        self.summary().to_csv(paths["summary"], index=False)
+        self.label_balance().to_csv(paths["label_balance"])
+        self._plot_lengths(paths["length_distributions"])
+        self._plot_missing(paths["missing_values"])
+        self._plot_labels(paths["label_distribution"])
+        self._plot_lengths_by_label(paths["lengths_by_label"])
+        logger.info(f"EDA summary saved to {paths['summary']}, figures to {figures_dir}")
+        return paths
+
+    # Figures use matplotlib's object API, so no pyplot state or display is needed
+    def _plot_lengths(self, path: str) -> None:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=(18, 5))
+        axes = fig.subplots(1, len(self.text_columns), squeeze=False)[0]
+        for ax, col in zip(axes, self.text_columns):
+            histogram = self.lengths[col]
+            if histogram.count:
+                # Lengths beyond the 99th percentile are left out, as extreme values
+                limit = int(histogram.quantile(0.99)) + 1
+                ax.bar(np.arange(limit), histogram.counts[:limit], width=1.0, color="#66b3ff")
+            ax.set_title(f"{col.capitalize()} Length Distribution", fontsize=12, weight="bold")
+            ax.set_xlabel(f"Number of Words in {col.capitalize()}")
+            ax.set_ylabel("Frequency")
+        fig.tight_layout()
+        fig.savefig(path)
+
+    def _plot_missing(self, path: str) -> None:
+        from matplotlib.figure import Figure
+        summary = self.summary()
+        fig = Figure(figsize=(10, 5))
+        ax = fig.subplots()
+        ax.bar(summary["column"], summary["null_pct"], color="#ff9966")
+        ax.set_title("Missing Values per Column", fontsize=12, weight="bold")
+        ax.set_ylabel("Missing (%)")
+        ax.tick_params(axis="x", rotation=45)
+        fig.tight_layout()
+        fig.savefig(path)
+
+    def _plot_labels(self, path: str) -> None:
+        from matplotlib.figure import Figure
+        balance = self.label_balance()
+        fig = Figure(figsize=(8, 6))
+        ax = fig.subplots()
+        ax.bar(balance.index.astype(str), balance["count"], color="#99cc00")
+        ax.set_title("Class Distribution", fontsize=12, weight="bold")
+        ax.set_xlabel("Classes")
+        ax.set_ylabel("Count")
+        fig.tight_layout()
+        fig.savefig(path)
+
+    def _plot_lengths_by_label(self, path: str) -> None:
+        from matplotlib.figure import Figure
+        sample = self.sample.frame
+        fig = Figure(figsize=(18, 5))
+        axes = fig.subplots(1, len(self.text_columns), squeeze=False)[0]
+        if sample is not None and self.label_column in sample.columns:
+            labels = sorted(sample[self.label_column].dropna().unique())
+            for ax, col in zip(axes, self.text_columns):
+                lengths = [sample.loc[(sample[self.label_column] == label)
+                                      & (sample[f"{col}_length"] >= 0), f"{col}_length"].astype(int)
+                           for label in labels]
+                ax.boxplot(lengths, tick_labels=labels, showfliers=False)
+                ax.set_title(f"{col.capitalize()} Length by Label (sample of {len(sample)})")
+                ax.set_ylabel("Number of Words")
+        fig.tight_layout()
+        fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the raw training data chunk by chunk.")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--sample-fraction", type=float, default=None,
+                        help="Profile only this random fraction of the rows.")
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE,
+                        help="Rows kept for the per-label plots.")
+    parser.add_argument("--reports-dir", default=config.paths["reports"])
+    args = parser.parse_args()
+
+    chunks = iter_training_chunks(args.input, chunk_rows=args.chunk_rows,
+                                  sample_fraction=args.sample_fraction)
+    profiler = EDAProfiler(sample_size=args.sample_size).profile(chunks)
+    profiler.save(args.reports_dir)
+    print(profiler.summary().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
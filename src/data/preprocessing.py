@@ -1,78 +1,343 @@
 import re
 import string
 import logging
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer, PorterStemmer
-from nltk.tokenize import word_tokenize
-from bs4 import BeautifulSoup
-from src.utils.helpers import timer
+import html
+from collections import OrderedDict
+from dataclasses import asdict
+from functools import lru_cache
+from html.entities import html5
+import pandas as pd
+from src.utils.helpers import timer, load_json, save_json
+from src.utils.config import config, TextConfig
+from src.data.tokenizers import get_tokenizer
 
 
-lemmatizer = WordNetLemmatizer()
-stemmer = PorterStemmer()
-stop_words = set(stopwords.words('english'))
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns shared by the single-text and batch cleaners.
+# URL removal and special-character removal are merged into one pass:
+# URLs start with a letter, so the alternation removes exactly what
+# remove_urls followed by remove_special_characters removes.
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+SPECIAL_CHARACTER_PATTERN = re.compile(r'[^a-zA-Z\s]')
+URL_AND_SPECIAL_PATTERN = re.compile(r'http\S+|www\S+|[^a-zA-Z\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+# Only rows containing a tag or an entity can be changed by remove_html
+HTML_MARKER_PATTERN = re.compile(r'[<&]')
+# Markup the fast HTML path understands: plain tags with optional
+# attributes and named entities. Any other '<' or '&' is matched by the
+# last alternative and sends the text to BeautifulSoup.
+HTML_TOKEN_PATTERN = re.compile(
+    r'(?P<tag></?(?P<name>[a-zA-Z][a-zA-Z0-9]*)'
+    r'(?:\s+[^\s"\'<>/=]+(?:\s*=\s*(?:"[^"<>]*"|\'[^\'<>]*\'|[^\s"\'<>=`]+))?)*\s*/?>)'
+    r'|(?P<entity>&[a-zA-Z][a-zA-Z0-9]*;)'
+    r'|[<&]'
+)
+SIMPLE_TAG_PATTERN = re.compile(r'<[^>]*>')
+# Tags whose content the HTML parser treats as raw text
+RAW_TEXT_TAGS = {
+    'script', 'style', 'textarea', 'title', 'xmp', 'iframe',
+    'noembed', 'noframes', 'noscript', 'plaintext', 'pre',
+}
+# Elements html.parser closes as soon as they open. BeautifulSoup then
+# ignores one later '</name>' per '<name>', which does not end the text
+# node, so the text around it stays a single node.
+VOID_TAGS = {
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr',
+}
+# BeautifulSoup replaces text nodes made only of these characters
+# with '\n' (if they contain one) or a single space
+HTML_ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+# NLTK resources are loaded on first use and cached per process,
+# so importing this module (e.g. in workers or tests) stays cheap
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    """Return the process-wide WordNet lemmatizer."""
+    from nltk.stem import WordNetLemmatizer
+    return WordNetLemmatizer()
+
+@lru_cache(maxsize=None)
+def get_stemmer():
+    """Return the process-wide Porter stemmer."""
+    from nltk.stem import PorterStemmer
+    return PorterStemmer()
+
+@lru_cache(maxsize=None)
+def get_stop_words() -> frozenset:
+    """Return the English stopword set."""
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
 @timer
-def clean_text(text: str) -> str:
+def clean_text(text: str, html_strategy: str = None) -> str:
     """"Full cleaning pipeline for text data."""
     text = text.lower()
-    text = remove_html(text)
-    text = remove_urls(text)
-    text = remove_special_characters(text)
-    text = remove_extra_whitespace(text)
-    return text
+    text = remove_html(text, html_strategy)
+    text = URL_AND_SPECIAL_PATTERN.sub('', text)
+    return remove_extra_whitespace(text)
+
+@timer
+def clean_series(texts: pd.Series, html_strategy: str = None) -> pd.Series:
+    """Batch version of clean_text applied to a whole Series at once."""
+    # Object dtype keeps Python's str/re semantics (Unicode-aware \s,
+    # str.lower, str.strip) so the result matches clean_text row by row
+    texts = texts.astype(object).str.lower()
+    has_html = texts.str.contains(HTML_MARKER_PATTERN, na=False)
+    if has_html.any():
+        texts = texts.copy()
+        texts[has_html] = texts[has_html].map(lambda text: remove_html(text, html_strategy))
+    texts = texts.str.replace(URL_AND_SPECIAL_PATTERN, '', regex=True)
+    texts = texts.str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+    return texts.str.strip()
 
 def remove_special_characters(text: str) -> str:
     """Remove special characters and punctuation from a text."""
-    return re.sub(r'[^a-zA-Z\s]', '', text)
+    return SPECIAL_CHARACTER_PATTERN.sub('', text)
+
+def remove_html(text: str, strategy: str = None) -> str:
+    """
+    Remove HTML tags from a text.
+
+    Strategies (default: config.text.html_strategy):
+        'auto': skip text without markup, strip simple tags and named
+            entities directly, and use BeautifulSoup for anything else.
+            The output is identical to 'bs4'.
+        'bs4': always parse the text with BeautifulSoup.
+        'regex': drop anything between '<' and '>' and unescape entities.
+            Fastest, but does not reproduce BeautifulSoup on malformed markup.
+    """
+    strategy = strategy or config.text.html_strategy
+    if strategy == 'bs4':
+        return _remove_html_bs4(text)
+    if strategy == 'regex':
+        return html.unescape(SIMPLE_TAG_PATTERN.sub('', text))
+    if strategy != 'auto':
+        raise ValueError(f"Unknown HTML strategy: {strategy}")
+    if '<' not in text and '&' not in text:
+        return _collapse_blank_node(text)
+    stripped = _remove_simple_html(text)
+    return stripped if stripped is not None else _remove_html_bs4(text)
 
-def remove_html(text: str) -> str:
-    """Remove HTML tags from a text."""
+def _remove_html_bs4(text: str) -> str:
+    """Remove HTML tags by building a BeautifulSoup tree."""
+    from bs4 import BeautifulSoup
     return BeautifulSoup(text, "html.parser").get_text()
 
+def _remove_simple_html(text: str):
+    """
+    Strip plain tags and decode named entities without a parser.
+    Returns None when the text contains markup that needs BeautifulSoup.
+    """
+    nodes = []
+    node = []
+    # Void elements opened as '<name>', whose next '</name>' is ignored
+    closed_void = []
+    position = 0
+    for match in HTML_TOKEN_PATTERN.finditer(text):
+        node.append(text[position:match.start()])
+        position = match.end()
+        if match.group('tag'):
+            name = match.group('name').lower()
+            if name in RAW_TEXT_TAGS:
+                return None
+            tag = match.group('tag')
+            if tag.startswith('</'):
+                if name in closed_void:
+                    closed_void.remove(name)
+                    continue
+            elif name in VOID_TAGS and not tag.endswith('/>'):
+                closed_void.append(name)
+            nodes.append(_collapse_blank_node(''.join(node)))
+            node = []
+        elif match.group('entity'):
+            replacement = html5.get(match.group('entity')[1:])
+            if replacement is None:
+                return None
+            node.append(replacement)
+        else:
+            return None
+    node.append(text[position:])
+    nodes.append(_collapse_blank_node(''.join(node)))
+    return ''.join(nodes)
+
+def _collapse_blank_node(node: str) -> str:
+    """Collapse a whitespace-only text node the way BeautifulSoup does."""
+    if not node or node.strip(HTML_ASCII_SPACES):
+        return node
+    return '\n' if '\n' in node else ' '
+
 def remove_urls(text: str) -> str:
     """Remove URLs from a text."""
-    return re.sub(r'http\S+|www\S+', '', text)
+    return URL_PATTERN.sub('', text)
 
 def remove_extra_whitespace(text: str) -> str:
     """Normalize whitespace in a text."""
-    return re.sub(r'\s+', ' ', text).strip()
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
 
 
-def tokenize_text(text: str):
-    """Split text into tokens(words)."""
-    return word_tokenize(text)
+def tokenize_text(text: str, tokenizer: str = None):
+    """Split text into tokens(words) with the configured tokenizer backend."""
+    return get_tokenizer(tokenizer).words(text)
 
 def remove_stopwords(tokens: list[str]) -> list[str]:
     """Remove stopwords from a list of tokens."""
+    stop_words = get_stop_words()
     return [word for word in tokens if word not in stop_words]
 
-def lemmatize_tokens(tokens: list[str]) -> list[str]:
-    """Lemmatize a list of tokens."""
-    return [lemmatizer.lemmatize(token) for token in tokens]
+def lemmatize_tokens(tokens: list[str], cache: "TokenCache" = None) -> list[str]:
+    """Lemmatize a list of tokens, optionally through a TokenCache."""
+    lemmatize = get_lemmatizer().lemmatize
+    if cache is None:
+        return [lemmatize(token) for token in tokens]
+    return [cache.get(token, lemmatize) for token in tokens]
+
+def stem_tokens(tokens: list[str], cache: "TokenCache" = None) -> list[str]:
+    """Apply stemming (reduce to a root form), optionally through a TokenCache."""
+    stem = get_stemmer().stem
+    if cache is None:
+        return [stem(token) for token in tokens]
+    return [cache.get(token, stem) for token in tokens]
+
+
+class TokenCache:
+    """
+    Bounded LRU cache mapping a token to its normalized form.
+
+    Attributes:
+        name (str): Normalization the entries belong to ('lemma' or 'stem').
+        maxsize (int): Maximum number of entries kept.
+        hits, misses, evictions (int): Usage counters.
+    """
 
-def stem_tokens(tokens: list[str]) -> list[str]:
-    """Apply stemming (reduce to a root form)."""
-    return [stemmer.stem(word) for token in tokens]
+    def __init__(self, maxsize: int, name: str):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # New entries recorded for the parent process when running in a worker
+        self._new_entries = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str, normalize) -> str:
+        """Return the cached form of token, computing it with normalize on a miss."""
+        try:
+            value = self._entries[token]
+        except KeyError:
+            self.misses += 1
+            value = normalize(token)
+            self._store(token, value)
+            if self._new_entries is not None:
+                self._new_entries.append((token, value))
+            return value
+        self.hits += 1
+        self._entries.move_to_end(token)
+        return value
+
+    def _store(self, token: str, value: str) -> None:
+        """Insert an entry and evict the least recently used ones."""
+        if self.maxsize <= 0:
+            return
+        self._entries[token] = value
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return usage counters and the hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def track_new_entries(self) -> None:
+        """Start recording entries added by misses (see pop_updates)."""
+        self._new_entries = []
+
+    def pop_updates(self) -> dict:
+        """Return entries and counters gathered since the last call, then reset them."""
+        updates = {
+            "entries": self._new_entries or [],
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+        self._new_entries = []
+        self.hits = self.misses = self.evictions = 0
+        return updates
+
+    def merge(self, updates: dict) -> None:
+        """Add entries and counters returned by pop_updates in another process."""
+        for token, value in updates["entries"]:
+            self._store(token, value)
+        self.evictions += updates["evictions"]
+        self.hits += updates["hits"]
+        self.misses += updates["misses"]
+
+    def save(self, path) -> None:
+        """Save the entries to a JSON file, least recently used first."""
+        save_json({"name": self.name, "entries": dict(self._entries)}, path)
+
+    def load(self, path) -> None:
+        """Pre-warm the cache with entries saved by a previous run."""
+        data = load_json(path)
+        if data["name"] != self.name:
+            raise ValueError(f"Token cache at {path} holds '{data['name']}' entries, expected '{self.name}'")
+        for token, value in data["entries"].items():
+            self._store(token, value)
 
 
 class TextPreprocessor:
-    """Pipeline for text preprocessing."""
+    """
+    Pipeline for text preprocessing.
+
+    Settings not passed explicitly come from text_config (default:
+    config.text), which also picks the HTML strategy and the tokenizer.
+    """
+
+    def __init__(self, use_stopwords=None, use_stemming=None, cache_size=None,
+                 text_config: TextConfig = None):
+        self.text_config = text_config or config.text
+        self.use_stopwords = self.text_config.use_stopwords if use_stopwords is None else use_stopwords
+        self.use_stemming = self.text_config.use_stemming if use_stemming is None else use_stemming
+        if cache_size is None:
+            cache_size = self.text_config.token_cache_size
+        self.token_cache = TokenCache(cache_size, name='stem' if self.use_stemming else 'lemma')
 
-    def __init__(self, use_stopwords=True, use_stemming=False):
-        self.use_stopwords = use_stopwords
-        self.use_stemming = use_stemming
+    def settings(self) -> dict:
+        """Return the settings that decide the output, as a TextConfig dict."""
+        return {**asdict(self.text_config), "use_stopwords": self.use_stopwords,
+                "use_stemming": self.use_stemming}
 
     @timer
     def preprocess(self, text: str) -> str:
         """Apply all text cleaning and normalization steps."""
-        text = clean_text(text)
-        tokens = tokenize_text(text)
+        return self._normalize(clean_text(text, self.text_config.html_strategy))
+
+    @timer
+    def preprocess_series(self, texts: pd.Series) -> pd.Series:
+        """Apply all preprocessing steps to a whole Series of texts."""
+        return clean_series(texts, self.text_config.html_strategy).map(self._normalize)
+
+    def _normalize(self, text: str) -> str:
+        """Tokenize a cleaned text and normalize its tokens."""
+        tokens = tokenize_text(text, self.text_config.tokenizer)
         if self.use_stopwords:
             tokens = remove_stopwords(tokens)
         if self.use_stemming:
-            tokens = stem_tokens(tokens)
+            tokens = stem_tokens(tokens, self.token_cache)
         else:
-            tokens = lemmatize_tokens(tokens)
+            tokens = lemmatize_tokens(tokens, self.token_cache)
         return ' '.join(tokens)
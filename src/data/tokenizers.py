@@ -0,0 +1,102 @@
+"""
+tokenizers.py
+Registry of word/sentence tokenizer backends.
+
+The backend used by preprocessing and text features is selected with
+config.text.tokenizer:
+    - 'nltk': NLTK's Punkt sentence splitter + Treebank word tokenizer.
+    - 'regex': precompiled regular expressions, close to NLTK on raw text.
+    - 'whitespace': str.split for words, fastest; exact on cleaned text
+      except for the contractions NLTK splits (see
+      reports/tokenizer_comparison.md).
+"""
+
+import re
+from abc import ABC, abstractmethod
+from src.utils.config import config
+
+# Registered tokenizer classes by name
+TOKENIZERS = {}
+# One instance per backend and process
+_instances = {}
+
+# Words (with an optional apostrophe suffix) or single punctuation marks
+WORD_PATTERN = re.compile(r"\w+(?:'\w+)?|[^\w\s]")
+# Sentence boundary: whitespace after ., ! or ?
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def register_tokenizer(name: str):
+    """Class decorator adding a tokenizer backend to the registry."""
+    def decorator(cls):
+        cls.name = name
+        TOKENIZERS[name] = cls
+        return cls
+    return decorator
+
+
+def get_tokenizer(name: str = None) -> "Tokenizer":
+    """Return the tokenizer registered under name (default: config.text.tokenizer)."""
+    name = name or config.text.tokenizer
+    if name not in _instances:
+        if name not in TOKENIZERS:
+            raise ValueError(f"Unknown tokenizer: {name}. Available: {sorted(TOKENIZERS)}")
+        _instances[name] = TOKENIZERS[name]()
+    return _instances[name]
+
+
+class Tokenizer(ABC):
+    """Base class of tokenizer backends; subclasses must implement words."""
+
+    name = None
+
+    @abstractmethod
+    def words(self, text: str) -> list:
+        """Split a text into word tokens."""
+
+    def sentences(self, text: str) -> list:
+        """Split a text into sentences."""
+        return [s for s in SENTENCE_BOUNDARY_PATTERN.split(text.strip()) if s]
+
+    def counts(self, text: str) -> tuple:
+        """Return the number of words and of sentences of a text."""
+        return len(self.words(text)), len(self.sentences(text))
+
+
+@register_tokenizer("nltk")
+class NLTKTokenizer(Tokenizer):
+    """NLTK word_tokenize / sent_tokenize."""
+
+    def __init__(self):
+        from nltk.tokenize import NLTKWordTokenizer
+        # Word tokenizer applied by word_tokenize to each sentence
+        self._word_tokenizer = NLTKWordTokenizer()
+
+    def words(self, text: str) -> list:
+        from nltk.tokenize import word_tokenize
+        return word_tokenize(text)
+
+    def sentences(self, text: str) -> list:
+        from nltk.tokenize import sent_tokenize
+        return sent_tokenize(text)
+
+    def counts(self, text: str) -> tuple:
+        # word_tokenize tokenizes the output of sent_tokenize: split once
+        sentences = self.sentences(text)
+        return sum(len(self._word_tokenizer.tokenize(s)) for s in sentences), len(sentences)
+
+
+@register_tokenizer("regex")
+class RegexTokenizer(Tokenizer):
+    """Precompiled regular expressions for words and sentence boundaries."""
+
+    def words(self, text: str) -> list:
+        return WORD_PATTERN.findall(text)
+
+
+@register_tokenizer("whitespace")
+class WhitespaceTokenizer(Tokenizer):
+    """Whitespace-separated words."""
+
+    def words(self, text: str) -> list:
+        return text.split()
@@ -0,0 +1,234 @@
+"""
+corpus_stats.py
+Per-label corpus statistics in one streaming pass.
+
+For every label, CorpusStats counts documents and tokens, estimates
+the vocabulary size (hence the lexical diversity, vocabulary / tokens)
+and keeps the most frequent n-grams for each n in ngram_range. Texts
+are expected to be cleaned already (e.g. the *_clean columns): tokens
+are split on whitespace.
+
+Memory is bounded by two mergeable sketches:
+    - HeavyHitters: Misra-Gries summary of at most `capacity` n-grams.
+      Counts are lower bounds, off by at most `error`
+      (<= tokens / (capacity + 1)), and any n-gram more frequent than
+      that is kept.
+    - DistinctCounter: k-minimum-values estimate of the number of
+      distinct tokens, with a relative error of about 1 / sqrt(k).
+Both have an exact mode (capacity / k = None) that keeps every n-gram
+or token, for small corpora and tests.
+"""
+
+import logging
+from collections import Counter
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Default n-gram sizes, number of top n-grams reported and sketch sizes
+NGRAM_RANGE = (1, 3)
+TOP_K = 10
+CAPACITY = 10_000
+DISTINCT_K = 65_536
+# Rows per update when computing the statistics of a DataFrame
+CHUNK_ROWS = 50_000
+_HASH_SPACE = float(2 ** 64)
+
+
+class HeavyHitters:
+    """
+    Most frequent items of a stream in bounded memory (Misra-Gries summary).
+
+    Attributes:
+        capacity (int): Items kept after pruning; None keeps all (exact counts).
+        counts (dict): Item -> count, a lower bound of its frequency.
+        error (int): Upper bound of the undercount of any item.
+        total (int): Number of items seen.
+    """
+
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.error = 0
+        self.total = 0
+
+    def update(self, items) -> None:
+        """Add an iterable of items, or a mapping of item -> count."""
+        if not isinstance(items, Counter):
+            items = Counter(items)
+        self.total += sum(items.values())
+        self.counts.update(items)
+        # Prune at twice the capacity, so the cost is amortized over many updates
+        if self.capacity is not None and len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def merge(self, other: "HeavyHitters") -> None:
+        """Absorb the summary of another stream."""
+        self.counts.update(other.counts)
+        self.error += other.error
+        self.total += other.total
+        if self.capacity is not None and len(self.counts) > self.capacity:
+            self._prune()
+
+    def _prune(self) -> None:
+        # Subtract the (capacity + 1)-th largest count from every item and
+        # drop those left at zero, so at most capacity items remain
+        values = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        threshold = int(np.partition(values, -(self.capacity + 1))[-(self.capacity + 1)])
+        self.counts = Counter({item: count - threshold for item, count in self.counts.items()
+                               if count > threshold})
+        self.error += threshold
+
+    def most_common(self, k: int = None) -> list:
+        """Return the k most frequent items as (item, count) pairs."""
+        return self.counts.most_common(k)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class DistinctCounter:
+    """
+    Number of distinct tokens of a stream (k-minimum-values sketch).
+
+    Tokens are hashed to 64 bits; the k smallest distinct hashes are kept
+    and the count is estimated from the k-th smallest one.
+
+    Attributes:
+        k (int): Hashes kept; None keeps all of them (exact count).
+        hashes (np.ndarray): Sorted smallest distinct hashes.
+    """
+
+    def __init__(self, k: int = DISTINCT_K):
+        self.k = k
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, tokens) -> None:
+        """Add a sequence of tokens."""
+        tokens = np.asarray(tokens, dtype=object)
+        if len(tokens):
+            self._add(pd.util.hash_array(tokens))
+
+    def merge(self, other: "DistinctCounter") -> None:
+        self._add(other.hashes)
+
+    def _add(self, hashes: np.ndarray) -> None:
+        # np.unique sorts and removes duplicates
+        hashes = np.unique(np.concatenate([self.hashes, hashes]))
+        self.hashes = hashes if self.k is None else hashes[:self.k]
+
+    def count(self) -> float:
+        """Return the (estimated) number of distinct tokens."""
+        if self.k is None or len(self.hashes) < self.k:
+            return float(len(self.hashes))
+        return (self.k - 1) / ((float(self.hashes[-1]) + 1) / _HASH_SPACE)
+
+
+class LabelStats:
+    """Token, vocabulary and n-gram statistics of the texts of one label."""
+
+    def __init__(self, ngram_range: tuple = NGRAM_RANGE, capacity: int = CAPACITY,
+                 distinct_k: int = DISTINCT_K):
+        self.documents = 0
+        self.tokens = 0
+        self.vocabulary = DistinctCounter(distinct_k)
+        self.ngrams = {n: HeavyHitters(capacity) for n in range(ngram_range[0], ngram_range[1] + 1)}
+
+    def update(self, texts) -> None:
+        """Add a batch of whitespace-tokenized texts."""
+        documents = [text.split() for text in texts]
+        tokens = [token for words in documents for token in words]
+        self.documents += len(documents)
+        self.tokens += len(tokens)
+        self.vocabulary.update(tokens)
+        for n, hitters in self.ngrams.items():
+            if n == 1:
+                hitters.update(tokens)
+            else:
+                hitters.update(" ".join(words[i:i + n])
+                               for words in documents for i in range(len(words) - n + 1))
+
+    def merge(self, other: "LabelStats") -> None:
+        self.documents += other.documents
+        self.tokens += other.tokens
+        self.vocabulary.merge(other.vocabulary)
+        for n, hitters in self.ngrams.items():
+            hitters.merge(other.ngrams[n])
+
+    def summary(self) -> dict:
+        vocab_size = self.vocabulary.count()
+        return {
+            "documents": self.documents,
+            "total_tokens": self.tokens,
+            "vocab_size": int(round(vocab_size)),
+            "diversity": vocab_size / self.tokens if self.tokens else 0.0,
+        }
+
+
+class CorpusStats:
+    """
+    Streaming per-label corpus statistics.
+
+    Attributes:
+        ngram_range (tuple): Smallest and largest n-gram size.
+        capacity (int): HeavyHitters capacity per label and n (None: exact).
+        distinct_k (int): DistinctCounter size per label (None: exact).
+        labels (dict): Label -> LabelStats.
+    """
+
+    def __init__(self, ngram_range: tuple = NGRAM_RANGE, capacity: int = CAPACITY,
+                 distinct_k: int = DISTINCT_K, exact: bool = False):
+        self.ngram_range = ngram_range
+        self.capacity = None if exact else capacity
+        self.distinct_k = None if exact else distinct_k
+        self.labels = {}
+
+    def _new_stats(self) -> LabelStats:
+        return LabelStats(self.ngram_range, self.capacity, self.distinct_k)
+
+    def update(self, texts: pd.Series, labels: pd.Series) -> "CorpusStats":
+        """Add a chunk of texts with their labels (one groupby, no per-label filtering)."""
+        texts = pd.Series(texts).fillna("").astype(object)
+        for label, group in texts.groupby(np.asarray(labels, dtype=object), sort=False):
+            if label not in self.labels:
+                self.labels[label] = self._new_stats()
+            self.labels[label].update(group)
+        return self
+
+    def update_frame(self, df: pd.DataFrame, text_column: str, label_column: str,
+                     chunk_rows: int = CHUNK_ROWS) -> "CorpusStats":
+        """Add a DataFrame, chunk_rows rows at a time."""
+        for start in range(0, len(df), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            self.update(chunk[text_column], chunk[label_column])
+        return self
+
+    def overall(self) -> LabelStats:
+        """Statistics of the whole corpus, merged from the per-label sketches."""
+        total = self._new_stats()
+        for stats in self.labels.values():
+            total.merge(stats)
+        return total
+
+    def summary(self) -> pd.DataFrame:
+        """Documents, tokens, vocabulary size and diversity per label."""
+        return pd.DataFrame.from_dict(
+            {label: stats.summary() for label, stats in self.labels.items()}, orient="index"
+        ).rename_axis("label")
+
+    def top_ngrams(self, n: int = 1, k: int = TOP_K, label=None) -> list:
+        """Return the k most frequent n-grams of a label (or of the whole corpus) with their counts."""
+        stats = self.overall() if label is None else self.labels[label]
+        return stats.ngrams[n].most_common(k)
+
+
+def compute_corpus_stats(chunks, text_column: str, label_column: str, **kwargs) -> CorpusStats:
+    """Compute CorpusStats over an iterable of DataFrame chunks in one pass."""
+    stats = CorpusStats(**kwargs)
+    rows = 0
+    for chunk in chunks:
+        stats.update(chunk[text_column], chunk[label_column])
+        rows += len(chunk)
+    logger.info(f"Corpus statistics of {rows} rows, {len(stats.labels)} labels")
+    return stats
@@ -2,52 +2,100 @@
 run_text_features.py
 ---------------------
 Apply text feature extraction to processed training data.
+Only the text columns are read, in chunks, and the features
+of all columns are written into one float32 matrix saved as
+a memory-mappable .npy file and as an artifact in the store.
 """
 
-import pandas as pd
+import os
 import logging
-from src.features.text_features import TextFeatureExtractor
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+from src.features.text_features import (
+    TextFeatureExtractor, create_feature_pool, extract_feature_matrix, feature_names, COUNT_FEATURES
+)
+from src.utils.config import config
+from src.data.data_loader import optimize_dtypes, smallest_numeric_dtype
+from src.utils.helpers import get_artifact_store, save_artifact_chunks, save_json, load_json
 
 logging.basicConfig(level=logging.INFO)
 
-def main():
-    input_path = "data/processed/train_no_nulls.csv"
-    output_path = "data/features/train_with_text_features.csv"
-
-    logging.basicConfig(level=logging.INFO)
-    logging.info(f"Loading dataset from {input_path}")
-
-    df = pd.read_csv(input_path)
+# Number of rows read from the input file at a time
+CHUNK_ROWS = 200_000
+# Number of rows per (column, rows) job sent to a worker
+JOB_ROWS = 10_000
+# Number of worker processes (1 keeps everything in this process)
+N_JOBS = os.cpu_count() or 1
+# Text columns features are extracted from
+TEXT_COLUMNS = ['question_clean', 'context_clean', 'answer_clean']
+# Name of the feature artifacts in the features directory
+OUTPUT_NAME = "train_text_features"
 
-    print("\nColumns in dataset:\n", df.columns.tolist())
 
+def matrix_paths(name: str = OUTPUT_NAME) -> tuple:
+    """Return the paths of the .npy matrix and of its column names."""
+    base = os.path.join(config.paths["features"], name)
+    return base + ".npy", base + "_names.json"
 
-    text_columns = ['question_clean', 'context_clean', 'answer_clean']
 
+def load_feature_matrix(name: str = OUTPUT_NAME, mmap_mode: str = "r") -> tuple:
+    """Load the feature matrix (memory-mapped by default) and its column names."""
+    matrix_path, names_path = matrix_paths(name)
+    return np.load(matrix_path, mmap_mode=mmap_mode), load_json(names_path)
 
-    missing_cols = [col for col in text_columns if col not in df.columns]
-    if missing_cols:
-        raise ValueError(f"Missing text columns: {missing_cols}")
 
-    extractor = TextFeatureExtractor()
+def main():
+    input_store = get_artifact_store("processed_data")
+    output_store = get_artifact_store("features")
+    input_name = "train_no_nulls"
 
+    logging.basicConfig(level=logging.INFO)
+    logging.info(f"Streaming dataset from {input_store.path(input_name)}")
 
-    for text_col in text_columns:
-        logging.info(f"Extracting features for '{text_col}'...")
-        df = extractor.transform(df, text_col)
+    columns = input_store.columns(input_name)
 
+    print("\nColumns in dataset:\n", columns)
 
-        new_col_names = {
-            feat: f"{text_col}_{feat}" for feat in extractor.features.keys()
-        }
-        df.rename(columns=new_col_names, inplace=True)
 
+    missing_cols = [col for col in TEXT_COLUMNS if col not in columns]
+    if missing_cols:
+        raise ValueError(f"Missing text columns: {missing_cols}")
 
-    df.to_csv(output_path, index=False)
-    logging.info(f" Saved enriched dataset with all text features to {output_path}")
+    extractor = TextFeatureExtractor()
+    names = feature_names(extractor, TEXT_COLUMNS)
+    n_rows = input_store.num_rows(input_name)
+    matrix_path, names_path = matrix_paths()
+    matrix = np.lib.format.open_memmap(matrix_path, mode="w+", dtype=np.float32,
+                                       shape=(n_rows, len(names)))
+
+    pool = create_feature_pool(extractor, N_JOBS) if N_JOBS > 1 else nullcontext()
+    with pool as executor:
+        offset = 0
+        for chunk in input_store.iter_chunks(input_name, CHUNK_ROWS, columns=TEXT_COLUMNS):
+            logging.info(f"Extracting features for rows {offset}-{offset + len(chunk)}...")
+            extract_feature_matrix(chunk, TEXT_COLUMNS, extractor, job_rows=JOB_ROWS,
+                                   out=matrix[offset:offset + len(chunk)], executor=executor)
+            offset += len(chunk)
+    matrix.flush()
+    save_json(names, names_path)
+    logging.info(f" Saved feature matrix {matrix.shape} to {matrix_path}")
+
+    chunks = (
+        pd.DataFrame(matrix[start:start + CHUNK_ROWS], columns=names)
+        for start in range(0, n_rows, CHUNK_ROWS)
+    )
+    if config.storage.optimize_dtypes:
+        # Counts get the smallest int type for the whole matrix, so every
+        # chunk gets the same dtypes; ratios stay float32
+        counts = {f"{col}_{feat}" for col in TEXT_COLUMNS for feat in COUNT_FEATURES}
+        dtypes = {name: smallest_numeric_dtype(matrix[:, j]) if name in counts else np.float32
+                  for j, name in enumerate(names)}
+        chunks = (optimize_dtypes(chunk, numeric_dtypes=dtypes) for chunk in chunks)
+    save_artifact_chunks(output_store, chunks, OUTPUT_NAME)
+    logging.info(f" Saved text features ({n_rows} rows) to {output_store.path(OUTPUT_NAME)}")
+    return n_rows
 
 
 if __name__ == "__main__":
     main()
-
-    
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+sparse_features.py
+Build the sparse model input from the *_clean text columns.
+
+Every text column is vectorized on its own (TF-IDF with a fitted
+vocabulary, or HashingVectorizer + TF-IDF weighting for bounded
+memory) and the dense TextFeatureExtractor features, scaled by
+MaxAbsScaler, are appended. Blocks are joined with scipy.sparse.hstack
+into one CSR matrix; nothing is densified.
+
+StreamingFeaturizer does the same without any fitted state, so
+out-of-core training can transform every chunk independently.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MaxAbsScaler
+from src.features.text_features import TextFeatureExtractor, extract_feature_matrix
+from src.utils.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def build_text_vectorizer(kind: str = None, params: dict = None):
+    """Return an unfitted vectorizer producing float32 TF-IDF weights."""
+    kind = kind or config.model.vectorizer
+    if kind == "tfidf":
+        params = {**config.model.tfidf, **(params or {})}
+        return TfidfVectorizer(dtype=np.float32, **params)
+    if kind == "hashing":
+        params = {**config.model.hashing, **(params or {})}
+        return make_pipeline(HashingVectorizer(dtype=np.float32, **params),
+                             TfidfTransformer(sublinear_tf=True))
+    raise ValueError(f"Unknown vectorizer: {kind}. Available: ['tfidf', 'hashing']")
+
+
+class SparseFeatureBuilder:
+    """
+    Turn text columns and dense text features into one CSR matrix.
+
+    Attributes:
+        text_columns (list): Columns vectorized, one vectorizer each.
+        kind (str): 'tfidf' or 'hashing'.
+        use_dense (bool): Whether to append the dense text features.
+        vectorizers (dict): Fitted vectorizer per text column.
+        scaler (MaxAbsScaler): Scaler of the dense features.
+    """
+
+    def __init__(self, text_columns: list = None, kind: str = None,
+                 use_dense: bool = None, params: dict = None):
+        self.text_columns = text_columns or config.model.text_columns
+        self.kind = kind or config.model.vectorizer
+        self.use_dense = config.model.use_dense_features if use_dense is None else use_dense
+        self.params = params or {}
+        self.vectorizers = {}
+        self.scaler = None
+
+    def fit_transform(self, df: pd.DataFrame, dense: np.ndarray = None) -> sp.csr_matrix:
+        """
+        Fit the vectorizers (and scaler) on df and return its matrix.
+
+        Args:
+            df (pd.DataFrame): Data with the text columns.
+            dense (np.ndarray): Precomputed dense features of df's rows, e.g.
+                from run_text_features; computed from the text when None.
+        """
+        blocks = []
+        for col in self.text_columns:
+            self.vectorizers[col] = build_text_vectorizer(self.kind, self.params)
+            blocks.append(self.vectorizers[col].fit_transform(self._texts(df, col)))
+        if self.use_dense:
+            dense = self._dense(df, dense)
+            self.scaler = MaxAbsScaler().fit(dense)
+            blocks.append(sp.csr_matrix(self.scaler.transform(dense), dtype=np.float32))
+        return self._stack(blocks)
+
+    def transform(self, df: pd.DataFrame, dense: np.ndarray = None) -> sp.csr_matrix:
+        """Return the matrix of df with the fitted vectorizers."""
+        if not self.vectorizers:
+            raise RuntimeError("SparseFeatureBuilder must be fitted before transform")
+        blocks = [self.vectorizers[col].transform(self._texts(df, col)) for col in self.text_columns]
+        if self.use_dense:
+            dense = self._dense(df, dense)
+            blocks.append(sp.csr_matrix(self.scaler.transform(dense), dtype=np.float32))
+        return self._stack(blocks)
+
+    @property
+    def n_features(self) -> int:
+        """Number of columns of the output matrix."""
+        total = 0
+        for vectorizer in self.vectorizers.values():
+            if isinstance(vectorizer, TfidfVectorizer):
+                total += len(vectorizer.vocabulary_)
+            else:
+                total += vectorizer.steps[0][1].n_features
+        if self.use_dense and self.scaler is not None:
+            total += self.scaler.n_features_in_
+        return total
+
+    @staticmethod
+    def _texts(df: pd.DataFrame, col: str) -> pd.Series:
+        return df[col].fillna("").astype(object)
+
+    def _dense(self, df: pd.DataFrame, dense: np.ndarray = None) -> np.ndarray:
+        if dense is None:
+            dense = extract_feature_matrix(df, self.text_columns, TextFeatureExtractor())
+        return np.asarray(dense, dtype=np.float32)
+
+    @staticmethod
+    def _stack(blocks: list) -> sp.csr_matrix:
+        return sp.hstack(blocks, format="csr", dtype=np.float32)
+
+
+class StreamingFeaturizer:
+    """
+    Stateless counterpart of SparseFeatureBuilder for out-of-core training.
+
+    Text columns go through HashingVectorizer (non-negative, l2-normalized)
+    and dense features through log1p instead of a fitted scaler, so every
+    value is >= 0 and MultinomialNB can use the output too.
+
+    Attributes:
+        text_columns (list): Columns vectorized, each into its own block.
+        use_dense (bool): Whether to append the dense text features.
+        vectorizer (HashingVectorizer): Shared by all text columns.
+    """
+
+    def __init__(self, text_columns: list = None, params: dict = None, use_dense: bool = None):
+        self.text_columns = text_columns or config.model.text_columns
+        self.use_dense = config.model.use_dense_features if use_dense is None else use_dense
+        params = {**config.model.hashing, **(params or {}), "alternate_sign": False}
+        self.vectorizer = HashingVectorizer(dtype=np.float32, **params)
+
+    def transform(self, df: pd.DataFrame, dense: np.ndarray = None) -> sp.csr_matrix:
+        """Return the matrix of a chunk."""
+        blocks = [self.vectorizer.transform(SparseFeatureBuilder._texts(df, col)) for col in self.text_columns]
+        if self.use_dense:
+            if dense is None:
+                dense = extract_feature_matrix(df, self.text_columns, TextFeatureExtractor())
+            blocks.append(sp.csr_matrix(np.log1p(np.asarray(dense, dtype=np.float32))))
+        return SparseFeatureBuilder._stack(blocks)
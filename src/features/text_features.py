@@ -2,23 +2,36 @@ import re
 import string
 import logging
 from typing import Dict, Any
-from nltk.tokenize import sent_tokenize, word_tokenize
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from src.data.tokenizers import get_tokenizer
 from src.utils.helpers import timer
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Translation table deleting punctuation, used to count it in C
+_DELETE_PUNCTUATION = str.maketrans('', '', string.punctuation)
+PUNCTUATION_PATTERN = re.compile('[' + re.escape(string.punctuation) + ']')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^a-zA-Z0-9\s]')
+WHITESPACE_CHAR_PATTERN = re.compile(r'\s')
+# Features stored as integers in the output DataFrame
+COUNT_FEATURES = {"char_count", "word_count", "sentence_count", "punctuation_count"}
+# Features that depend on the tokenizer backend
+TOKENIZED_FEATURES = {"word_count", "sentence_count"}
+
 def char_count(text: str) -> int:
     """Count the total number of characters in a text"""
     return len(text)
 
-def word_count(text: str) -> int:
-    """Count the number of words in a text"""
-    return len(word_tokenize(text))
+def word_count(text: str, tokenizer: str = None) -> int:
+    """Count the number of words in a text (tokenizer default: config.text.tokenizer)"""
+    return len(get_tokenizer(tokenizer).words(text))
 
-def sentence_count(text: str) -> int:
-    """Count the number of sentences in a text"""
-    return len(sent_tokenize(text))
+def sentence_count(text: str, tokenizer: str = None) -> int:
+    """Count the number of sentences in a text (tokenizer default: config.text.tokenizer)"""
+    return len(get_tokenizer(tokenizer).sentences(text))
 
 def punctuation_count(text: str) -> int:
     """Count the number of punctuation marks in a text."""
@@ -41,7 +54,7 @@ def special_char_ratio(text: str) -> float:
     """Calculate the ratio of special characters
     (not alphanumeric or characters)"""
     total_chars = len(text)
-    special_chars = len(re.findall(r'[^a-zA-Z0-9\s]', text))
+    special_chars = len(SPECIAL_CHAR_PATTERN.findall(text))
     return special_chars / total_chars if total_chars > 0 else 0
 
 def digit_ratio(text: str) -> float:
@@ -50,6 +63,69 @@ def digit_ratio(text: str) -> float:
     digits = sum(c.isdigit() for c in text)
     return digits / total_chars if total_chars > 0 else 0
 
+def fused_features(text: str, tokenize: bool = True, tokenizer: str = None) -> dict:
+    """
+    Compute every built-in feature of a text in a single visit.
+    word_count and sentence_count come from one Tokenizer.counts call
+    of the tokenizer backend (default: config.text.tokenizer), which lets
+    the NLTK backend share its sentence split. With tokenize=False both
+    are skipped and set to None.
+    """
+    total_chars = len(text)
+    n_words, n_sentences = get_tokenizer(tokenizer).counts(text) if tokenize else (None, None)
+    words = text.split()
+    letters = sum(map(str.isalpha, text))
+    upper = sum(map(str.isupper, text))
+    special_chars = len(SPECIAL_CHAR_PATTERN.findall(text))
+    return {
+        "char_count": total_chars,
+        "word_count": n_words,
+        "sentence_count": n_sentences,
+        "avg_word_length": sum(map(len, words)) / len(words) if words else 0,
+        "punctuation_count": total_chars - len(text.translate(_DELETE_PUNCTUATION)),
+        "uppercase_ratio": upper / letters if letters else 0,
+        "special_char_ratio": special_chars / total_chars if total_chars > 0 else 0,
+        "digit_ratio": sum(map(str.isdigit, text)) / total_chars if total_chars > 0 else 0,
+    }
+
+def _fused_row_function(names: list, tokenizer: str = None):
+    """Build a function returning the named features of one text, in order."""
+    tokenize = any(name in TOKENIZED_FEATURES for name in names)
+
+    def row(text):
+        features = fused_features(text, tokenize, tokenizer)
+        return [features[name] for name in names]
+    return row
+
+def _vectorized_feature(texts: pd.Series, name: str) -> pd.Series:
+    """Compute one feature with pandas string methods, or return None if unsupported."""
+    if name == "char_count":
+        return texts.str.len()
+    if name == "punctuation_count":
+        return texts.str.count(PUNCTUATION_PATTERN)
+    if name == "special_char_ratio":
+        lengths = texts.str.len()
+        return (texts.str.count(SPECIAL_CHAR_PATTERN) / lengths).where(lengths > 0, 0)
+    if name == "avg_word_length":
+        word_counts = texts.str.split().str.len()
+        letters = texts.str.len() - texts.str.count(WHITESPACE_CHAR_PATTERN)
+        # avg_word_length returns 0 for non-string values
+        return (letters / word_counts).where(word_counts > 0, 0).fillna(0)
+    return None
+
+
+# Built-in feature functions that the fused and vectorized modes reproduce
+_BUILTIN_FEATURES = {
+    "char_count": char_count,
+    "word_count": word_count,
+    "sentence_count": sentence_count,
+    "avg_word_length": avg_word_length,
+    "punctuation_count": punctuation_count,
+    "uppercase_ratio": uppercase_ratio,
+    "special_char_ratio": special_char_ratio,
+    "digit_ratio": digit_ratio,
+}
+
 
 class TextFeatureExtractor:
     """
@@ -57,9 +133,17 @@ class TextFeatureExtractor:
 
     Attributes:
         features (list): List of functions to apply for feature extraction.
+        mode (str): How features are computed:
+            'fused': all features of a text in one visit (default),
+            'vectorized': pandas string methods where possible, fused otherwise,
+            'apply': one Series.apply per feature function.
+        tokenizer (str): Backend of word_count and sentence_count
+            (default: config.text.tokenizer when features are computed).
     """
 
-    def __init__(self):
+    def __init__(self, mode: str = "fused", tokenizer: str = None):
+        self.mode = mode
+        self.tokenizer = tokenizer
         self.features = {
             "char_count": char_count,
             "word_count": word_count,
@@ -83,8 +167,143 @@ class TextFeatureExtractor:
         Returns:
             pd.DataFrame: Original DataFrame with new feature columns appended.
         """
-        for feat_name, func in self.features.items():
-            logger.info(f"Extracting feature: {feat_name}")
-            df[feat_name] = df[text_col].apply(func)
+        values = self.compute(df[text_col])
+        for j, feat_name in enumerate(self.features):
+            dtype = np.int64 if feat_name in COUNT_FEATURES else np.float64
+            df[feat_name] = values[:, j].astype(dtype)
         return df
 
+    def compute(self, texts: pd.Series, mode: str = None) -> np.ndarray:
+        """
+        Compute the selected features for a Series of texts.
+
+        Args:
+            texts (pd.Series): Texts to extract features from.
+            mode (str): Overrides self.mode.
+
+        Returns:
+            np.ndarray: Array of shape (len(texts), len(self.features)),
+            with columns in the order of self.features.
+        """
+        mode = mode or self.mode
+        names = list(self.features)
+        values = np.empty((len(texts), len(names)), dtype=np.float64)
+        if mode == "apply":
+            for j, (feat_name, func) in enumerate(self.features.items()):
+                builtin = func is _BUILTIN_FEATURES.get(feat_name)
+                kwargs = {"tokenizer": self.tokenizer} if builtin and feat_name in TOKENIZED_FEATURES else {}
+                values[:, j] = texts.apply(func, **kwargs).to_numpy(dtype=np.float64)
+            return values
+        if mode not in ("fused", "vectorized"):
+            raise ValueError(f"Unknown feature extraction mode: {mode}")
+
+        # Object dtype keeps Python's str and re semantics for every backend
+        texts = texts.astype(object)
+        # Custom feature functions fall back to their own apply
+        custom = [name for name in names if self.features[name] is not _BUILTIN_FEATURES.get(name)]
+        vectorized = {}
+        if mode == "vectorized":
+            for name in names:
+                if name not in custom:
+                    result = _vectorized_feature(texts, name)
+                    if result is not None:
+                        vectorized[name] = result
+        fused = [name for name in names if name not in custom and name not in vectorized]
+
+        if fused:
+            row = _fused_row_function(fused, self.tokenizer)
+            fused_index = [names.index(name) for name in fused]
+            for i, text in enumerate(texts):
+                values[i, fused_index] = row(text)
+        for name, result in vectorized.items():
+            values[:, names.index(name)] = result.to_numpy(dtype=np.float64)
+        for name in custom:
+            values[:, names.index(name)] = texts.apply(self.features[name]).to_numpy(dtype=np.float64)
+        return values
+
+
+# Extractor owned by each worker process, set once by _init_feature_worker
+_worker_extractor = None
+
+
+def _init_feature_worker(extractor: TextFeatureExtractor) -> None:
+    """Store the extractor in the worker process."""
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _compute_feature_job(job: tuple) -> tuple:
+    """Compute the features of one (column, row range) job in a worker."""
+    column_index, start, texts = job
+    values = _worker_extractor.compute(pd.Series(texts, dtype=object)).astype(np.float32)
+    return column_index, start, values
+
+
+def create_feature_pool(extractor: TextFeatureExtractor, n_jobs: int) -> ProcessPoolExecutor:
+    """Start a worker pool that can be reused across extract_feature_matrix calls."""
+    return ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_feature_worker,
+                               initargs=(extractor,))
+
+
+def feature_names(extractor: TextFeatureExtractor, text_columns: list) -> list:
+    """Return the matrix column names, '<text_col>_<feature>' for each column."""
+    return [f"{text_col}_{feat}" for text_col in text_columns for feat in extractor.features]
+
+
+@timer
+def extract_feature_matrix(df: pd.DataFrame, text_columns: list,
+                           extractor: TextFeatureExtractor = None, n_jobs: int = 1,
+                           job_rows: int = 10_000, out: np.ndarray = None,
+                           executor: ProcessPoolExecutor = None, tokenizer: str = None) -> np.ndarray:
+    """
+    Extract the features of several text columns into one float32 matrix.
+
+    Work is split into (column, row range) jobs of job_rows rows that run on
+    a process pool when n_jobs > 1 or an executor is given. Each job writes
+    its block of the matrix directly, so no intermediate DataFrame is built.
+
+    Args:
+        df (pd.DataFrame): Input data containing the text columns.
+        text_columns (list): Columns to extract features from.
+        extractor (TextFeatureExtractor): Extractor to use (default: a new one).
+        n_jobs (int): Number of worker processes.
+        job_rows (int): Rows per job.
+        out (np.ndarray): Optional preallocated (or memory-mapped) float32
+            array of shape (len(df), len(feature_names(...))) to fill.
+        executor (ProcessPoolExecutor): Optional pool from create_feature_pool.
+        tokenizer (str): Tokenizer backend of the default extractor; used
+            only when extractor is None.
+
+    Returns:
+        np.ndarray: The filled matrix, with columns named by feature_names.
+    """
+    extractor = extractor or TextFeatureExtractor(tokenizer=tokenizer)
+    n_features = len(extractor.features)
+    if out is None:
+        out = np.empty((len(df), n_features * len(text_columns)), dtype=np.float32)
+
+    jobs = (
+        (j, start, df[text_col].iloc[start:start + job_rows].tolist())
+        for j, text_col in enumerate(text_columns)
+        for start in range(0, len(df), job_rows)
+    )
+    if executor is not None:
+        pool = nullcontext(executor)
+    elif n_jobs > 1:
+        pool = create_feature_pool(extractor, n_jobs)
+    else:
+        pool = None
+
+    if pool is None:
+        results = (
+            (j, start, extractor.compute(pd.Series(texts, dtype=object)))
+            for j, start, texts in jobs
+        )
+        for j, start, values in results:
+            out[start:start + len(values), j * n_features:(j + 1) * n_features] = values
+        return out
+
+    with pool as executor:
+        for j, start, values in executor.map(_compute_feature_job, jobs):
+            out[start:start + len(values), j * n_features:(j + 1) * n_features] = values
+    return out
@@ -0,0 +1,226 @@
+"""
+batch_predict.py
+---------------------------------------------------
+Score large JSON lines files (e.g. data/raw/test.json)
+with a trained model.
+
+The input is streamed in chunks of raw lines; every
+chunk is parsed, preprocessed, featurized and scored
+by the Predictor, in worker processes when n_jobs > 1
+(each worker loads the model once). Predictions are
+written chunk by chunk as part files (Parquet or JSON
+lines) in the output directory, in input order.
+
+After every part file, _progress.json records the
+byte offset reached in the input, so an interrupted
+job resumes with the next chunk instead of scoring
+the file again.
+
+Usage:
+    python -m src.models.batch_predict --input data/raw/test.json --output results/predictions
+---------------------------------------------------
+"""
+
+import os
+import glob
+import time
+import logging
+import argparse
+from collections import deque
+from contextlib import closing, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.data.data_loader import _json_loads, iter_line_chunks
+from src.models.predict import Predictor, default_model_name
+from src.utils.config import config
+from src.utils.helpers import load_json, save_json
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+INPUT_PATH = os.path.join(config.paths["raw_data"], "test.json")
+PROGRESS_FILE = "_progress.json"
+# Output format -> part file extension
+OUTPUT_FORMATS = {"parquet": "parquet", "jsonl": "jsonl"}
+# Number of worker processes (1 keeps the serial path)
+N_JOBS = os.cpu_count() or 1
+# Chunks in flight per worker, bounding the memory held by pending results
+PREFETCH_PER_JOB = 2
+
+# Predictor owned by each worker process, set once by _init_worker
+_worker_predictor = None
+
+
+def _init_worker(models_dir: str, model_name: str) -> None:
+    """Load the model once per worker process."""
+    global _worker_predictor
+    _worker_predictor = Predictor.load(models_dir, model_name)
+
+
+def score_lines(predictor: Predictor, lines: list, id_column: str = None) -> pd.DataFrame:
+    """Parse and score raw JSON lines; return one row of predictions per line."""
+    records = [_json_loads(line) for line in lines]
+    scored = pd.DataFrame(predictor.predict(records), columns=["label", "confidence"])
+    if id_column:
+        scored.insert(0, id_column, [record.get(id_column) for record in records])
+    return scored
+
+
+def _score_chunk(job: tuple) -> pd.DataFrame:
+    lines, id_column = job
+    return score_lines(_worker_predictor, lines, id_column)
+
+
+def _score_chunks(chunks, id_column: str, executor: ProcessPoolExecutor = None,
+                  predictor: Predictor = None, n_jobs: int = 1):
+    """Yield (end byte, predictions) for every chunk, in input order."""
+    if executor is None:
+        for _, end, lines in chunks:
+            yield end, score_lines(predictor, lines, id_column)
+        return
+    pending = deque()
+    try:
+        for _, end, lines in chunks:
+            pending.append((end, executor.submit(_score_chunk, (lines, id_column))))
+            if len(pending) >= n_jobs * PREFETCH_PER_JOB:
+                end, future = pending.popleft()
+                yield end, future.result()
+        while pending:
+            end, future = pending.popleft()
+            yield end, future.result()
+    finally:
+        # Chunks not written yet are scored again on resume
+        for _, future in pending:
+            future.cancel()
+
+
+def _write_part(df: pd.DataFrame, path: str, output_format: str) -> None:
+    """Write a part file atomically, so a part on disk is always complete."""
+    temporary = path + ".tmp"
+    if output_format == "parquet":
+        df.to_parquet(temporary, index=False, compression=config.storage.compression)
+    else:
+        df.to_json(temporary, orient="records", lines=True, force_ascii=False)
+    os.replace(temporary, path)
+
+
+def _save_progress(progress: dict, path: str) -> None:
+    temporary = path + ".tmp"
+    save_json(progress, temporary)
+    os.replace(temporary, path)
+
+
+def part_files(output_dir: str) -> list:
+    """Return the part files of an output directory, in input order."""
+    return sorted(path for ext in OUTPUT_FORMATS.values()
+                  for path in glob.glob(os.path.join(output_dir, f"part-*.{ext}")))
+
+
+def batch_predict(input_path: str = INPUT_PATH, output_dir: str = None, models_dir: str = None,
+                  model_name: str = None, chunk_rows: int = None, output_format: str = None,
+                  n_jobs: int = 1, id_column: str = "id", resume: bool = True,
+                  max_chunks: int = None) -> dict:
+    """
+    Score every line of a JSON lines file and write the predictions as part files.
+
+    Args:
+        input_path (str): JSON lines file of records with the raw text fields.
+        output_dir (str): Directory of the part files and of the progress file.
+        models_dir (str): Directory of the trained model (default: config.paths["models"]).
+        model_name (str): Model to use (default: see predict.default_model_name).
+        chunk_rows (int): Records per chunk and part file.
+        output_format (str): 'parquet' or 'jsonl'.
+        n_jobs (int): Number of worker processes.
+        id_column (str): Input field copied to the output, if present.
+        resume (bool): Continue from the progress file of a previous run.
+        max_chunks (int): Stop after this many chunks (the job can be resumed).
+
+    Returns:
+        dict: The progress record, with 'done' True once the whole input is scored.
+    """
+    output_dir = output_dir or os.path.join(config.paths["results"], "predictions")
+    models_dir = models_dir or config.paths["models"]
+    model_name = model_name or default_model_name(models_dir)
+    chunk_rows = chunk_rows or config.serving.batch_chunk_rows
+    output_format = output_format or config.serving.batch_output_format
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}. Available: {sorted(OUTPUT_FORMATS)}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    signature = {
+        "input": os.path.abspath(input_path),
+        "model": model_name,
+        "model_mtime": os.path.getmtime(os.path.join(models_dir, f"{model_name}.joblib")),
+        "chunk_rows": chunk_rows,
+        "format": output_format,
+        "id_column": id_column,
+    }
+    progress_path = os.path.join(output_dir, PROGRESS_FILE)
+    progress = load_json(progress_path) if resume and os.path.isfile(progress_path) else None
+    if progress is not None and progress["signature"] != signature:
+        logger.warning("Progress file was written for another input, model or settings; starting over")
+        progress = None
+    if progress is None:
+        for path in part_files(output_dir):
+            os.remove(path)
+        progress = {"signature": signature, "chunks": 0, "rows": 0, "next_byte": 0,
+                    "seconds": 0.0, "done": False}
+    elif progress["done"]:
+        logger.info(f"{input_path} was already scored into {output_dir}")
+        return progress
+    else:
+        logger.info(f"Resuming after {progress['chunks']} chunks ({progress['rows']} rows)")
+
+    chunks = iter_line_chunks(input_path, chunk_rows, start_byte=progress["next_byte"])
+    if n_jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                   initargs=(models_dir, model_name))
+        predictor = None
+    else:
+        pool = nullcontext()
+        predictor = Predictor.load(models_dir, model_name)
+
+    start, base_seconds = time.perf_counter(), progress["seconds"]
+    extension = OUTPUT_FORMATS[output_format]
+    chunks_run, rows_run = 0, 0
+    with pool as executor, closing(
+            _score_chunks(chunks, id_column, executor, predictor, n_jobs)) as scored_chunks:
+        for end, scored in scored_chunks:
+            scored.insert(0, "row", pd.RangeIndex(progress["rows"], progress["rows"] + len(scored)))
+            _write_part(scored, os.path.join(output_dir, f"part-{progress['chunks']:05d}.{extension}"),
+                        output_format)
+            elapsed = time.perf_counter() - start
+            chunks_run, rows_run = chunks_run + 1, rows_run + len(scored)
+            progress.update(chunks=progress["chunks"] + 1, rows=progress["rows"] + len(scored),
+                            next_byte=end, seconds=base_seconds + elapsed)
+            _save_progress(progress, progress_path)
+            logger.info(f"Chunk {progress['chunks']}: {progress['rows']} rows scored "
+                        f"({rows_run / elapsed:,.0f} rows/s)")
+            if max_chunks is not None and chunks_run >= max_chunks:
+                return progress
+
+    progress.update(seconds=base_seconds + time.perf_counter() - start, done=True)
+    _save_progress(progress, progress_path)
+    logger.info(f"Scored {progress['rows']} rows into {output_dir} in {progress['seconds']:.2f}s")
+    return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a JSON lines file with a trained model.")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=os.path.join(config.paths["results"], "predictions"))
+    parser.add_argument("--models-dir", default=config.paths["models"])
+    parser.add_argument("--model", default=config.serving.model)
+    parser.add_argument("--chunk-rows", type=int, default=config.serving.batch_chunk_rows)
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default=config.serving.batch_output_format)
+    parser.add_argument("--n-jobs", type=int, default=N_JOBS)
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore the progress of a previous run.")
+    args = parser.parse_args()
+
+    batch_predict(args.input, args.output, args.models_dir, args.model, args.chunk_rows,
+                  args.format, args.n_jobs, args.id_column, resume=not args.no_resume)
+
+
+if __name__ == "__main__":
+    main()
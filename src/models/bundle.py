@@ -0,0 +1,408 @@
+"""
+bundle.py
+---------------------------------------------------
+Compact model bundles for fast, shared inference.
+
+A bundle is a directory (<model>.bundle/ next to the
+joblib files) holding a linear model and its feature
+builder as plain NumPy arrays:
+    meta.json            format version, labels, feature
+                         settings and the TextConfig the
+                         training data was preprocessed
+                         with
+    coef.npy, intercept.npy
+    <column>.keys.npy    sorted 64-bit hashes of the
+                         vocabulary (token index)
+    <column>.index.npy   feature column of every key
+    <column>.idf.npy     idf weights
+    dense_scale.npy      MaxAbsScaler scale of the dense
+                         features
+
+load_bundle opens the arrays with np.load(mmap_mode='r'):
+nothing is unpickled, loading takes milliseconds, and
+worker processes share the same pages through the OS
+page cache. Tokens are looked up with np.searchsorted
+in the sorted hashes instead of a Python dict.
+
+Linear models are supported (LogisticRegression,
+SGDClassifier, MultinomialNB); others stay joblib-only.
+---------------------------------------------------
+"""
+
+import os
+import shutil
+import logging
+import argparse
+from dataclasses import asdict, fields
+from datetime import datetime
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from src.features.sparse_features import SparseFeatureBuilder, StreamingFeaturizer
+from src.features.text_features import TextFeatureExtractor, extract_feature_matrix
+from src.utils.config import config, TextConfig
+from src.utils.helpers import get_artifact_store, load_json, save_json
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# Bumped on any incompatible change of the layout below
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+META_FILE = "meta.json"
+# Vectorizer parameters that decide how a text is split into terms
+ANALYZER_PARAMS = ["input", "encoding", "decode_error", "strip_accents", "lowercase",
+                   "preprocessor", "tokenizer", "analyzer", "stop_words", "token_pattern", "ngram_range"]
+# Vectorizer parameters that decide how term counts are weighted
+WEIGHT_PARAMS = ["binary", "norm", "sublinear_tf"]
+
+
+def bundle_path(models_dir: str, model_name: str) -> str:
+    """Return the directory of a model's bundle."""
+    return os.path.join(models_dir, model_name + BUNDLE_SUFFIX)
+
+
+def hash_tokens(tokens) -> np.ndarray:
+    """64-bit hashes of tokens, identical in every process and run."""
+    return pd.util.hash_array(np.asarray(tokens, dtype=object))
+
+
+def _jsonable(params: dict) -> dict:
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in params.items()}
+
+
+def _analyzer_params(vectorizer) -> dict:
+    params = {key: vectorizer.get_params()[key] for key in ANALYZER_PARAMS}
+    if any(callable(value) for value in params.values()):
+        raise ValueError("Vectorizers with a custom analyzer, tokenizer or preprocessor cannot be bundled")
+    return _jsonable(params)
+
+
+def _linear_parameters(model) -> tuple:
+    """Return (coef, intercept, probability mode) of a supported linear model."""
+    if isinstance(model, MultinomialNB):
+        # Joint log-likelihood, normalized with a softmax like predict_proba
+        return model.feature_log_prob_, model.class_log_prior_, "softmax"
+    if isinstance(model, LogisticRegression):
+        multiclass = len(model.classes_) > 2
+        proba = "ovr" if model.solver == "liblinear" and multiclass else ("softmax" if multiclass else "sigmoid")
+        return model.coef_, model.intercept_, proba
+    if isinstance(model, SGDClassifier):
+        proba = "none" if model.loss != "log_loss" else ("ovr" if len(model.classes_) > 2 else "sigmoid")
+        return model.coef_, model.intercept_, proba
+    raise ValueError(f"Only linear models can be bundled, not {type(model).__name__}")
+
+
+def supports_bundle(model) -> bool:
+    return isinstance(model, (LogisticRegression, SGDClassifier, MultinomialNB))
+
+
+def preprocessing_settings(store, name: str) -> dict:
+    """
+    Return the TextConfig (as a dict) the *_clean columns of an artifact were
+    produced with, as recorded by implementation_preprocessor.
+    """
+    metadata = store.read_metadata(name)
+    if metadata is None or "preprocessing" not in metadata:
+        logger.warning(f"{store.path(name)} does not record its preprocessing settings; "
+                       f"assuming the current config.text")
+        return asdict(config.text)
+    return metadata["preprocessing"]
+
+
+def export_bundle(model, featurizer, path: str, model_name: str = None, preprocessing: dict = None) -> str:
+    """
+    Write a fitted linear model and its feature builder as a bundle directory.
+
+    Args:
+        model: Fitted LogisticRegression, SGDClassifier or MultinomialNB.
+        featurizer: Fitted SparseFeatureBuilder, or a StreamingFeaturizer.
+        path (str): Bundle directory (see bundle_path).
+        model_name (str): Name recorded in the metadata.
+        preprocessing (dict): TextConfig of the training data's *_clean
+            columns, from preprocessing_settings (default: config.text).
+
+    Returns:
+        str: The bundle directory.
+    """
+    coef, intercept, proba = _linear_parameters(model)
+    # Written next to the bundle and renamed, so readers never see a partial one
+    final_path, path = path, path + ".tmp"
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+    np.save(os.path.join(path, "coef.npy"), np.ascontiguousarray(coef, dtype=np.float32))
+    np.save(os.path.join(path, "intercept.npy"), np.asarray(intercept, dtype=np.float32))
+
+    columns = []
+    if isinstance(featurizer, StreamingFeaturizer):
+        kind, dense = "streaming", "log1p" if featurizer.use_dense else None
+        vectorizer_params = _jsonable({key: value for key, value in featurizer.vectorizer.get_params().items()
+                                       if key != "dtype"})
+        for col in featurizer.text_columns:
+            columns.append({"name": col, "n_features": featurizer.vectorizer.n_features})
+    elif isinstance(featurizer, SparseFeatureBuilder):
+        kind, dense = featurizer.kind, "maxabs" if featurizer.use_dense else None
+        vectorizer_params = None
+        for col in featurizer.text_columns:
+            vectorizer = featurizer.vectorizers[col]
+            if isinstance(vectorizer, TfidfVectorizer):
+                terms = np.array(list(vectorizer.vocabulary_), dtype=object)
+                keys = hash_tokens(terms)
+                order = np.argsort(keys)
+                if len(np.unique(keys)) != len(keys):
+                    raise ValueError(f"Hash collision in the vocabulary of {col}")
+                indices = np.fromiter(vectorizer.vocabulary_.values(), dtype=np.int64, count=len(terms))
+                np.save(os.path.join(path, f"{col}.keys.npy"), keys[order])
+                np.save(os.path.join(path, f"{col}.index.npy"), indices[order].astype(np.int32))
+                params = {**_analyzer_params(vectorizer),
+                          **{key: vectorizer.get_params()[key] for key in WEIGHT_PARAMS}}
+                n_features = len(terms)
+            else:
+                hashing, vectorizer = vectorizer.steps[0][1], vectorizer.steps[1][1]
+                params = {**_jsonable({key: value for key, value in hashing.get_params().items() if key != "dtype"}),
+                          "tfidf_norm": vectorizer.norm, "sublinear_tf": vectorizer.sublinear_tf}
+                n_features = hashing.n_features
+            np.save(os.path.join(path, f"{col}.idf.npy"), vectorizer.idf_.astype(np.float32))
+            columns.append({"name": col, "n_features": n_features, "params": params})
+        if featurizer.use_dense:
+            np.save(os.path.join(path, "dense_scale.npy"), featurizer.scaler.scale_.astype(np.float32))
+    else:
+        raise ValueError(f"Unsupported feature builder: {type(featurizer).__name__}")
+
+    n_features = sum(c["n_features"] for c in columns)
+    if dense:
+        n_features += len(TextFeatureExtractor().features) * len(columns)
+    if n_features != coef.shape[1]:
+        raise ValueError(f"Feature builder produces {n_features} columns, the model expects {coef.shape[1]}")
+
+    save_json({
+        "format_version": BUNDLE_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "model": model_name or type(model).__name__,
+        "estimator": type(model).__name__,
+        "classes": [str(c) for c in model.classes_],
+        "proba": proba,
+        "features": {"kind": kind, "columns": columns, "dense": dense, "hashing": vectorizer_params},
+        "text_config": preprocessing or asdict(config.text),
+        "versions": {"scikit-learn": sklearn.__version__, "numpy": np.__version__},
+    }, os.path.join(path, META_FILE))
+    shutil.rmtree(final_path, ignore_errors=True)
+    os.replace(path, final_path)
+    logger.info(f"Bundle of {model_name or type(model).__name__} written to {final_path}")
+    return final_path
+
+
+def save_bundle(model, featurizer, models_dir: str, model_name: str, preprocessing: dict = None) -> str:
+    """
+    Export the bundle of a newly trained model, or remove a stale one.
+
+    Returns:
+        str: The bundle directory, or None when the model cannot be bundled.
+    """
+    path = bundle_path(models_dir, model_name)
+    if supports_bundle(model):
+        return export_bundle(model, featurizer, path, model_name, preprocessing)
+    # An older bundle of the same name would otherwise be loaded instead of the new model
+    shutil.rmtree(path, ignore_errors=True)
+    return None
+
+
+class BundleFeaturizer:
+    """
+    Feature builder of a bundle: same matrix as the fitted SparseFeatureBuilder
+    (or StreamingFeaturizer), computed from memory-mapped arrays.
+
+    Attributes:
+        text_columns (list): Columns vectorized, in matrix order.
+        use_dense (bool): Whether the dense text features are appended.
+        tokenizer (str): Tokenizer of the bundle's preprocessing, also used
+            for the word and sentence counts of the dense features.
+    """
+
+    def __init__(self, path: str, meta: dict):
+        features = meta["features"]
+        self.kind = features["kind"]
+        self.dense = features["dense"]
+        self.use_dense = bool(self.dense)
+        # Bundles without a recorded tokenizer fall back to config.text.tokenizer
+        self.tokenizer = meta.get("text_config", {}).get("tokenizer")
+        self.text_columns = [c["name"] for c in features["columns"]]
+        self._columns = []
+        for column in features["columns"]:
+            name, params = column["name"], column.get("params", {})
+            entry = {"n_features": column["n_features"], "params": params}
+            if self.kind == "tfidf":
+                analyzer = {key: value for key, value in params.items() if key not in WEIGHT_PARAMS}
+                entry["analyzer"] = CountVectorizer(**_analyzer_kwargs(analyzer)).build_analyzer()
+                entry["keys"] = np.load(os.path.join(path, f"{name}.keys.npy"), mmap_mode="r")
+                entry["index"] = np.load(os.path.join(path, f"{name}.index.npy"), mmap_mode="r")
+            elif self.kind == "hashing":
+                hashing = {k: v for k, v in params.items() if k not in ("tfidf_norm", "sublinear_tf")}
+                entry["hashing"] = HashingVectorizer(dtype=np.float32, **_analyzer_kwargs(hashing))
+            else:
+                entry["hashing"] = HashingVectorizer(dtype=np.float32, **_analyzer_kwargs(features["hashing"]))
+            if self.kind != "streaming":
+                entry["idf"] = np.load(os.path.join(path, f"{name}.idf.npy"), mmap_mode="r")
+            self._columns.append(entry)
+        self._scale = (np.load(os.path.join(path, "dense_scale.npy"), mmap_mode="r")
+                       if self.dense == "maxabs" else None)
+
+    def transform(self, df: pd.DataFrame, dense: np.ndarray = None) -> sp.csr_matrix:
+        """Return the matrix of df."""
+        blocks = []
+        for col, entry in zip(self.text_columns, self._columns):
+            texts = SparseFeatureBuilder._texts(df, col)
+            if self.kind == "tfidf":
+                blocks.append(self._tfidf(texts, entry))
+            elif self.kind == "hashing":
+                counts = entry["hashing"].transform(texts)
+                blocks.append(_weight(counts, entry["idf"], entry["params"]["sublinear_tf"],
+                                      entry["params"]["tfidf_norm"]))
+            else:
+                blocks.append(entry["hashing"].transform(texts))
+        if self.dense:
+            if dense is None:
+                dense = extract_feature_matrix(df, self.text_columns, tokenizer=self.tokenizer)
+            dense = np.asarray(dense, dtype=np.float32)
+            dense = np.log1p(dense) if self.dense == "log1p" else dense / self._scale
+            blocks.append(sp.csr_matrix(dense))
+        return SparseFeatureBuilder._stack(blocks)
+
+    @staticmethod
+    def _tfidf(texts: pd.Series, entry: dict) -> sp.csr_matrix:
+        # Term counts: every term is looked up by its hash in the sorted keys
+        analyzer, keys, params = entry["analyzer"], entry["keys"], entry["params"]
+        terms = [analyzer(text) for text in texts]
+        rows = np.repeat(np.arange(len(terms)), [len(t) for t in terms])
+        flat = [term for doc in terms for term in doc]
+        if flat:
+            hashes = hash_tokens(flat)
+            positions = np.minimum(np.searchsorted(keys, hashes), len(keys) - 1)
+            found = keys[positions] == hashes
+            columns, rows = entry["index"][positions[found]], rows[found]
+        else:
+            columns = np.empty(0, dtype=np.int32)
+        counts = sp.csr_matrix((np.ones(len(columns), dtype=np.float32), (rows, columns)),
+                               shape=(len(terms), entry["n_features"]))
+        counts.sum_duplicates()
+        if params["binary"]:
+            counts.data[:] = 1
+        return _weight(counts, entry["idf"], params["sublinear_tf"], params["norm"])
+
+
+def _analyzer_kwargs(params: dict) -> dict:
+    # JSON turns tuples into lists; scikit-learn validates ngram_range as a tuple
+    return {key: tuple(value) if key == "ngram_range" else value for key, value in params.items()}
+
+
+def _weight(counts: sp.csr_matrix, idf: np.ndarray, sublinear_tf: bool, norm: str) -> sp.csr_matrix:
+    """Apply TfidfTransformer's weighting to a count matrix."""
+    counts = counts.astype(np.float32)
+    if sublinear_tf:
+        np.log(counts.data, counts.data)
+        counts.data += 1
+    counts.data *= idf[counts.indices]
+    if norm == "l2":
+        lengths = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    elif norm == "l1":
+        lengths = np.asarray(abs(counts).sum(axis=1)).ravel()
+    elif norm is None:
+        return counts
+    else:
+        raise ValueError(f"Unsupported norm: {norm}")
+    lengths[lengths == 0] = 1
+    counts.data /= np.repeat(lengths, np.diff(counts.indptr)).astype(np.float32)
+    return counts
+
+
+class BundleModel:
+    """Linear classifier of a bundle, with the predict/predict_proba API of scikit-learn."""
+
+    def __init__(self, path: str, meta: dict):
+        self.classes_ = np.array(meta["classes"], dtype=object)
+        self.proba = meta["proba"]
+        self.coef = np.load(os.path.join(path, "coef.npy"), mmap_mode="r")
+        self.intercept = np.load(os.path.join(path, "intercept.npy"), mmap_mode="r")
+
+    def decision_function(self, X) -> np.ndarray:
+        scores = np.asarray(X @ self.coef.T) + self.intercept
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        best = (scores > 0).astype(int) if scores.ndim == 1 else scores.argmax(axis=1)
+        return self.classes_[best]
+
+    @property
+    def predict_proba(self):
+        # Like scikit-learn, hasattr(model, 'predict_proba') is False without probabilities
+        if self.proba == "none":
+            raise AttributeError("This model has no predict_proba")
+        return self._predict_proba
+
+    def _predict_proba(self, X) -> np.ndarray:
+        scores = self.decision_function(X).astype(np.float64)
+        if self.proba == "sigmoid":
+            positive = 1 / (1 + np.exp(-scores))
+            return np.column_stack([1 - positive, positive])
+        if self.proba == "ovr":
+            probabilities = 1 / (1 + np.exp(-scores))
+            return probabilities / probabilities.sum(axis=1, keepdims=True)
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+def load_bundle(path: str) -> tuple:
+    """
+    Open a bundle with memory-mapped arrays.
+
+    Returns:
+        tuple: (BundleModel, BundleFeaturizer, metadata dict).
+    """
+    meta = load_json(os.path.join(path, META_FILE))
+    if meta["format_version"] != BUNDLE_VERSION:
+        raise ValueError(f"Bundle {path} has format version {meta['format_version']}, "
+                         f"this code reads version {BUNDLE_VERSION}")
+    return BundleModel(path, meta), BundleFeaturizer(path, meta), meta
+
+
+def bundle_text_config(meta: dict) -> TextConfig:
+    """Return the TextConfig the bundle's training data was preprocessed with; config.text is left as is."""
+    known = {f.name for f in fields(TextConfig)}
+    recorded = meta["text_config"]
+    unknown = sorted(set(recorded) - known)
+    if unknown:
+        logger.warning(f"Ignoring unknown text settings of the bundle: {unknown}")
+    text_config = TextConfig(**{key: value for key, value in recorded.items() if key in known})
+    current = asdict(config.text)
+    changed = {key: value for key, value in asdict(text_config).items() if current[key] != value}
+    if changed:
+        logger.info(f"Preprocessing records with the bundle's text settings, not config.text: {changed}")
+    return text_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert trained joblib models into bundles.")
+    parser.add_argument("--models-dir", default=config.paths["models"])
+    parser.add_argument("--models", nargs="+", required=True)
+    args = parser.parse_args()
+
+    from src.models.train import FEATURE_BUILDER_FILE, INPUT_ARTIFACT
+    from src.models.train_streaming import FEATURIZER_FILE, STREAMING_MODELS
+    # The models were trained on the current processed data
+    preprocessing = preprocessing_settings(get_artifact_store("processed_data"), INPUT_ARTIFACT)
+    for name in args.models:
+        model = joblib.load(os.path.join(args.models_dir, f"{name}.joblib"))
+        featurizer_file = FEATURIZER_FILE if name in STREAMING_MODELS else FEATURE_BUILDER_FILE
+        featurizer = joblib.load(os.path.join(args.models_dir, featurizer_file))
+        export_bundle(model, featurizer, bundle_path(args.models_dir, name), name, preprocessing)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+predict.py
+---------------------------------------------------
+In-process inference API.
+
+Predictor loads a trained model and its feature
+builder once, then turns raw records (question,
+context and answer text) into predictions with the
+same steps as training: TextPreprocessor for the
+*_clean columns, then the builder, which appends the
+TextFeatureExtractor features. NLTK resources are
+loaded by warmup(), never on the request path.
+
+When a model has a bundle (bundle.py), load() opens
+it instead of the joblib files: the arrays are
+memory-mapped, so cold start takes milliseconds and
+worker processes share one copy of the weights.
+
+LatencyCounter keeps request counts, throughput and
+p50/p99 latencies in a fixed-size histogram, for the
+Predictor itself and for the HTTP service (serve.py).
+---------------------------------------------------
+"""
+
+import os
+import time
+import logging
+import threading
+import joblib
+import numpy as np
+import pandas as pd
+from src.data.preprocessing import TextPreprocessor
+from src.features.text_features import extract_feature_matrix
+from src.models.bundle import META_FILE as BUNDLE_META_FILE
+from src.models.bundle import bundle_path, bundle_text_config, load_bundle
+from src.models.train import FEATURE_BUILDER_FILE, METADATA_FILE
+from src.models.train_streaming import FEATURIZER_FILE as STREAMING_FEATURIZER_FILE
+from src.models.train_streaming import METADATA_FILE as STREAMING_METADATA_FILE
+from src.models.train_streaming import STREAMING_MODELS
+from src.utils.config import config
+from src.utils.helpers import load_json
+from src.utils.profiling import FunctionStats
+
+logger = logging.getLogger(__name__)
+
+# Record used to load NLTK resources and fill caches before serving
+WARMUP_RECORD = {"question": "What are the rivers running through the cities?",
+                 "context": "The rivers were crossing the largest cities.",
+                 "answer": "Rivers"}
+
+
+class LatencyCounter:
+    """
+    Thread-safe latency and throughput counters of a serving path.
+
+    Attributes:
+        latency (FunctionStats): Histogram of call durations.
+        items (int): Records handled (a call may hold several).
+        started (float): perf_counter value when counting started.
+    """
+
+    def __init__(self):
+        self.latency = FunctionStats()
+        self.items = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, ns: int, items: int = 1) -> None:
+        with self._lock:
+            self.latency.record(ns)
+            self.items += items
+
+    def snapshot(self) -> dict:
+        """Return the counters, with latencies in milliseconds."""
+        with self._lock:
+            stats, items = self.latency, self.items
+            elapsed = time.perf_counter() - self.started
+            return {
+                "count": stats.count,
+                "items": items,
+                "mean_ms": stats.total_ns / stats.count / 1e6 if stats.count else 0.0,
+                "p50_ms": stats.percentile(50) / 1e6,
+                "p99_ms": stats.percentile(99) / 1e6,
+                "max_ms": stats.max_ns / 1e6,
+                "throughput_per_sec": items / elapsed if elapsed else 0.0,
+            }
+
+
+def default_model_name(models_dir: str) -> str:
+    """Model to serve: config.serving.model, else the first one in the training metadata."""
+    if config.serving.model:
+        return config.serving.model
+    metadata_path = os.path.join(models_dir, METADATA_FILE)
+    if os.path.isfile(metadata_path):
+        return next(iter(load_json(metadata_path)["models"]))
+    streaming_path = os.path.join(models_dir, STREAMING_METADATA_FILE)
+    if os.path.isfile(streaming_path):
+        return load_json(streaming_path)["model"]
+    raise FileNotFoundError(f"No trained model found in {models_dir}; run src.models.train first")
+
+
+class Predictor:
+    """
+    Predict question types for raw records.
+
+    Attributes:
+        model: Fitted classifier.
+        featurizer: Fitted SparseFeatureBuilder (or StreamingFeaturizer).
+        processor (TextPreprocessor): Produces the *_clean columns.
+        model_name (str): Name of the model, for reporting.
+        raw_columns (list): Record fields the *_clean columns come from.
+        stats (LatencyCounter): Counters of predict calls.
+    """
+
+    def __init__(self, model, featurizer, processor: TextPreprocessor = None, model_name: str = None):
+        self.model = model
+        self.featurizer = featurizer
+        # Same settings as the preprocessing of the training data
+        # (config.text unless given, e.g. by a bundle)
+        self.processor = processor or TextPreprocessor()
+        self.model_name = model_name or type(model).__name__
+        self.raw_columns = [col.removesuffix("_clean") for col in featurizer.text_columns]
+        self.classes = np.asarray(model.classes_).astype(str)
+        self.stats = LatencyCounter()
+
+    @classmethod
+    def load(cls, models_dir: str = None, model_name: str = None, warmup: bool = True) -> "Predictor":
+        """
+        Load a model saved by train.py or train_streaming.py, with its feature builder.
+
+        The model's bundle is used when there is one; records are then
+        preprocessed with the text settings it recorded, like its training data.
+        """
+        models_dir = models_dir or config.paths["models"]
+        model_name = model_name or default_model_name(models_dir)
+        start = time.perf_counter()
+        path = bundle_path(models_dir, model_name)
+        if os.path.isfile(os.path.join(path, BUNDLE_META_FILE)):
+            model, featurizer, meta = load_bundle(path)
+            processor = TextPreprocessor(text_config=bundle_text_config(meta))
+            source = "bundle"
+        else:
+            featurizer_file = STREAMING_FEATURIZER_FILE if model_name in STREAMING_MODELS else FEATURE_BUILDER_FILE
+            model = joblib.load(os.path.join(models_dir, f"{model_name}.joblib"))
+            featurizer = joblib.load(os.path.join(models_dir, featurizer_file))
+            processor, source = None, "joblib"
+        predictor = cls(model, featurizer, processor, model_name=model_name)
+        logger.info(f"Loaded {model_name} ({source}) from {models_dir} in {time.perf_counter() - start:.3f}s "
+                    f"({len(predictor.classes)} labels)")
+        if warmup:
+            predictor.warmup()
+        return predictor
+
+    def warmup(self) -> None:
+        """Load NLTK resources and run one prediction so later calls pay no setup cost."""
+        start = time.perf_counter()
+        self._predict([WARMUP_RECORD])
+        logger.info(f"Predictor warmed up in {time.perf_counter() - start:.2f}s")
+
+    def validate(self, record) -> dict:
+        """Check that a record is a JSON object of text fields; raise ValueError otherwise."""
+        if not isinstance(record, dict):
+            raise ValueError(f"A record must be an object with the fields {self.raw_columns}")
+        for col in self.raw_columns:
+            value = record.get(col)
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"Field '{col}' must be a string")
+        return record
+
+    def prepare(self, records: list) -> pd.DataFrame:
+        """Build the *_clean columns of records with the TextPreprocessor."""
+        data = {}
+        for raw_col, clean_col in zip(self.raw_columns, self.featurizer.text_columns):
+            texts = pd.Series([record.get(raw_col) or "" for record in records], dtype=object)
+            data[clean_col] = self.processor.preprocess_series(texts).to_numpy(dtype=object)
+        return pd.DataFrame(data)
+
+    def predict(self, records: list) -> list:
+        """
+        Predict the label of every record.
+
+        Returns:
+            list: One {'label', 'confidence'} dict per record; confidence is
+            None for models without predict_proba.
+        """
+        start = time.perf_counter_ns()
+        for record in records:
+            self.validate(record)
+        results = self._predict(records)
+        self.stats.record(time.perf_counter_ns() - start, len(records))
+        return results
+
+    def predict_one(self, record: dict) -> dict:
+        """Predict the label of a single record."""
+        return self.predict([record])[0]
+
+    def features(self, records: list):
+        """Return the feature matrix of records."""
+        df = self.prepare(records)
+        dense = None
+        if getattr(self.featurizer, "use_dense", False):
+            # Word and sentence counts with the tokenizer that built the *_clean columns
+            dense = extract_feature_matrix(df, self.featurizer.text_columns,
+                                           tokenizer=self.processor.text_config.tokenizer)
+        return self.featurizer.transform(df, dense)
+
+    def _predict(self, records: list) -> list:
+        if not records:
+            return []
+        X = self.features(records)
+        if hasattr(self.model, "predict_proba"):
+            probabilities = self.model.predict_proba(X)
+            best = probabilities.argmax(axis=1)
+            return [{"label": label, "confidence": float(p)}
+                    for label, p in zip(self.classes[best], probabilities[np.arange(len(best)), best])]
+        return [{"label": str(label), "confidence": None} for label in self.model.predict(X)]
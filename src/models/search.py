@@ -0,0 +1,292 @@
+"""
+search.py
+---------------------------------------------------
+Hyperparameter search over config.model.search_spaces.
+
+Only rows of the training split (assign_splits) are
+used, so the validation and test splits stay unseen.
+They are split into stratified CV folds; for every
+fold the feature builder is fitted once and its
+matrices are cached on disk (config.paths["cache"]),
+so every candidate reuses the same transforms and a
+later search on the same data skips tokenization.
+
+Candidates go through successive halving: each round
+fits every surviving candidate on every fold with a
+growing number of training rows, and only the best
+1/factor go on to the next round, so weak candidates
+never get the full budget. Fits run in parallel
+worker processes. The trials, the best candidates
+and the timings are saved to results/search_<ts>.json.
+---------------------------------------------------
+"""
+
+import os
+import json
+import math
+import time
+import shutil
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from src.features.sparse_features import SparseFeatureBuilder
+from src.features import run_text_features
+from src.models.train import MODELS, assign_splits, build_model, evaluate, load_training_frame
+from src.utils.config import config
+from src.utils.helpers import save_json
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# Marker written last in a fold cache directory, once every fold is saved
+FOLDS_FILE = "folds.json"
+# Smallest number of training rows per label in a successive halving round
+MIN_ROWS_PER_LABEL = 10
+
+
+def candidates(model_names: list = None, spaces: dict = None) -> list:
+    """Return every (model, params) combination of the search spaces."""
+    model_names = model_names or config.model.models
+    spaces = config.model.search_spaces if spaces is None else spaces
+    return [{"model": name, "params": params}
+            for name in model_names
+            for params in ParameterGrid(spaces.get(name, {}))]
+
+
+def _fold_cache_key(df: pd.DataFrame, n_folds: int, builder: SparseFeatureBuilder) -> str:
+    """Hash of the data, the folds and the feature settings."""
+    digest = hashlib.blake2b(digest_size=16)
+    columns = [*builder.text_columns, config.model.label_column]
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    settings = {"folds": n_folds, "seed": config.constants["random_seed"], "kind": builder.kind,
+                "params": builder.params, "use_dense": builder.use_dense,
+                "vectorizer": getattr(config.model, builder.kind)}
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prepare_folds(df: pd.DataFrame, dense: np.ndarray = None, n_folds: int = None,
+                  builder: SparseFeatureBuilder = None, cache_dir: str = None) -> tuple:
+    """
+    Fit the feature builder on every stratified fold and cache its matrices.
+
+    The training rows of each fold are stored in a fixed random order, so
+    successive halving rounds can train on growing prefixes of them.
+
+    Returns:
+        tuple: (fold cache directory, whether it was already cached).
+    """
+    n_folds = n_folds or config.model.search["cv_folds"]
+    builder = builder or SparseFeatureBuilder()
+    cache_dir = cache_dir or os.path.join(config.paths["cache"], "search")
+    fold_dir = os.path.join(cache_dir, _fold_cache_key(df, n_folds, builder))
+    if os.path.isfile(os.path.join(fold_dir, FOLDS_FILE)):
+        logger.info(f"Reusing cached fold features from {fold_dir}")
+        return fold_dir, True
+
+    # Folds are written to a temporary directory, renamed once complete
+    temporary = fold_dir + ".tmp"
+    shutil.rmtree(temporary, ignore_errors=True)
+    os.makedirs(temporary)
+    labels = df[config.model.label_column].astype(str).to_numpy(dtype=str)
+    seed = config.constants["random_seed"]
+    rng = np.random.default_rng(seed)
+    folds = StratifiedKFold(n_folds, shuffle=True, random_state=seed)
+    train_sizes = []
+    for k, (train_rows, validation_rows) in enumerate(folds.split(np.zeros(len(labels)), labels)):
+        train_rows = rng.permutation(train_rows)
+        fold_builder = SparseFeatureBuilder(builder.text_columns, builder.kind, builder.use_dense, builder.params)
+        X_train = fold_builder.fit_transform(df.iloc[train_rows], None if dense is None else dense[train_rows])
+        X_validation = fold_builder.transform(df.iloc[validation_rows],
+                                              None if dense is None else dense[validation_rows])
+        sp.save_npz(os.path.join(temporary, f"fold_{k}_train.npz"), X_train, compressed=False)
+        sp.save_npz(os.path.join(temporary, f"fold_{k}_validation.npz"), X_validation, compressed=False)
+        np.save(os.path.join(temporary, f"fold_{k}_train_labels.npy"), labels[train_rows])
+        np.save(os.path.join(temporary, f"fold_{k}_validation_labels.npy"), labels[validation_rows])
+        joblib.dump(fold_builder, os.path.join(temporary, f"fold_{k}_builder.joblib"))
+        train_sizes.append(len(train_rows))
+        logger.info(f"Fold {k + 1}/{n_folds}: {X_train.shape[0]} train rows, {X_train.shape[1]} features")
+    save_json({"folds": n_folds, "rows": len(df), "train_rows": train_sizes},
+              os.path.join(temporary, FOLDS_FILE))
+    shutil.rmtree(fold_dir, ignore_errors=True)
+    os.replace(temporary, fold_dir)
+    return fold_dir, False
+
+
+# Loaded once per process and fold, then reused by every candidate
+@lru_cache(maxsize=None)
+def _load_fold(fold_dir: str, fold: int) -> tuple:
+    prefix = os.path.join(fold_dir, f"fold_{fold}")
+    return (sp.load_npz(f"{prefix}_train.npz"), np.load(f"{prefix}_train_labels.npy"),
+            sp.load_npz(f"{prefix}_validation.npz"), np.load(f"{prefix}_validation_labels.npy"))
+
+
+def evaluate_candidate(task: tuple) -> dict:
+    """Fit one candidate on the first rows of a fold's training part and score it."""
+    fold_dir, candidate_id, model_name, params, fold, rows = task
+    X_train, y_train, X_validation, y_validation = _load_fold(fold_dir, fold)
+    # One process per fit: the models themselves run single-threaded
+    model = build_model(model_name, n_jobs=1).set_params(**params)
+    trial = {"candidate": candidate_id, "fold": fold, "rows": rows}
+    start = time.perf_counter()
+    try:
+        model.fit(X_train[:rows], y_train[:rows])
+    except ValueError as error:
+        logger.warning(f"Candidate {candidate_id} failed on fold {fold}: {error}")
+        return {**trial, "fit_seconds": time.perf_counter() - start, "error": str(error)}
+    trial["fit_seconds"] = time.perf_counter() - start
+    trial.update(evaluate(model, X_validation, y_validation))
+    return trial
+
+
+def successive_halving(candidate_list: list, fold_dir: str, executor: ProcessPoolExecutor = None,
+                       factor: int = None, rounds: int = None, scoring: str = None) -> tuple:
+    """
+    Score the candidates round by round, keeping the best 1/factor each time.
+
+    Returns:
+        tuple: (trials, per-round summaries, ranking of the last round as
+        (candidate id, mean score, std) tuples, best first).
+    """
+    settings = config.model.search
+    factor = factor or settings["factor"]
+    scoring = scoring or settings["scoring"]
+    rounds = rounds or settings["rounds"]
+    # No more rounds than needed to get down to one candidate
+    if len(candidate_list) > 1:
+        rounds = min(rounds, 1 + math.ceil(math.log(len(candidate_list), factor)))
+    else:
+        rounds = 1
+    with open(os.path.join(fold_dir, FOLDS_FILE), encoding="utf-8") as f:
+        folds = json.load(f)
+    n_folds, max_rows = folds["folds"], min(folds["train_rows"])
+    n_labels = len(np.unique(_load_fold(fold_dir, 0)[1]))
+    min_rows = min(max_rows, MIN_ROWS_PER_LABEL * n_labels)
+    map_tasks = executor.map if executor is not None else map
+
+    survivors = list(range(len(candidate_list)))
+    trials, summaries = [], []
+    for r in range(rounds):
+        rows = max(min_rows, max_rows // factor ** (rounds - 1 - r))
+        tasks = [(fold_dir, i, candidate_list[i]["model"], candidate_list[i]["params"], fold, rows)
+                 for i in survivors for fold in range(n_folds)]
+        start = time.perf_counter()
+        round_trials = list(map_tasks(evaluate_candidate, tasks))
+        elapsed = time.perf_counter() - start
+        for trial in round_trials:
+            trial["round"] = r
+        trials.extend(round_trials)
+
+        scores = {i: [] for i in survivors}
+        for trial in round_trials:
+            scores[trial["candidate"]].append(trial.get(scoring, np.nan))
+        # Failed fits make the mean NaN, which ranks last
+        ranking = sorted(((i, float(np.mean(s)), float(np.std(s))) for i, s in scores.items()),
+                         key=lambda item: -np.inf if np.isnan(item[1]) else item[1], reverse=True)
+        keep = len(survivors) if r == rounds - 1 else max(1, math.ceil(len(survivors) / factor))
+        summaries.append({"round": r, "rows": rows, "candidates": len(survivors),
+                          "fits": len(tasks), "seconds": elapsed, "kept": keep})
+        logger.info(f"Round {r + 1}/{rounds}: {len(survivors)} candidates x {n_folds} folds on {rows} rows "
+                    f"in {elapsed:.2f}s, best {scoring} {ranking[0][1]:.4f}")
+        survivors = [i for i, _, _ in ranking[:keep]]
+    return trials, summaries, ranking
+
+
+def search(df: pd.DataFrame, dense: np.ndarray = None, model_names: list = None, spaces: dict = None,
+           n_jobs: int = None, builder: SparseFeatureBuilder = None, cache_dir: str = None,
+           results_dir: str = None) -> dict:
+    """
+    Run the hyperparameter search on the training split of df.
+
+    Args:
+        df (pd.DataFrame): Text, label and split columns.
+        dense (np.ndarray): Dense text features of df's rows (optional).
+        model_names (list): Models searched (default: config.model.models).
+        spaces (dict): Model -> {param: values} (default: config.model.search_spaces).
+        n_jobs (int): Worker processes (default: config.model.search['n_jobs']).
+        builder (SparseFeatureBuilder): Unfitted builder with the feature settings.
+        cache_dir (str): Directory of the fold caches.
+        results_dir (str): Directory of the report (default: config.paths["results"]).
+
+    Returns:
+        dict: The search report.
+    """
+    settings = config.model.search
+    n_jobs = settings["n_jobs"] if n_jobs is None else n_jobs
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    candidate_list = candidates(model_names, spaces)
+    if not candidate_list:
+        raise ValueError("No candidates to search; check config.model.search_spaces")
+
+    in_train = np.flatnonzero(assign_splits(df) == "train")
+    df = df.iloc[in_train].reset_index(drop=True)
+    dense = None if dense is None else np.asarray(dense[in_train])
+    start = time.perf_counter()
+    fold_dir, cached = prepare_folds(df, dense, settings["cv_folds"], builder, cache_dir)
+    features_seconds = time.perf_counter() - start
+
+    logger.info(f"Searching {len(candidate_list)} candidates on {len(df)} training rows with {n_jobs} jobs")
+    start = time.perf_counter()
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            trials, rounds, ranking = successive_halving(candidate_list, fold_dir, executor)
+    else:
+        trials, rounds, ranking = successive_halving(candidate_list, fold_dir)
+    search_seconds = time.perf_counter() - start
+
+    scoring = settings["scoring"]
+    final = [{**candidate_list[i], f"mean_{scoring}": mean, f"std_{scoring}": std}
+             for i, mean, std in ranking]
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "rows": len(df),
+        "folds": settings["cv_folds"],
+        "factor": settings["factor"],
+        "scoring": scoring,
+        "n_jobs": n_jobs,
+        "candidates": candidate_list,
+        "best": final[0],
+        "final_round": final,
+        "rounds": rounds,
+        "trials": trials,
+        "timings": {"features_seconds": features_seconds, "features_cached": cached,
+                    "search_seconds": search_seconds,
+                    "fit_seconds": sum(trial["fit_seconds"] for trial in trials)},
+    }
+    results_dir = results_dir or config.paths["results"]
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"search_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_json(report, path)
+    logger.info(f"Best: {final[0]['model']} {final[0]['params']} "
+                f"({scoring} {final[0][f'mean_{scoring}']:.4f}); report saved to {path}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the hyperparameters of the configured models.")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=config.model.models)
+    parser.add_argument("--vectorizer", choices=["tfidf", "hashing"], default=config.model.vectorizer)
+    parser.add_argument("--n-jobs", type=int, default=config.model.search["n_jobs"])
+    args = parser.parse_args()
+
+    df = load_training_frame()
+    dense = None
+    if config.model.use_dense_features:
+        dense, _ = run_text_features.load_feature_matrix()
+        if len(dense) != len(df):
+            raise ValueError(f"Feature matrix has {len(dense)} rows, data has {len(df)}; "
+                             "run run_text_features first")
+    search(df, dense, args.models, n_jobs=args.n_jobs, builder=SparseFeatureBuilder(kind=args.vectorizer))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+serve.py
+---------------------------------------------------
+Local HTTP inference service (stdlib asyncio only).
+
+Concurrent requests are micro-batched: MicroBatcher
+queues every record and a single task scores up to
+max_batch_size of them together, waiting at most
+max_wait_ms for a batch to fill. Scoring runs in a
+worker thread so the event loop keeps accepting
+requests meanwhile.
+
+Endpoints:
+    POST /predict  {"question": ..., "context": ..., "answer": ...}
+                   or {"instances": [record, ...]}
+    GET  /stats    request/batch counters, p50/p99 latency, throughput
+    GET  /health
+
+Usage:
+    python -m src.models.serve --port 8000
+---------------------------------------------------
+"""
+
+import json
+import time
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from src.models.predict import LatencyCounter, Predictor
+from src.utils.config import config
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Group concurrent prediction requests into batches.
+
+    Attributes:
+        predictor (Predictor): Scores the batches.
+        max_batch_size (int): Largest number of records per batch.
+        max_wait (float): Seconds the first record of a batch waits for others.
+        requests (LatencyCounter): Per-request latency, queueing included.
+        batches (LatencyCounter): Per-batch scoring time and records scored.
+    """
+
+    def __init__(self, predictor: Predictor, max_batch_size: int = None, max_wait_ms: float = None):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size or config.serving.max_batch_size
+        self.max_wait = (config.serving.max_wait_ms if max_wait_ms is None else max_wait_ms) / 1000
+        self.requests = LatencyCounter()
+        self.batches = LatencyCounter()
+        self._queue = None
+        self._task = None
+        # One scoring thread: batches run one after the other
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predictor")
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def predict(self, records: list) -> list:
+        """Queue the records of one request and wait for their predictions."""
+        start = time.perf_counter_ns()
+        for record in records:
+            self.predictor.validate(record)
+        loop = asyncio.get_running_loop()
+        futures = []
+        for record in records:
+            future = loop.create_future()
+            self._queue.put_nowait((record, future))
+            futures.append(future)
+        results = await asyncio.gather(*futures)
+        self.requests.record(time.perf_counter_ns() - start, len(records))
+        return results
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            records = [record for record, _ in batch]
+            start = time.perf_counter_ns()
+            try:
+                results = await loop.run_in_executor(self._executor, self.predictor.predict, records)
+            except Exception as error:
+                logger.exception("Prediction failed")
+                results = [error] * len(batch)
+            self.batches.record(time.perf_counter_ns() - start, len(batch))
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def stats(self) -> dict:
+        requests, batches = self.requests.snapshot(), self.batches.snapshot()
+        batches["mean_size"] = batches["items"] / batches["count"] if batches["count"] else 0.0
+        return {"requests": requests, "batches": batches}
+
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status and a JSON message."""
+
+    def __init__(self, status: HTTPStatus, message: str = None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class InferenceServer:
+    """
+    Minimal HTTP/1.1 server (keep-alive, JSON bodies) in front of a MicroBatcher.
+
+    Attributes:
+        batcher (MicroBatcher): Batches and scores the requests.
+        host (str): Listening address.
+        port (int): Listening port; 0 picks a free one, set by start().
+    """
+
+    def __init__(self, predictor: Predictor, host: str = None, port: int = None,
+                 max_batch_size: int = None, max_wait_ms: float = None):
+        self.batcher = MicroBatcher(predictor, max_batch_size, max_wait_ms)
+        self.host = host or config.serving.host
+        self.port = config.serving.port if port is None else port
+        self._server = None
+
+    async def start(self) -> "InferenceServer":
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving {self.batcher.predictor.model_name} on http://{self.host}:{self.port}")
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version != "HTTP/1.0")
+                try:
+                    length = int(headers.get("content-length", 0))
+                    if length > config.serving.max_body_bytes:
+                        keep_alive = False
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = HTTPStatus.OK, await self._route(method, path, body)
+                except HTTPError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except Exception:
+                    logger.exception(f"Error handling {method} {path}")
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+                self._write(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            # Malformed request line or client gone
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> dict:
+        routes = {"/predict": "POST", "/stats": "GET", "/health": "GET"}
+        path = path.split("?", 1)[0]
+        if path not in routes:
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        if method != routes[path]:
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+        if path == "/health":
+            return {"status": "ok", "model": self.batcher.predictor.model_name}
+        if path == "/stats":
+            return {**self.batcher.stats(), "predictor": self.batcher.predictor.stats.snapshot()}
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        single = not (isinstance(request, dict) and "instances" in request)
+        records = [request] if single else request["instances"]
+        if not isinstance(records, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'instances' must be a list")
+        try:
+            predictions = await self.batcher.predict(records)
+        except ValueError as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(error))
+        return predictions[0] if single else {"predictions": predictions}
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, status: HTTPStatus, payload: dict, keep_alive: bool) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve question type predictions over HTTP.")
+    parser.add_argument("--host", default=config.serving.host)
+    parser.add_argument("--port", type=int, default=config.serving.port)
+    parser.add_argument("--models-dir", default=config.paths["models"])
+    parser.add_argument("--model", default=config.serving.model)
+    parser.add_argument("--max-batch-size", type=int, default=config.serving.max_batch_size)
+    parser.add_argument("--max-wait-ms", type=float, default=config.serving.max_wait_ms)
+    args = parser.parse_args()
+
+    predictor = Predictor.load(args.models_dir, args.model)
+    server = InferenceServer(predictor, args.host, args.port, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+train.py
+---------------------------------------------------
+Train the configured classifiers on the cleaned
+training data.
+
+The *_clean text columns are vectorized into a CSR
+matrix together with the dense text features saved
+by run_text_features (see sparse_features.py).
+Every model in config.model.models is fitted with
+config.model.n_jobs, timed and memory-sampled, then
+evaluated on the validation split and saved to
+config.paths["models"] with the feature builder.
+---------------------------------------------------
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from src.features.sparse_features import SparseFeatureBuilder
+from src.models.bundle import preprocessing_settings, save_bundle
+from src.features import run_text_features
+from src.utils.config import config
+from src.utils.helpers import get_artifact_store, save_json
+from src.utils.telemetry import MemorySampler
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# Artifact with the cleaned training data
+INPUT_ARTIFACT = "train_no_nulls"
+# File names in the models directory
+FEATURE_BUILDER_FILE = "feature_builder.joblib"
+METADATA_FILE = "metadata.json"
+
+# Model name (a key of ModelConfig) -> estimator class
+MODELS = {
+    "logistic_regression": LogisticRegression,
+    "random_forest": RandomForestClassifier,
+}
+# Models whose fitting runs in parallel with n_jobs
+# (LogisticRegression's n_jobs has no effect since scikit-learn 1.8)
+PARALLEL_MODELS = {"random_forest"}
+
+
+def assign_splits(df: pd.DataFrame, columns: list = None) -> np.ndarray:
+    """
+    Assign every row to 'train', 'validation' or 'test' from a hash of its content.
+
+    The split of a row depends only on its values in columns, so it is the
+    same for every trainer and every run, needs no pass over the whole data,
+    and identical rows always land in the same split. Proportions follow
+    config.constants test_size and validation_size.
+    """
+    columns = columns or config.model.split_columns
+    test_size = config.constants["test_size"]
+    validation_size = config.constants["validation_size"]
+    keys = df[columns].astype(str).agg("\x1f".join, axis=1)
+    positions = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+         for key in keys),
+        dtype=np.uint64, count=len(keys),
+    ) / 2.0 ** 64
+    return np.where(positions < test_size, "test",
+                    np.where(positions < test_size + validation_size, "validation", "train"))
+
+
+def build_model(name: str, n_jobs: int = None):
+    """Create an estimator from its ModelConfig hyperparameters."""
+    if name not in MODELS:
+        raise ValueError(f"Unknown model: {name}. Available: {sorted(MODELS)}")
+    params = dict(getattr(config.model, name))
+    if name in PARALLEL_MODELS:
+        params.setdefault("n_jobs", config.model.n_jobs if n_jobs is None else n_jobs)
+    return MODELS[name](**params)
+
+
+def fit_model(model, X, y) -> dict:
+    """Fit a model and return its fit time and memory statistics."""
+    sampler = MemorySampler()
+    start_mb = sampler.start().peak_mb
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    model.fit(X, y)
+    stats = {
+        "fit_seconds": time.perf_counter() - wall_start,
+        "cpu_seconds": time.process_time() - cpu_start,
+    }
+    peak_mb = sampler.stop()
+    stats["peak_rss_mb"] = peak_mb
+    stats["rss_growth_mb"] = peak_mb - start_mb
+    return stats
+
+
+def evaluate(model, X, y) -> dict:
+    """Accuracy and macro F1 of a model on a labelled matrix."""
+    if X.shape[0] == 0:
+        return {}
+    predictions = model.predict(X)
+    return {"accuracy": accuracy_score(y, predictions),
+            "macro_f1": f1_score(y, predictions, average="macro")}
+
+
+def load_training_frame(store=None) -> pd.DataFrame:
+    """Read the columns needed for training from the cleaned data artifact."""
+    store = store or get_artifact_store("processed_data")
+    columns = list(dict.fromkeys(
+        [*config.model.text_columns, config.model.label_column, *config.model.split_columns]
+    ))
+    return store.read(INPUT_ARTIFACT, columns=columns)
+
+
+def train(df: pd.DataFrame, dense: np.ndarray = None, model_names: list = None,
+          builder: SparseFeatureBuilder = None, n_jobs: int = None,
+          models_dir: str = None, preprocessing: dict = None) -> dict:
+    """
+    Fit, evaluate and save every model.
+
+    Args:
+        df (pd.DataFrame): Text, label and split columns.
+        dense (np.ndarray): Dense text features of df's rows (optional).
+        model_names (list): Models to fit (default: config.model.models).
+        builder (SparseFeatureBuilder): Feature builder to fit.
+        n_jobs (int): Parallel jobs per model (default: config.model.n_jobs).
+        models_dir (str): Output directory (default: config.paths["models"]).
+        preprocessing (dict): Text settings the *_clean columns were produced
+            with, recorded in the model bundles (default: config.text).
+
+    Returns:
+        dict: Training report with the statistics of every model.
+    """
+    model_names = model_names or config.model.models
+    builder = builder or SparseFeatureBuilder()
+    models_dir = models_dir or config.paths["models"]
+    os.makedirs(models_dir, exist_ok=True)
+
+    splits = assign_splits(df)
+    train_rows, validation_rows = np.flatnonzero(splits == "train"), np.flatnonzero(splits == "validation")
+    labels = df[config.model.label_column].astype(str).to_numpy()
+    logger.info(f"Rows: {len(train_rows)} train, {len(validation_rows)} validation, "
+                f"{int((splits == 'test').sum())} test")
+
+    start = time.perf_counter()
+    X_train = builder.fit_transform(df.iloc[train_rows], None if dense is None else dense[train_rows])
+    X_validation = builder.transform(df.iloc[validation_rows],
+                                     None if dense is None else dense[validation_rows])
+    logger.info(f"Features: {X_train.shape[1]} columns, {X_train.nnz} non-zeros in "
+                f"{time.perf_counter() - start:.2f}s")
+    joblib.dump(builder, os.path.join(models_dir, FEATURE_BUILDER_FILE))
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "rows": {"train": len(train_rows), "validation": len(validation_rows),
+                 "test": int((splits == "test").sum())},
+        "n_features": int(X_train.shape[1]),
+        "vectorizer": builder.kind,
+        "labels": sorted(set(labels[train_rows])),
+        "models": {},
+    }
+    for name in model_names:
+        model = build_model(name, n_jobs)
+        logger.info(f"Fitting {name}...")
+        stats = fit_model(model, X_train, labels[train_rows])
+        stats.update(evaluate(model, X_validation, labels[validation_rows]))
+        path = os.path.join(models_dir, f"{name}.joblib")
+        joblib.dump(model, path)
+        save_bundle(model, builder, models_dir, name, preprocessing)
+        stats["size_mb"] = os.path.getsize(path) / (1024 * 1024)
+        logger.info(f"{name}: fit in {stats['fit_seconds']:.2f}s (cpu {stats['cpu_seconds']:.2f}s), "
+                    f"peak RSS {stats['peak_rss_mb']:.0f} MB, "
+                    f"validation accuracy {stats.get('accuracy', float('nan')):.4f}")
+        report["models"][name] = stats
+
+    save_json(report, os.path.join(models_dir, METADATA_FILE))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the configured models.")
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=config.model.models)
+    parser.add_argument("--vectorizer", choices=["tfidf", "hashing"], default=config.model.vectorizer)
+    parser.add_argument("--n-jobs", type=int, default=config.model.n_jobs)
+    args = parser.parse_args()
+
+    store = get_artifact_store("processed_data")
+    df = load_training_frame(store)
+    dense = None
+    if config.model.use_dense_features:
+        dense, _ = run_text_features.load_feature_matrix()
+        if len(dense) != len(df):
+            raise ValueError(f"Feature matrix has {len(dense)} rows, data has {len(df)}; "
+                             "run run_text_features first")
+    report = train(df, dense, args.models, SparseFeatureBuilder(kind=args.vectorizer), args.n_jobs,
+                   preprocessing=preprocessing_settings(store, INPUT_ARTIFACT))
+
+    os.makedirs(config.paths["results"], exist_ok=True)
+    path = os.path.join(config.paths["results"], f"training_report_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    logger.info(f"Training report saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+train_streaming.py
+---------------------------------------------------
+Out-of-core training: the cleaned training data is
+streamed in chunks, every chunk is vectorized with
+the stateless StreamingFeaturizer and fed to the
+model's partial_fit, so memory does not grow with
+the size of the corpus.
+
+Rows go to the same train/validation/test splits as
+in train.py (assign_splits) and the label set is the
+one the batch trainer sees. A checkpoint is written
+every few chunks; an interrupted run resumes from
+the last one, in the middle of an epoch if needed.
+---------------------------------------------------
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from typing import Iterator
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.metrics import accuracy_score, f1_score
+from src.features.sparse_features import StreamingFeaturizer
+from src.models.bundle import preprocessing_settings, save_bundle
+from src.models.train import INPUT_ARTIFACT, assign_splits
+from src.utils.config import config
+from src.utils.helpers import get_artifact_store, save_json
+from src.utils.telemetry import MemorySampler
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+# Model name (a key of ModelConfig) -> estimator class with partial_fit
+STREAMING_MODELS = {
+    "sgd_classifier": SGDClassifier,
+    "multinomial_nb": MultinomialNB,
+}
+CHECKPOINT_FILE = "streaming_checkpoint.joblib"
+FEATURIZER_FILE = "streaming_featurizer.joblib"
+METADATA_FILE = "streaming_metadata.json"
+
+
+def build_streaming_model(name: str):
+    """Create an estimator supporting partial_fit from its ModelConfig hyperparameters."""
+    if name not in STREAMING_MODELS:
+        raise ValueError(f"Unknown streaming model: {name}. Available: {sorted(STREAMING_MODELS)}")
+    return STREAMING_MODELS[name](**getattr(config.model, name))
+
+
+def _columns() -> list:
+    return list(dict.fromkeys(
+        [*config.model.text_columns, config.model.label_column, *config.model.split_columns]
+    ))
+
+
+def rechunk(chunks, rows: int) -> Iterator[pd.DataFrame]:
+    """Regroup DataFrame chunks into chunks of exactly rows rows (the last may be shorter)."""
+    pending = []
+    size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        size += len(chunk)
+        while size >= rows:
+            merged = pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0]
+            yield merged.iloc[:rows].reset_index(drop=True)
+            pending, size = [merged.iloc[rows:]], size - rows
+    if size:
+        yield pd.concat(pending, ignore_index=True) if len(pending) > 1 else pending[0].reset_index(drop=True)
+
+
+def collect_labels(store, name: str = INPUT_ARTIFACT, chunk_rows: int = 200_000) -> list:
+    """Sorted labels of the training split, as seen by the batch trainer."""
+    columns = list(dict.fromkeys([config.model.label_column, *config.model.split_columns]))
+    labels = set()
+    for chunk in store.iter_chunks(name, chunk_rows, columns=columns):
+        in_train = assign_splits(chunk) == "train"
+        labels.update(chunk[config.model.label_column].astype(str)[in_train].unique())
+    return sorted(labels)
+
+
+class StreamingTrainer:
+    """
+    Train a partial_fit model over the chunks of an artifact, with checkpoints.
+
+    Attributes:
+        store: Artifact store holding the cleaned data.
+        model_name (str): Key of STREAMING_MODELS.
+        featurizer (StreamingFeaturizer): Stateless chunk vectorizer.
+        chunk_rows (int): Rows per partial_fit call.
+        epochs (int): Passes over the data.
+        checkpoint_every (int): Chunks between checkpoints.
+        models_dir (str): Directory of the checkpoint and the final model.
+        dense (np.ndarray): Optional dense features aligned with the artifact
+            rows (e.g. the memory-mapped run_text_features matrix).
+    """
+
+    def __init__(self, store=None, model_name: str = None, featurizer: StreamingFeaturizer = None,
+                 chunk_rows: int = None, epochs: int = None, checkpoint_every: int = None,
+                 models_dir: str = None, dense: np.ndarray = None, input_name: str = INPUT_ARTIFACT):
+        settings = config.model.streaming
+        self.store = store or get_artifact_store("processed_data")
+        self.model_name = model_name or settings["model"]
+        self.featurizer = featurizer or StreamingFeaturizer()
+        self.chunk_rows = chunk_rows or settings["chunk_rows"]
+        self.epochs = epochs or settings["epochs"]
+        self.checkpoint_every = checkpoint_every or settings["checkpoint_every"]
+        self.models_dir = models_dir or config.paths["models"]
+        self.dense = dense
+        self.input_name = input_name
+        self.checkpoint_path = os.path.join(self.models_dir, CHECKPOINT_FILE)
+
+    def _signature(self) -> dict:
+        """Settings a checkpoint must share with the current run to be resumed."""
+        return {
+            "model": self.model_name,
+            "params": getattr(config.model, self.model_name),
+            "chunk_rows": self.chunk_rows,
+            "featurizer": self.featurizer.vectorizer.get_params(),
+            "text_columns": self.featurizer.text_columns,
+            "use_dense": self.featurizer.use_dense,
+            "rows": self.store.num_rows(self.input_name),
+        }
+
+    def _new_state(self) -> dict:
+        return {
+            "signature": self._signature(),
+            "model": build_streaming_model(self.model_name),
+            "classes": collect_labels(self.store, self.input_name),
+            "epoch": 0,
+            "next_row": 0,
+            "rows_trained": 0,
+        }
+
+    def load_state(self, resume: bool = True) -> dict:
+        """Load the checkpoint if it matches the current settings, else start over."""
+        if resume and os.path.isfile(self.checkpoint_path):
+            state = joblib.load(self.checkpoint_path)
+            if json.dumps(state["signature"], default=str) == json.dumps(self._signature(), default=str):
+                logger.info(f"Resuming from checkpoint: epoch {state['epoch']}, row {state['next_row']}")
+                return state
+            logger.warning("Checkpoint was made with different settings or data; starting over")
+        return self._new_state()
+
+    def save_checkpoint(self, state: dict) -> None:
+        """Write the checkpoint atomically, so an interruption never leaves a partial file."""
+        os.makedirs(self.models_dir, exist_ok=True)
+        temporary = self.checkpoint_path + ".tmp"
+        joblib.dump(state, temporary)
+        os.replace(temporary, self.checkpoint_path)
+
+    def _chunks(self, start_row: int) -> Iterator[tuple]:
+        """Yield (first row, chunk) pairs from start_row on."""
+        chunks = self.store.iter_chunks(self.input_name, self.chunk_rows, columns=_columns(),
+                                        start_row=start_row)
+        row = start_row
+        for chunk in rechunk(chunks, self.chunk_rows):
+            yield row, chunk
+            row += len(chunk)
+
+    def _transform(self, chunk: pd.DataFrame, row: int, mask: np.ndarray):
+        dense = None
+        if self.dense is not None and self.featurizer.use_dense:
+            dense = np.asarray(self.dense[row:row + len(chunk)])[mask]
+        return self.featurizer.transform(chunk[mask], dense)
+
+    def fit(self, resume: bool = True, max_chunks: int = None) -> dict:
+        """
+        Train until all epochs are done, or until max_chunks chunks were trained.
+
+        Returns:
+            dict: The training state; state['done'] tells whether all epochs ran.
+        """
+        state = self.load_state(resume)
+        model, classes = state["model"], np.array(state["classes"])
+        chunks_done = 0
+        while state["epoch"] < self.epochs:
+            for row, chunk in self._chunks(state["next_row"]):
+                in_train = assign_splits(chunk) == "train"
+                if in_train.any():
+                    X = self._transform(chunk, row, in_train)
+                    y = chunk[config.model.label_column].astype(str).to_numpy()[in_train]
+                    model.partial_fit(X, y, classes=classes)
+                    state["rows_trained"] += int(in_train.sum())
+                state["next_row"] = row + len(chunk)
+                chunks_done += 1
+                if chunks_done % self.checkpoint_every == 0:
+                    self.save_checkpoint(state)
+                if max_chunks is not None and chunks_done >= max_chunks:
+                    self.save_checkpoint(state)
+                    state["done"] = False
+                    return state
+            logger.info(f"Epoch {state['epoch'] + 1}/{self.epochs} done, "
+                        f"{state['rows_trained']} rows trained so far")
+            state["epoch"] += 1
+            state["next_row"] = 0
+            self.save_checkpoint(state)
+        state["done"] = True
+        return state
+
+    def evaluate(self, model, split: str = "validation") -> dict:
+        """Accuracy and macro F1 on one split, streaming over the data."""
+        y_true, y_pred = [], []
+        for row, chunk in self._chunks(0):
+            mask = assign_splits(chunk) == split
+            if mask.any():
+                y_true.append(chunk[config.model.label_column].astype(str).to_numpy()[mask])
+                y_pred.append(model.predict(self._transform(chunk, row, mask)))
+        if not y_true:
+            return {}
+        y_true, y_pred = np.concatenate(y_true), np.concatenate(y_pred)
+        return {"accuracy": accuracy_score(y_true, y_pred),
+                "macro_f1": f1_score(y_true, y_pred, average="macro")}
+
+    def run(self, resume: bool = True, max_chunks: int = None) -> dict:
+        """Train, evaluate and save the model; return the training report."""
+        sampler = MemorySampler()
+        sampler.start()
+        start = time.perf_counter()
+        state = self.fit(resume, max_chunks)
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "model": self.model_name,
+            "done": state["done"],
+            "epoch": state["epoch"],
+            "rows_trained": state["rows_trained"],
+            "labels": list(state["classes"]),
+            "fit_seconds": time.perf_counter() - start,
+        }
+        if state["done"]:
+            report.update(self.evaluate(state["model"]))
+            os.makedirs(self.models_dir, exist_ok=True)
+            joblib.dump(state["model"], os.path.join(self.models_dir, f"{self.model_name}.joblib"))
+            joblib.dump(self.featurizer, os.path.join(self.models_dir, FEATURIZER_FILE))
+            save_bundle(state["model"], self.featurizer, self.models_dir, self.model_name,
+                        preprocessing_settings(self.store, self.input_name))
+            os.remove(self.checkpoint_path)
+        report["peak_rss_mb"] = sampler.stop()
+        if state["done"]:
+            save_json(report, os.path.join(self.models_dir, METADATA_FILE))
+        logger.info(f"Streaming training of {self.model_name}: {report['rows_trained']} rows in "
+                    f"{report['fit_seconds']:.2f}s, peak RSS {report['peak_rss_mb']:.0f} MB"
+                    + (f", validation accuracy {report['accuracy']:.4f}" if "accuracy" in report else ""))
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a model out of core with partial_fit.")
+    parser.add_argument("--model", choices=sorted(STREAMING_MODELS), default=config.model.streaming["model"])
+    parser.add_argument("--epochs", type=int, default=config.model.streaming["epochs"])
+    parser.add_argument("--chunk-rows", type=int, default=config.model.streaming["chunk_rows"])
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint.")
+    parser.add_argument("--max-chunks", type=int, default=None,
+                        help="Stop (after checkpointing) once this many chunks were trained.")
+    args = parser.parse_args()
+
+    trainer = StreamingTrainer(model_name=args.model, epochs=args.epochs, chunk_rows=args.chunk_rows)
+    report = trainer.run(resume=not args.no_resume, max_chunks=args.max_chunks)
+    os.makedirs(config.paths["results"], exist_ok=True)
+    path = os.path.join(config.paths["results"],
+                        f"streaming_training_report_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    logger.info(f"Training report saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+run_pipeline.py
+---------------------------------------------------
+Run preprocessing, cleaning and feature extraction
+as one incremental pipeline. Stages whose inputs,
+code and parameters are unchanged are skipped, and
+lines appended to train.json are the only ones
+preprocessed again. Time, memory and throughput of
+every stage are saved as a run report in results/.
+---------------------------------------------------
+"""
+
+import argparse
+import logging
+from dataclasses import asdict
+from src.data import implementation_preprocessor, data_cleaning
+from src.features import run_text_features
+from src.utils.config import config
+from src.utils.helpers import get_artifact_store
+from src.utils.pipeline import Stage, StageRun, PipelineRunner
+from src.utils.profiling import profiler, enable_profiling
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+
+def _run_preprocessing(run: StageRun) -> int:
+    append_from = None
+    if run.previous_dir is not None:
+        store = get_artifact_store("processed_data")
+        append_from = {"store": type(store)(run.previous_dir, store.storage), "bytes": run.previous_bytes}
+    return implementation_preprocessor.main(append_from=append_from)
+
+
+def build_stages() -> list:
+    """Define the pipeline stages in dependency order."""
+    processed = get_artifact_store("processed_data")
+    features = get_artifact_store("features")
+    storage = asdict(config.storage)
+    return [
+        Stage(
+            name="preprocess",
+            run=_run_preprocessing,
+            inputs=[implementation_preprocessor.INPUT_PATH],
+            appendable_input=implementation_preprocessor.INPUT_PATH,
+            outputs=[processed.path(implementation_preprocessor.OUTPUT_ARTIFACT),
+                     processed.metadata_path(implementation_preprocessor.OUTPUT_ARTIFACT)],
+            code=["src.data.implementation_preprocessor", "src.data.preprocessing", "src.data.tokenizers",
+                  "src.data.data_loader", "src.utils.helpers"],
+            params={"text": asdict(config.text), "storage": storage},
+        ),
+        Stage(
+            name="clean",
+            run=lambda run: data_cleaning.main(),
+            depends_on=["preprocess"],
+            outputs=[processed.path("train_no_nulls"), processed.metadata_path("train_no_nulls")],
+            code=["src.data.data_cleaning", "src.utils.helpers"],
+            params={"storage": storage},
+        ),
+        Stage(
+            name="text_features",
+            run=lambda run: run_text_features.main(),
+            depends_on=["clean"],
+            outputs=[features.path(run_text_features.OUTPUT_NAME), *run_text_features.matrix_paths()],
+            code=["src.features.run_text_features", "src.features.text_features", "src.data.tokenizers",
+                  "src.data.data_loader", "src.utils.helpers"],
+            # word_count / sentence_count depend on the tokenizer backend
+            params={"storage": storage, "tokenizer": config.text.tokenizer},
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the incremental data pipeline.")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if cached.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile timed functions and save a summary to results/.")
+    args = parser.parse_args()
+    if args.profile:
+        enable_profiling()
+    runner = PipelineRunner(build_stages())
+    try:
+        runner.run(force=args.force)
+    finally:
+        runner.report.save()
+        profiler.report(config.profiling.report_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,8 @@ RESULTS_DIR = os.path.join(BASE_DIR, 'results')
 REPORTS_DIR = os.path.join(BASE_DIR, 'reports')
 # FEATURES_DIR is missing in the original code, add it for completeness
 FEATURES_DIR = os.path.join(DATA_DIR, 'features')
+# Content-addressed cache of pipeline stage outputs
+CACHE_DIR = os.path.join(DATA_DIR, 'cache')
 
 # Random seed for reproducibility
 RANDOM_SEED = 42
@@ -38,13 +40,73 @@ class ModelConfig:
         'random_state': RANDOM_SEED
     })
     # Hyperparameters for Logistic Regression model
+    # (multinomial is lbfgs' default; scikit-learn >= 1.8 has no multi_class)
     logistic_regression: dict = field(default_factory=lambda: {
         "solver": "lbfgs",
         "C": 1.0,
         "max_iter": 300,
-        "multi_class": "multinomial",
         "random_state": RANDOM_SEED
     })
+    # Models fitted by src/models/train.py
+    models: list = field(default_factory=lambda: ["logistic_regression", "random_forest"])
+    # Number of parallel jobs used to fit models (-1: all cores)
+    n_jobs: int = -1
+    # Text columns vectorized for the models, and the label column
+    text_columns: list = field(default_factory=lambda: ["question_clean", "context_clean", "answer_clean"])
+    label_column: str = "type"
+    # Columns hashed to assign every row to the train/validation/test split
+    split_columns: list = field(default_factory=lambda: ["question", "context"])
+    # Text vectorizer: 'tfidf' (fitted vocabulary) or 'hashing' (bounded memory)
+    vectorizer: str = "tfidf"
+    # Parameters of TfidfVectorizer
+    tfidf: dict = field(default_factory=lambda: {
+        "max_features": 200_000,
+        "ngram_range": (1, 2),
+        "min_df": 2,
+        "sublinear_tf": True,
+    })
+    # Parameters of HashingVectorizer, followed by a TfidfTransformer
+    # (per text column; linear models keep several copies of n_features weights)
+    hashing: dict = field(default_factory=lambda: {
+        "n_features": 2 ** 18,
+        "ngram_range": (1, 2),
+        "alternate_sign": False,
+    })
+    # Whether to append the dense TextFeatureExtractor features
+    use_dense_features: bool = True
+    # Hyperparameters of the out-of-core models (src/models/train_streaming.py)
+    sgd_classifier: dict = field(default_factory=lambda: {
+        "loss": "log_loss",
+        "alpha": 1e-5,
+        "random_state": RANDOM_SEED
+    })
+    multinomial_nb: dict = field(default_factory=lambda: {
+        "alpha": 0.1
+    })
+    # Out-of-core training: model, rows per partial_fit call, passes over
+    # the data and number of chunks between checkpoints
+    streaming: dict = field(default_factory=lambda: {
+        "model": "sgd_classifier",
+        "chunk_rows": 50_000,
+        "epochs": 1,
+        "checkpoint_every": 10,
+    })
+    # Hyperparameter search spaces (src/models/search.py): every value list
+    # is searched on top of the model's hyperparameters above
+    search_spaces: dict = field(default_factory=lambda: {
+        "logistic_regression": {"C": [0.1, 0.3, 1.0, 3.0, 10.0]},
+        "random_forest": {"n_estimators": [100, 300], "max_depth": [10, 30, None]},
+    })
+    # Hyperparameter search: stratified CV folds, successive halving factor
+    # (1/factor of the candidates survive each round, which gets factor
+    # times more training rows), rounds, scoring metric and worker processes
+    search: dict = field(default_factory=lambda: {
+        "cv_folds": 3,
+        "factor": 3,
+        "rounds": 3,
+        "scoring": "macro_f1",
+        "n_jobs": -1,
+    })
 
 @dataclass
 class TextConfig:
@@ -55,8 +117,66 @@ class TextConfig:
     remove_punctuation: bool = True
     # Minimum word length to keep
     min_word_length: int = 3
+    # Default TextPreprocessor steps: stopword removal, and stemming
+    # instead of lemmatization
+    use_stopwords: bool = True
+    use_stemming: bool = False
     # Language for text processing
     lenguage: str = 'english'
+    # HTML stripping strategy: 'auto' (tiered, same output as 'bs4'),
+    # 'bs4' (always BeautifulSoup) or 'regex' (fastest, approximate)
+    html_strategy: str = 'auto'
+    # Maximum number of entries in the lemmatization/stemming LRU cache
+    token_cache_size: int = 100_000
+    # Tokenizer backend: 'nltk', 'regex' or 'whitespace'
+    # (see src/data/tokenizers.py and reports/tokenizer_comparison.md)
+    tokenizer: str = 'nltk'
+
+@dataclass
+class StorageConfig:
+    """Configuration for intermediate pipeline artifacts."""
+    # File format of artifacts: 'parquet' or 'csv'
+    format: str = 'parquet'
+    # Compression codec for Parquet files
+    compression: str = 'zstd'
+    # Number of rows per Parquet row group
+    row_group_size: int = 100_000
+    # Whether to also export every artifact as CSV
+    export_csv: bool = False
+    # Whether to store artifacts with compact dtypes (category labels,
+    # string[pyarrow] text, downcast numbers); CSV files do not keep them
+    optimize_dtypes: bool = False
+
+@dataclass
+class ProfilingConfig:
+    """Configuration of the function profiler and of stage telemetry."""
+    # Whether @timer functions record their durations
+    enabled: bool = False
+    # Prefix of the JSON summary written to results/ after a pipeline run
+    report_name: str = 'profile'
+    # Seconds between RSS samples while a stage runs
+    memory_sample_interval: float = 0.1
+    # Prefix of the per-run stage telemetry report written to results/
+    run_report_name: str = 'run_report'
+
+@dataclass
+class ServingConfig:
+    """Configuration of inference: the online service and batch scoring."""
+    # Address the HTTP server listens on (localhost only by default)
+    host: str = '127.0.0.1'
+    port: int = 8000
+    # Model served (default: the first model of the training metadata)
+    model: str = None
+    # Largest number of requests scored together
+    max_batch_size: int = 64
+    # Milliseconds a request waits for others to join its batch
+    max_wait_ms: float = 5.0
+    # Largest accepted request body in bytes
+    max_body_bytes: int = 1_000_000
+    # Records per chunk of batch scoring (one output part file each)
+    batch_chunk_rows: int = 20_000
+    # Output format of batch scoring: 'parquet' or 'jsonl'
+    batch_output_format: str = 'parquet'
 
 # Logging configuration for the project
 LOGGING_CONFIG = {
@@ -90,6 +210,7 @@ class Config:
         "raw_data": RAW_DATA_DIR,
         "processed_data": PROCESSED_DATA_DIR,
         "features": FEATURES_DIR,
+        "cache": CACHE_DIR,
         "models": MODELS_DIR,
         "results": RESULTS_DIR,
         "reports": REPORTS_DIR,
@@ -104,6 +225,12 @@ class Config:
     model: ModelConfig = field(default_factory=ModelConfig)
     # Text processing configuration
     text: TextConfig = field(default_factory=TextConfig)
+    # Artifact storage configuration
+    storage: StorageConfig = field(default_factory=StorageConfig)
+    # Profiling configuration
+    profiling: ProfilingConfig = field(default_factory=ProfilingConfig)
+    # Online inference configuration
+    serving: ServingConfig = field(default_factory=ServingConfig)
     # Logging configuration
     logging: dict = field(default_factory=lambda: LOGGING_CONFIG)
 
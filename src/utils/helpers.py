@@ -2,13 +2,12 @@
 import logging
 import logging.config
 # Import logging configuration from config.py
-from src.utils.config import LOGGING_CONFIG
-import time
-from functools import wraps
+from src.utils.config import LOGGING_CONFIG, config
+# Execution time decorator, re-exported for existing imports; durations are
+# aggregated by the profiler instead of logged on every call
+from src.utils.profiling import timer
 import pandas as pd
-import matplotlib.pyplot as plt
 import json
-import psutil
 import os
 
 # Function to set up logging for the project
@@ -17,20 +16,6 @@ def setup_logging():
     logging.config.dictConfig(LOOGGING_CONFIG)
     return logging.getLogger(__name__)
 
-# Decorator to measure and log the execution time of functions
-def timer(func):
-    """Decorator to measure the execution time of functions."""
-    @wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        # Calculate elapsed time
-        end_time = time.time() - start_time  # Typo: 'sart_time' should be 'start_time'
-        # Log the execution time of the function
-        logging.getLogger(__name__).info(f"Function '{func.__name__}' executed in {end_time - start_time:.4f} seconds")
-        return result
-    return wrapper
-
 # Function to validate that a DataFrame contains required columns
 def validate_dataframe(df: pd.DataFrame, required_columns: list) -> bool:
     """Validate that a DataFrame contains the required columns."""
@@ -44,6 +29,8 @@ def validate_dataframe(df: pd.DataFrame, required_columns: list) -> bool:
 # Function to plot the distribution of classes in a target variable
 def plot_class_distribution(y, title="Class Distribution"):
     """Plot the distribution of classes in a target variable."""
+    # matplotlib is only needed here; importing it lazily keeps startup fast
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(8, 6))
     y.value_counts().plot(kind='bar')
     plt.title(title)
@@ -73,9 +60,179 @@ def save_csv(df, path):
     # Save a pandas DataFrame to a CSV file
     df.to_csv(path, index=False)
 
+# Function to load a CSV file as an iterator of DataFrame chunks
+def load_csv_chunks(path, chunk_rows):
+    """Read a CSV file lazily, chunk_rows rows at a time."""
+    return pd.read_csv(path, chunksize=chunk_rows)
+
+# Function to save DataFrame chunks to a single CSV file
+def save_csv_chunks(chunks, path):
+    """Write DataFrame chunks to one CSV file as they arrive and return the row count."""
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows += len(chunk)
+    return rows
+
+# Artifact stores for intermediate pipeline outputs
+# Each store keeps artifacts under one directory and addresses them by name
+class CSVArtifactStore:
+    """Store DataFrame artifacts as CSV files."""
+
+    extension = '.csv'
+
+    def __init__(self, root, storage=None):
+        self.root = root
+        self.storage = storage or config.storage
+
+    def path(self, name):
+        """Return the file path of an artifact."""
+        return os.path.join(self.root, name + self.extension)
+
+    def exists(self, name):
+        """Check whether an artifact has been written."""
+        return os.path.isfile(self.path(name))
+
+    def metadata_path(self, name):
+        """Return the path of the JSON file describing an artifact."""
+        return os.path.join(self.root, name + '.meta.json')
+
+    def write_metadata(self, name, metadata):
+        """Save a dict describing how an artifact was produced."""
+        save_json(metadata, self.metadata_path(name))
+
+    def read_metadata(self, name):
+        """Return the metadata of an artifact, or None if it has none."""
+        path = self.metadata_path(name)
+        return load_json(path) if os.path.isfile(path) else None
+
+    def columns(self, name):
+        """Return the column names of an artifact without reading its rows."""
+        return pd.read_csv(self.path(name), nrows=0).columns.tolist()
+
+    def num_rows(self, name):
+        """Return the number of rows of an artifact."""
+        first_column = self.columns(name)[:1]
+        return sum(len(chunk) for chunk in self.iter_chunks(name, 100_000, columns=first_column))
+
+    def write(self, df, name):
+        """Write a whole DataFrame as an artifact."""
+        return self.write_chunks([df], name)
+
+    def write_chunks(self, chunks, name):
+        """Write DataFrame chunks as one artifact and return the row count."""
+        return save_csv_chunks(chunks, self.path(name))
+
+    def read(self, name, columns=None):
+        """Read an artifact, optionally only some columns."""
+        return pd.read_csv(self.path(name), usecols=columns)
+
+    def iter_chunks(self, name, chunk_rows, columns=None, start_row=0):
+        """Read an artifact lazily, chunk_rows rows at a time, from row start_row on."""
+        skiprows = range(1, start_row + 1) if start_row else None
+        return pd.read_csv(self.path(name), usecols=columns, chunksize=chunk_rows, skiprows=skiprows)
+
+    def export_csv(self, name, path=None):
+        """Export an artifact as CSV (already CSV for this store)."""
+        return self.path(name)
+
+
+class ParquetArtifactStore(CSVArtifactStore):
+    """Store DataFrame artifacts as compressed Parquet files."""
+
+    extension = '.parquet'
+
+    def columns(self, name):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(self.path(name)).schema_arrow.names
+
+    def num_rows(self, name):
+        """Return the row count from the Parquet metadata."""
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(self.path(name)).metadata.num_rows
+
+    def write_chunks(self, chunks, name):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        rows = 0
+        writer = None
+        try:
+            for chunk in chunks:
+                if writer is None:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(self.path(name), table.schema,
+                                              compression=self.storage.compression)
+                else:
+                    # Later chunks are cast to the schema of the first one
+                    table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+                writer.write_table(table, row_group_size=self.storage.row_group_size)
+                rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    def read(self, name, columns=None):
+        return pd.read_parquet(self.path(name), columns=columns)
+
+    def iter_chunks(self, name, chunk_rows, columns=None, start_row=0):
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(self.path(name))
+        # Row groups before start_row are not read at all
+        first_group, skip = 0, start_row
+        metadata = parquet_file.metadata
+        while first_group < metadata.num_row_groups and skip >= metadata.row_group(first_group).num_rows:
+            skip -= metadata.row_group(first_group).num_rows
+            first_group += 1
+        row_groups = range(first_group, metadata.num_row_groups)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns,
+                                               row_groups=row_groups):
+            if skip:
+                batch, skip = batch.slice(min(skip, batch.num_rows)), max(skip - batch.num_rows, 0)
+                if batch.num_rows == 0:
+                    continue
+            yield batch.to_pandas()
+
+    def export_csv(self, name, path=None):
+        """Export an artifact as CSV, chunk by chunk, and return the CSV path."""
+        path = path or os.path.join(self.root, name + CSVArtifactStore.extension)
+        save_csv_chunks(self.iter_chunks(name, self.storage.row_group_size), path)
+        return path
+
+
+# Registry of artifact store backends by format name
+ARTIFACT_STORES = {
+    'csv': CSVArtifactStore,
+    'parquet': ParquetArtifactStore,
+}
+
+# Function to get the artifact store for one of the configured paths
+def get_artifact_store(path_key, storage=None):
+    """Return the artifact store for config.paths[path_key] in the configured format."""
+    storage = storage or config.storage
+    if storage.format not in ARTIFACT_STORES:
+        raise ValueError(f"Unknown artifact format: {storage.format}")
+    return ARTIFACT_STORES[storage.format](config.paths[path_key], storage)
+
+# Function to write an artifact and export it as CSV when configured
+def save_artifact_chunks(store, chunks, name):
+    """Write chunks to a store, export to CSV if enabled, and return the row count."""
+    rows = store.write_chunks(chunks, name)
+    if store.storage.export_csv:
+        store.export_csv(name)
+    return rows
+
 # Function to get the current memory usage of the process
-def get_memory_usage():
-    """Return the current memory usage of the process in MB."""
+def get_memory_usage(include_children=False):
+    """Return the current memory usage of the process (and its worker processes) in MB."""
+    import psutil
     process = psutil.Process(os.getpid())
-    mem_info = process.memory_info()
-    return mem_info.rss / (1024 * 1024)  # Convert bytes to MB
+    rss = process.memory_info().rss
+    if include_children:
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                # The child exited between listing and reading it
+                continue
+    return rss / (1024 * 1024)  # Convert bytes to MB
@@ -0,0 +1,269 @@
+"""
+pipeline.py
+Small DAG runner that skips pipeline stages whose inputs,
+code and parameters have not changed.
+
+Every stage run is identified by a fingerprint built from:
+    - the content of its raw input files,
+    - the fingerprints of the stages it depends on,
+    - the source code of the modules that implement it,
+    - its parameters (e.g. TextConfig settings).
+Outputs are copied to config.paths["cache"]/<stage>/<fingerprint>/ so
+an unchanged stage is skipped and its outputs restored from the cache.
+Every stage is measured with stage_telemetry and recorded in the
+runner's RunReport.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import inspect
+import logging
+import importlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+from src.utils.config import config
+from src.utils.telemetry import RunReport, StageTelemetry, stage_telemetry
+
+logger = logging.getLogger(__name__)
+
+# Name of the file describing a cached stage run
+MANIFEST_NAME = "manifest.json"
+# Bytes read at a time when hashing files
+HASH_BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class Stage:
+    """
+    One step of the pipeline.
+
+    Attributes:
+        name (str): Unique stage name.
+        run (callable): Function called with a StageRun to produce the outputs.
+            It may return the number of rows it processed.
+        outputs (list): Paths of the files the stage writes.
+        inputs (list): Paths of raw files the stage reads.
+        depends_on (list): Names of upstream stages whose outputs it reads.
+        code (list): Modules whose source defines the stage's code version.
+        params (dict): Parameters that change the stage's outputs.
+        appendable_input (str): Input file that may grow by appending lines;
+            the stage is then given the previous run to resume from.
+    """
+    name: str
+    run: Callable
+    outputs: List[str]
+    inputs: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+    code: List[str] = field(default_factory=list)
+    params: dict = field(default_factory=dict)
+    appendable_input: Optional[str] = None
+
+
+@dataclass
+class StageRun:
+    """
+    Context passed to a stage when it has to run.
+
+    Attributes:
+        stage (Stage): The stage being run.
+        fingerprint (str): Fingerprint of this run.
+        previous_dir (str): Cache directory of an earlier run over a prefix
+            of the appendable input, or None.
+        previous_bytes (int): Size of the appendable input that run covered.
+    """
+    stage: Stage
+    fingerprint: str
+    previous_dir: Optional[str] = None
+    previous_bytes: int = 0
+
+
+def _hash_text(*parts) -> str:
+    """Return a hex digest of several strings."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digests(path: str, checkpoints=()) -> tuple:
+    """
+    Hash a file in one pass.
+
+    Returns the digest of the whole file and a dict mapping each
+    checkpoint offset to the digest of the file's first bytes up to it.
+    """
+    checkpoints = sorted(set(c for c in checkpoints if c >= 0))
+    digest = hashlib.blake2b(digest_size=16)
+    prefix_digests = {}
+    position = 0
+    with open(path, "rb") as f:
+        for checkpoint in checkpoints:
+            while position < checkpoint:
+                block = f.read(min(HASH_BLOCK_SIZE, checkpoint - position))
+                if not block:
+                    break
+                digest.update(block)
+                position += len(block)
+            if position == checkpoint:
+                prefix_digests[checkpoint] = digest.copy().hexdigest()
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest(), prefix_digests
+
+
+def code_version(modules: List[str]) -> str:
+    """Return a digest of the source code of the given modules."""
+    sources = [inspect.getsource(importlib.import_module(name)) for name in sorted(modules)]
+    return _hash_text(*sources)
+
+
+def _ends_with_newline(path: str, size: int) -> bool:
+    """Check whether the first size bytes of a file end a line."""
+    if size == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+class PipelineRunner:
+    """
+    Run stages in order, skipping those whose fingerprint is already cached.
+
+    Attributes:
+        stages (list): Stages in dependency order.
+        cache_dir (str): Root directory of cached stage outputs.
+        report (RunReport): Telemetry of the stages run or skipped.
+    """
+
+    def __init__(self, stages: List[Stage], cache_dir: str = None, report: RunReport = None):
+        names = [stage.name for stage in stages]
+        for index, stage in enumerate(stages):
+            unknown = [dep for dep in stage.depends_on if dep not in names[:index]]
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown or later stages: {unknown}")
+        self.stages = stages
+        self.cache_dir = cache_dir or config.paths["cache"]
+        self.report = report or RunReport()
+        self._outputs = {stage.name: stage.outputs for stage in stages}
+
+    def run(self, force: bool = False) -> Dict[str, str]:
+        """Run the pipeline and return the fingerprint of every stage."""
+        fingerprints = {}
+        for stage in self.stages:
+            fingerprints[stage.name] = self._run_stage(stage, fingerprints, force)
+        return fingerprints
+
+    def _stage_dir(self, stage: Stage, fingerprint: str = "") -> str:
+        return os.path.join(self.cache_dir, stage.name, fingerprint)
+
+    def _previous_manifests(self, stage: Stage) -> List[dict]:
+        """Load the manifests of all cached runs of a stage."""
+        manifests = []
+        stage_dir = self._stage_dir(stage)
+        if not os.path.isdir(stage_dir):
+            return manifests
+        for fingerprint in os.listdir(stage_dir):
+            path = os.path.join(stage_dir, fingerprint, MANIFEST_NAME)
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    manifests.append(json.load(f))
+        return manifests
+
+    def _run_stage(self, stage: Stage, fingerprints: Dict[str, str], force: bool) -> str:
+        manifests = self._previous_manifests(stage)
+        appended = [m["appendable"] for m in manifests if m.get("appendable")]
+
+        input_digests = {}
+        prefix_digests = {}
+        for path in stage.inputs:
+            checkpoints = [a["bytes"] for a in appended] if path == stage.appendable_input else ()
+            input_digests[path], prefixes = file_digests(path, checkpoints)
+            if path == stage.appendable_input:
+                prefix_digests = prefixes
+
+        code = code_version(stage.code)
+        params = json.dumps(stage.params, sort_keys=True, default=str)
+        # Everything except the appendable input: runs sharing it can be resumed
+        base_key = _hash_text(
+            stage.name, code, params,
+            *[input_digests[p] for p in sorted(input_digests) if p != stage.appendable_input],
+            *[fingerprints[dep] for dep in stage.depends_on],
+        )
+        fingerprint = _hash_text(base_key, input_digests.get(stage.appendable_input, ""))
+        entry_dir = self._stage_dir(stage, fingerprint)
+
+        if not force and os.path.isfile(os.path.join(entry_dir, MANIFEST_NAME)):
+            self._restore_outputs(stage, entry_dir)
+            logger.info(f"Stage '{stage.name}' is up to date ({fingerprint[:12]}), skipped")
+            self.report.add(StageTelemetry(stage.name, status="cached"))
+            return fingerprint
+
+        stage_run = StageRun(stage, fingerprint)
+        if not force and stage.appendable_input is not None:
+            stage_run = self._find_resumable_run(stage_run, manifests, base_key, prefix_digests)
+
+        logger.info(f"Running stage '{stage.name}' ({fingerprint[:12]})")
+        inputs = [*stage.inputs, *[path for dep in stage.depends_on for path in self._outputs[dep]]]
+        with stage_telemetry(stage.name, inputs, stage.outputs, self.report) as telemetry:
+            rows = stage.run(stage_run)
+            if isinstance(rows, int):
+                telemetry.rows = rows
+        self._store_outputs(stage, entry_dir, fingerprint, base_key,
+                            input_digests.get(stage.appendable_input))
+        return fingerprint
+
+    def _find_resumable_run(self, stage_run: StageRun, manifests: List[dict],
+                            base_key: str, prefix_digests: Dict[int, str]) -> StageRun:
+        """Pick the largest cached run whose appendable input is a prefix of the current one."""
+        stage = stage_run.stage
+        best = None
+        for manifest in manifests:
+            appended = manifest.get("appendable")
+            if manifest["base_key"] != base_key or not appended:
+                continue
+            size = appended["bytes"]
+            if prefix_digests.get(size) != appended["digest"]:
+                continue
+            if not _ends_with_newline(stage.appendable_input, size):
+                continue
+            if best is None or size > best["appendable"]["bytes"]:
+                best = manifest
+        if best is None:
+            return stage_run
+        logger.info(f"Stage '{stage.name}': input was appended to, resuming from "
+                    f"{best['fingerprint'][:12]} ({best['appendable']['bytes']} bytes)")
+        return StageRun(stage, stage_run.fingerprint,
+                        previous_dir=self._stage_dir(stage, best["fingerprint"]),
+                        previous_bytes=best["appendable"]["bytes"])
+
+    def _store_outputs(self, stage: Stage, entry_dir: str, fingerprint: str, base_key: str,
+                       appendable_digest: str = None) -> None:
+        """Copy a stage's outputs into the cache and write its manifest."""
+        os.makedirs(entry_dir, exist_ok=True)
+        for path in stage.outputs:
+            shutil.copy2(path, os.path.join(entry_dir, os.path.basename(path)))
+        manifest = {"stage": stage.name, "fingerprint": fingerprint, "base_key": base_key,
+                    "outputs": [os.path.basename(path) for path in stage.outputs]}
+        if stage.appendable_input is not None:
+            manifest["appendable"] = {
+                "bytes": os.path.getsize(stage.appendable_input),
+                "digest": appendable_digest,
+            }
+        with open(os.path.join(entry_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4)
+
+    def _restore_outputs(self, stage: Stage, entry_dir: str) -> None:
+        """Copy cached outputs back to their locations when they differ."""
+        for path in stage.outputs:
+            cached = os.path.join(entry_dir, os.path.basename(path))
+            # Cached copies keep the size and mtime of the file they came from
+            if os.path.isfile(path):
+                current, stored = os.stat(path), os.stat(cached)
+                if (current.st_size, current.st_mtime_ns) == (stored.st_size, stored.st_mtime_ns):
+                    continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copy2(cached, path)
@@ -0,0 +1,178 @@
+"""
+telemetry.py
+Memory and throughput telemetry for pipeline stages.
+
+stage_telemetry() wraps one stage and records its wall and CPU time,
+rows/sec, bytes read and written, and the RSS of the process and its
+worker processes (start, peak, end), sampled by a background thread
+through get_memory_usage. The measurements of a run are collected in
+a RunReport saved as JSON to results/, next to project.log.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+from src.utils.config import config
+from src.utils.helpers import get_memory_usage
+
+logger = logging.getLogger(__name__)
+
+
+class MemorySampler:
+    """
+    Background thread sampling the RSS of the process and its children.
+
+    Attributes:
+        interval (float): Seconds between samples.
+        peak_mb (float): Highest RSS seen so far, in MB.
+    """
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or config.profiling.memory_sample_interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self) -> float:
+        """Take one sample and update the peak."""
+        rss = get_memory_usage(include_children=True)
+        self.peak_mb = max(self.peak_mb, rss)
+        return rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> "MemorySampler":
+        self.sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> float:
+        """Stop sampling and return the peak RSS in MB."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sample()
+        return self.peak_mb
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+@dataclass
+class StageTelemetry:
+    """
+    Measurements of one pipeline stage.
+
+    Attributes:
+        name (str): Stage name.
+        status (str): 'ran', 'cached' (skipped, outputs restored) or 'failed'.
+        rows (int): Rows processed, when the stage reports them.
+        bytes_read (int): Total size of the stage's input files.
+        bytes_written (int): Total size of the stage's output files.
+        wall_s (float): Elapsed time in seconds.
+        cpu_s (float): CPU time of the process and its finished workers.
+        rows_per_sec (float): Throughput, when rows are known.
+        rss_start_mb, rss_peak_mb, rss_end_mb (float): RSS of the process
+            and its workers, in MB.
+    """
+    name: str
+    status: str = "ran"
+    rows: Optional[int] = None
+    bytes_read: int = 0
+    bytes_written: int = 0
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    rows_per_sec: Optional[float] = None
+    rss_start_mb: float = 0.0
+    rss_peak_mb: float = 0.0
+    rss_end_mb: float = 0.0
+
+
+@dataclass
+class RunReport:
+    """Telemetry of all the stages of one pipeline run."""
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    stages: List[StageTelemetry] = field(default_factory=list)
+
+    def add(self, telemetry: StageTelemetry) -> None:
+        self.stages.append(telemetry)
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "peak_rss_mb": max((s.rss_peak_mb for s in self.stages), default=0.0),
+            "wall_s": sum(s.wall_s for s in self.stages),
+            "stages": [asdict(s) for s in self.stages],
+        }
+
+    def save(self, name: str = None, results_dir: str = None) -> str:
+        """Write the report to results/<name>_<timestamp>.json and return its path."""
+        name = name or config.profiling.run_report_name
+        results_dir = results_dir or config.paths["results"]
+        os.makedirs(results_dir, exist_ok=True)
+        stamp = self.started_at.replace("-", "").replace(":", "").replace("T", "_")
+        path = os.path.join(results_dir, f"{name}_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4)
+        logger.info(f"Run report saved to {path}")
+        return path
+
+
+def _total_size(paths) -> int:
+    """Sum the sizes of the existing files among paths."""
+    return sum(os.path.getsize(path) for path in paths if os.path.isfile(path))
+
+
+def _cpu_time() -> float:
+    """CPU time of this process and of its children that have exited."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+@contextmanager
+def stage_telemetry(name: str, inputs=(), outputs=(), report: RunReport = None,
+                    interval: float = None):
+    """
+    Measure a stage run.
+
+    Yields the StageTelemetry being filled; the stage can set its rows
+    attribute. Input sizes are read on entry and output sizes on exit.
+    The telemetry is logged and added to report when one is given.
+    """
+    telemetry = StageTelemetry(name, bytes_read=_total_size(inputs))
+    sampler = MemorySampler(interval)
+    telemetry.rss_start_mb = sampler.start().peak_mb
+    wall_start, cpu_start = time.perf_counter(), _cpu_time()
+    try:
+        yield telemetry
+    except BaseException:
+        telemetry.status = "failed"
+        raise
+    finally:
+        telemetry.wall_s = time.perf_counter() - wall_start
+        telemetry.cpu_s = _cpu_time() - cpu_start
+        telemetry.rss_peak_mb = sampler.stop()
+        telemetry.rss_end_mb = get_memory_usage(include_children=True)
+        telemetry.bytes_written = _total_size(outputs)
+        if telemetry.rows is not None and telemetry.wall_s > 0:
+            telemetry.rows_per_sec = telemetry.rows / telemetry.wall_s
+        rate = f", {telemetry.rows_per_sec:,.0f} rows/s" if telemetry.rows_per_sec else ""
+        logger.info(f"Stage '{name}' {telemetry.status} in {telemetry.wall_s:.2f}s "
+                    f"(cpu {telemetry.cpu_s:.2f}s{rate}), peak RSS {telemetry.rss_peak_mb:.0f} MB, "
+                    f"read {telemetry.bytes_read:,} B, wrote {telemetry.bytes_written:,} B")
+        if report is not None:
+            report.add(telemetry)
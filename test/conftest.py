@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.sparse_features import SparseFeatureBuilder
+from src.models.train import train
+
+
+@pytest.fixture(scope="session")
+def make_training_frame():
+    """Return a factory of cleaned training frames whose two labels are easy to separate."""
+    def make(n=300):
+        rng = np.random.default_rng(0)
+        labels = np.array(["factual", "reasoning"])[rng.integers(0, 2, n)]
+        words = {"factual": "city river country", "reasoning": "because why cause"}
+        return pd.DataFrame({
+            "question": [f"question {i}" for i in range(n)],
+            "context": [f"context {i % 50}" for i in range(n)],
+            "question_clean": [f"{words[label]} item{i % 7}" for i, label in enumerate(labels)],
+            "context_clean": [f"paragraph{i % 50} text" for i in range(n)],
+            "answer_clean": ["answer"] * n,
+            "type": labels,
+        })
+    return make
+
+
+@pytest.fixture(scope="session")
+def factual_record():
+    """Raw record a model trained on make_training_frame labels 'factual'."""
+    return {"question": "Which city is near the river of this country?", "context": "paragraph3 text"}
+
+
+@pytest.fixture(scope="session")
+def reasoning_record():
+    """Raw record a model trained on make_training_frame labels 'reasoning'."""
+    return {"question": "Why? Because of the cause.", "context": "paragraph4 text", "answer": "answer"}
+
+
+@pytest.fixture(scope="session")
+def trained_models_dir(tmp_path_factory, make_training_frame):
+    """Models directory holding a logistic regression trained on make_training_frame."""
+    path = tmp_path_factory.mktemp("models")
+    train(make_training_frame(), model_names=["logistic_regression"], n_jobs=1, models_dir=str(path),
+          builder=SparseFeatureBuilder(params={"min_df": 1}))
+    return str(path)
@@ -0,0 +1,54 @@
+import json
+import pandas as pd
+import pytest
+from src.data.data_loader import iter_line_chunks
+from src.models.batch_predict import PROGRESS_FILE, batch_predict, part_files
+
+
+@pytest.fixture
+def input_path(tmp_path, factual_record, reasoning_record):
+    path = tmp_path / "test.json"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(25):
+            f.write(json.dumps({"id": f"q{i}", **(factual_record if i % 2 else reasoning_record)}) + "\n")
+            if i == 12:
+                f.write("\n")
+    return str(path)
+
+
+def test_iter_line_chunks_resumes_at_end_byte(input_path):
+    chunks = list(iter_line_chunks(input_path, 10))
+    assert [len(lines) for _, _, lines in chunks] == [10, 10, 5]
+    assert [len(lines) for _, _, lines in iter_line_chunks(input_path, 10, chunks[1][1])] == [5]
+
+
+def test_interrupted_job_resumes_without_rescoring(tmp_path, trained_models_dir, input_path):
+    output = str(tmp_path / "out")
+    progress = batch_predict(input_path, output, trained_models_dir, chunk_rows=10, max_chunks=1)
+    assert not progress["done"] and progress["rows"] == 10
+    first_part = part_files(output)[0]
+    with open(first_part, "rb") as f:
+        first_bytes = f.read()
+
+    progress = batch_predict(input_path, output, trained_models_dir, chunk_rows=10)
+    assert progress["done"] and progress["rows"] == 25 and progress["chunks"] == 3
+    with open(first_part, "rb") as f:
+        assert f.read() == first_bytes
+    scored = pd.read_parquet(output)
+    assert scored["row"].tolist() == list(range(25))
+    assert scored["id"].tolist() == [f"q{i}" for i in range(25)]
+    assert scored["label"].tolist() == ["factual" if i % 2 else "reasoning" for i in range(25)]
+    with open(tmp_path / "out" / PROGRESS_FILE, encoding="utf-8") as f:
+        assert json.load(f)["done"]
+
+
+def test_parallel_jsonl_output_matches_serial(tmp_path, trained_models_dir, input_path):
+    serial = batch_predict(input_path, str(tmp_path / "serial"), trained_models_dir, chunk_rows=10,
+                           output_format="jsonl")
+    parallel = batch_predict(input_path, str(tmp_path / "parallel"), trained_models_dir, chunk_rows=10,
+                             output_format="jsonl", n_jobs=2)
+    assert serial["rows"] == parallel["rows"] == 25
+
+    def read(name):
+        return pd.concat([pd.read_json(path, lines=True) for path in part_files(str(tmp_path / name))])
+    pd.testing.assert_frame_equal(read("serial"), read("parallel"))
@@ -0,0 +1,29 @@
+# Import the synthetic data generator and the regression check to test
+import pytest
+from benchmarks.synthetic import SyntheticQAGenerator
+from benchmarks.run_benchmarks import compare
+
+# Test that the generator is reproducible and honors its rates
+def test_generator_is_seeded_and_configurable():
+    generator = SyntheticQAGenerator(seed=1, html_density=0.5, duplication_rate=0.5)
+    df = generator.dataframe(2000)
+    assert df.columns.tolist() == ["question", "context", "answer", "type"]
+    assert df.equals(SyntheticQAGenerator(seed=1, html_density=0.5, duplication_rate=0.5).dataframe(2000))
+    assert df.head(10).equals(generator.dataframe(10))
+    assert 0.4 < df["context"].str.startswith("<div>").mean() < 0.6
+    assert 0.4 < 1 - df["context"].nunique() / len(df) < 0.6
+    plain = SyntheticQAGenerator(seed=1, html_density=0.0, duplication_rate=0.0).dataframe(500)
+    assert not plain["context"].str.contains("<").any()
+    assert plain["context"].is_unique
+    with pytest.raises(ValueError):
+        SyntheticQAGenerator(html_density=1.5)
+
+# Test that throughput drops and memory growth beyond the threshold are flagged
+def test_compare_flags_regressions():
+    baseline = {"results": [{"stage": "s", "rows": 10, "rows_per_sec": 100.0, "peak_growth_mb": 100.0}]}
+    same = [{"stage": "s", "rows": 10, "rows_per_sec": 90.0, "peak_growth_mb": 110.0}]
+    slower = [{"stage": "s", "rows": 10, "rows_per_sec": 70.0, "peak_growth_mb": 100.0}]
+    bigger = [{"stage": "s", "rows": 10, "rows_per_sec": 100.0, "peak_growth_mb": 200.0}]
+    assert compare(same, baseline, 0.2) == []
+    assert len(compare(slower, baseline, 0.2)) == 1
+    assert len(compare(bigger, baseline, 0.2)) == 1
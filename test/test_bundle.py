@@ -0,0 +1,95 @@
+import json
+from dataclasses import asdict
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+from src.features.sparse_features import SparseFeatureBuilder, StreamingFeaturizer
+from src.models.bundle import bundle_path, export_bundle, load_bundle
+from src.models.predict import Predictor
+from src.models.train import train
+from src.utils.config import config
+
+
+@pytest.fixture
+def three_label_frame(make_training_frame):
+    df = make_training_frame()
+    df.loc[::3, "type"] = "definition"
+    df.loc[::3, "question_clean"] = "what meaning define term"
+    return df
+
+
+def _roundtrip(tmp_path, model, featurizer, df):
+    X = featurizer.fit_transform(df) if isinstance(featurizer, SparseFeatureBuilder) else featurizer.transform(df)
+    model.fit(X, df["type"])
+    bundle_model, bundle_featurizer, _ = load_bundle(export_bundle(model, featurizer, str(tmp_path / "m.bundle")))
+    X_bundle = bundle_featurizer.transform(df)
+    assert np.allclose(X_bundle.toarray(), X.toarray(), atol=1e-5)
+    assert (bundle_model.predict(X_bundle) == model.predict(X)).all()
+    if hasattr(model, "predict_proba"):
+        assert np.allclose(bundle_model.predict_proba(X_bundle), model.predict_proba(X), atol=1e-4)
+    return bundle_model
+
+
+@pytest.mark.parametrize("kind, model", [
+    ("tfidf", LogisticRegression(max_iter=500)),
+    ("hashing", LogisticRegression(max_iter=500)),
+    ("streaming", SGDClassifier(loss="log_loss", random_state=0)),
+    ("streaming", MultinomialNB()),
+])
+def test_bundle_matches_the_joblib_model(tmp_path, three_label_frame, kind, model):
+    featurizer = (StreamingFeaturizer(params={"n_features": 2 ** 10}) if kind == "streaming"
+                  else SparseFeatureBuilder(kind=kind, params={"min_df": 1} if kind == "tfidf" else {}))
+    bundle_model = _roundtrip(tmp_path, model, featurizer, three_label_frame)
+    assert isinstance(bundle_model.coef, np.memmap)
+
+
+def test_binary_and_non_linear_models(tmp_path, make_training_frame):
+    df = make_training_frame()
+    _roundtrip(tmp_path, LogisticRegression(), SparseFeatureBuilder(params={"min_df": 1}), df)
+    with pytest.raises(ValueError):
+        _roundtrip(tmp_path, RandomForestClassifier(n_estimators=2), SparseFeatureBuilder(params={"min_df": 1}), df)
+
+
+def test_predictor_prefers_the_bundle_and_checks_its_version(tmp_path, make_training_frame, reasoning_record):
+    models_dir = str(tmp_path)
+    train(make_training_frame(), model_names=["logistic_regression"], n_jobs=1, models_dir=models_dir,
+          builder=SparseFeatureBuilder(params={"min_df": 1}))
+    predictor = Predictor.load(models_dir, warmup=False)
+    assert type(predictor.model).__name__ == "BundleModel"
+    assert predictor.predict_one(reasoning_record)["label"] == "reasoning"
+
+    meta_path = f"{bundle_path(models_dir, 'logistic_regression')}/meta.json"
+    with open(meta_path) as f:
+        meta = json.load(f)
+    meta["format_version"] += 1
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    with pytest.raises(ValueError):
+        Predictor.load(models_dir, warmup=False)
+
+
+def test_predictor_uses_the_bundle_text_settings_without_changing_config(tmp_path, make_training_frame):
+    before = asdict(config.text)
+    preprocessing = {**before, "use_stemming": not before["use_stemming"], "tokenizer": "whitespace"}
+    train(make_training_frame(), model_names=["logistic_regression"], n_jobs=1, models_dir=str(tmp_path),
+          builder=SparseFeatureBuilder(params={"min_df": 1}), preprocessing=preprocessing)
+    predictor = Predictor.load(str(tmp_path), warmup=False)
+    assert asdict(config.text) == before
+    assert predictor.processor.settings() == preprocessing
+
+
+def test_dense_features_use_the_bundle_tokenizer(tmp_path, make_training_frame, reasoning_record, monkeypatch):
+    # NLTK splits "gonna" and "wanna" in two words, the whitespace tokenizer does not
+    record = {**reasoning_record, "question": "Why? Because gonna wanna cause."}
+    monkeypatch.setattr(config.text, "tokenizer", "whitespace")
+    train(make_training_frame(), model_names=["logistic_regression"], n_jobs=1, models_dir=str(tmp_path),
+          builder=SparseFeatureBuilder(params={"min_df": 1}, use_dense=True), preprocessing=asdict(config.text))
+    expected = Predictor.load(str(tmp_path), warmup=False).features([record]).toarray()
+
+    monkeypatch.setattr(config.text, "tokenizer", "nltk")
+    predictor = Predictor.load(str(tmp_path), warmup=False)
+    assert np.array_equal(predictor.features([record]).toarray(), expected)
+    df = predictor.prepare([record])
+    assert np.array_equal(predictor.featurizer.transform(df).toarray(), expected)
@@ -0,0 +1,61 @@
+from collections import Counter
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+from src.features.corpus_stats import CorpusStats, DistinctCounter, HeavyHitters
+
+
+def _corpus(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    # Zipf-like vocabulary, so a few words dominate
+    words = np.array([f"w{i}" for i in range(3000)])
+    weights = 1 / np.arange(1, 3001)
+    texts = [" ".join(rng.choice(words, size=rng.integers(5, 30), p=weights / weights.sum()))
+             for _ in range(n)]
+    labels = np.array(["factual", "reasoning", "definition"])[rng.integers(0, 3, n)]
+    return pd.DataFrame({"text": texts, "type": labels})
+
+
+def test_exact_mode_matches_count_vectorizer():
+    df = _corpus(500)
+    stats = CorpusStats(exact=True).update_frame(df, "text", "type", chunk_rows=120)
+    for label in ("factual", "reasoning"):
+        texts = df.loc[df["type"] == label, "text"]
+        for n in (1, 2, 3):
+            vectorizer = CountVectorizer(ngram_range=(n, n), token_pattern=r"\S+", lowercase=False)
+            counts = np.asarray(vectorizer.fit_transform(texts).sum(axis=0)).ravel()
+            expected = dict(zip(vectorizer.get_feature_names_out(), counts))
+            assert dict(stats.labels[label].ngrams[n].counts) == expected
+        words = " ".join(texts).split()
+        summary = stats.summary().loc[label]
+        assert summary["total_tokens"] == len(words) and summary["vocab_size"] == len(set(words))
+
+
+def test_sketches_stay_bounded_and_close_to_exact():
+    df = _corpus(3000)
+    exact = CorpusStats(exact=True).update_frame(df, "text", "type", chunk_rows=200)
+    sketch = CorpusStats(capacity=200, distinct_k=256).update_frame(df, "text", "type", chunk_rows=200)
+    for label, stats in sketch.labels.items():
+        assert all(len(hitters) <= 2 * 200 for hitters in stats.ngrams.values())
+        assert len(stats.vocabulary.hashes) <= 256
+        true_vocab = exact.summary().loc[label, "vocab_size"]
+        assert abs(stats.summary()["vocab_size"] - true_vocab) / true_vocab < 0.2
+        hitters, truth = stats.ngrams[1], exact.labels[label].ngrams[1].counts
+        top = [word for word, _ in exact.top_ngrams(1, 5, label=label)]
+        assert [word for word, _ in sketch.top_ngrams(1, 5, label=label)][:3] == top[:3]
+        for word in top:
+            assert truth[word] - hitters.error <= hitters.counts[word] <= truth[word]
+
+
+def test_heavy_hitters_and_distinct_counter_merge():
+    a, b = HeavyHitters(capacity=2), HeavyHitters(capacity=2)
+    a.update("x x x y z".split())
+    b.update(Counter({"x": 2, "w": 1}))
+    a.merge(b)
+    assert a.most_common(1)[0][0] == "x" and a.total == 8 and len(a) <= 2
+
+    c, d = DistinctCounter(k=None), DistinctCounter(k=None)
+    c.update(["a", "b"])
+    d.update(["b", "c"])
+    c.merge(d)
+    assert c.count() == 3
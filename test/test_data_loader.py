@@ -1,9 +1,11 @@
 import json
 import pytest
+import numpy as np
 import pandas as pd
+import src.data.data_loader as data_loader
 from src.data.data_loader import (
     _validate_file_exists, _check_integrity,
-    load_training_data, load_test_data
+    load_training_data, load_test_data, iter_training_chunks
 )
 @pytest.fixture
 def sample_train_json(tmp_path):
@@ -32,3 +34,113 @@ def test_load_training_data(sample_train_json):
     assert isinstance(df, pd.DataFrame)
     assert not df.empty
 
+
+def test_iter_training_chunks(tmp_path):
+    file_path = tmp_path / "train.json"
+    with open(file_path, "w", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(json.dumps({"text": f"row {i}", "label": "a"}) + "\n\n")
+    chunks = list(iter_training_chunks(file_path, chunk_rows=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert list(chunks[-1].index) == [4]
+    pd.testing.assert_frame_equal(pd.concat(chunks), load_training_data(file_path))
+
+def test_iter_training_chunks_without_orjson(sample_train_json, monkeypatch):
+    expected = load_training_data(sample_train_json)
+    monkeypatch.setattr(data_loader, "_json_loads", json.loads)
+    pd.testing.assert_frame_equal(load_training_data(sample_train_json), expected)
+
+def test_smallest_numeric_dtype():
+    assert data_loader.smallest_numeric_dtype(np.array([0, 100])) == np.int8
+    assert data_loader.smallest_numeric_dtype(np.array([-1.0, 300.0])) == np.int16
+    assert data_loader.smallest_numeric_dtype(np.array([0.5, 1.0])) == np.float32
+    assert data_loader.smallest_numeric_dtype(np.array([1.0, np.nan])) == np.float32
+
+def test_optimize_dtypes_keeps_values_and_saves_memory():
+    df = pd.DataFrame({
+        "question": pd.Series([f"question {i}" for i in range(1000)], dtype=object),
+        "type": ["factual", "reasoning"] * 500,
+        "word_count": pd.Series(range(1000), dtype="int64"),
+        "ratio": pd.Series([i / 7 for i in range(1000)], dtype="float64"),
+    })
+    optimized = data_loader.optimize_dtypes(df)
+    assert isinstance(optimized["type"].dtype, pd.CategoricalDtype)
+    assert optimized["question"].dtype == "string[pyarrow]"
+    assert optimized["word_count"].dtype == "int16"
+    assert optimized["ratio"].dtype == "float32"
+    assert optimized["question"].tolist() == df["question"].tolist()
+    assert optimized["word_count"].tolist() == df["word_count"].tolist()
+    assert data_loader.memory_usage_mb(optimized) < data_loader.memory_usage_mb(df)
+    forced = data_loader.optimize_dtypes(df, numeric_dtypes={"word_count": "int32"})
+    assert forced["word_count"].dtype == "int32"
+
+def test_optimized_dtypes_survive_cleaning_and_parquet(tmp_path):
+    from src.data.data_cleaning import clean_chunk, CRITICAL_COLS
+    from src.utils.helpers import ParquetArtifactStore
+    df = pd.DataFrame({col: ["a", "b", ""] for col in CRITICAL_COLS})
+    df = data_loader.optimize_dtypes(df)
+    store = ParquetArtifactStore(str(tmp_path))
+    store.write(df, "optimized")
+    cleaned = clean_chunk(next(store.iter_chunks("optimized", 10)))
+    assert len(cleaned) == 2
+    assert isinstance(cleaned["type_clean"].dtype, pd.CategoricalDtype)
+    assert cleaned["question_clean"].dtype == "string[pyarrow]"
+
+def test_scan_dtypes_gives_every_chunk_the_parquet_schema(tmp_path):
+    from src.utils.helpers import ParquetArtifactStore
+    chunks = [
+        pd.DataFrame({"count": [1, 2], "type": ["a", "a"]}),
+        pd.DataFrame({"count": [500, 3], "type": [f"label{i}" for i in range(200)][:2]}),
+        pd.DataFrame({"count": [4] * 200, "type": [f"label{i}" for i in range(200)]}),
+    ]
+    numeric_dtypes, categories = data_loader.scan_dtypes(chunks)
+    assert numeric_dtypes == {"count": np.int16}
+    assert len(categories["type"]) == 201
+    store = ParquetArtifactStore(str(tmp_path))
+    optimized = (data_loader.optimize_dtypes(chunk, numeric_dtypes=numeric_dtypes, categories=categories)
+                 for chunk in chunks)
+    assert store.write_chunks(optimized, "scanned") == 204
+    df = store.read("scanned")
+    assert df["count"].tolist() == [1, 2, 500, 3] + [4] * 200
+    assert df["type"].astype(str).tolist() == pd.concat(chunks)["type"].tolist()
+
+def test_check_integrity_raises_on_nulls_and_duplicates():
+    _check_integrity(pd.DataFrame({"a": ["x", "y"], "b": [1, 2]}))
+    with pytest.raises(ValueError, match="missing values"):
+        _check_integrity(pd.DataFrame({"a": ["x", None]}))
+    with pytest.raises(ValueError, match="duplicate rows"):
+        _check_integrity(pd.DataFrame({"a": ["x", "x"], "b": [1, 1]}))
+
+def test_validator_finds_problems_across_chunks():
+    validator = data_loader.DataValidator(expected_columns=["text", "label", "id"],
+                                          expected_dtypes={"label": "int64"}, max_samples=2)
+    chunks = [
+        pd.DataFrame({"text": ["a", "b", None], "label": ["x", "y", "z"]}),
+        pd.DataFrame({"text": ["b", "c", None, None], "label": ["y", "x", "z", "z"]}, index=range(3, 7)),
+    ]
+    assert [len(c) for c in validator.watch(chunks)] == [3, 4]
+    report = validator.report()
+    assert report.rows == 7
+    assert report.missing_columns == ["id"]
+    assert report.dtype_errors["label"]["expected"] == "int64"
+    assert report.null_counts == {"text": 3}
+    # ("b", "y") repeats row 1 and (None, "z") repeats row 2, twice
+    assert report.duplicate_rows == 3
+    assert [s["row"] for s in report.samples["duplicates"]] == [3, 5]
+    assert len(report.samples["nulls"]) == 2
+    assert not report.ok
+    with pytest.raises(ValueError, match="missing columns"):
+        report.raise_for_errors()
+
+def test_validate_training_data_sampling(tmp_path):
+    file_path = tmp_path / "train.json"
+    with open(file_path, "w", encoding="utf-8") as f:
+        for i in range(1000):
+            f.write(json.dumps({"text": f"row {i % 900}", "label": "a"}) + "\n")
+    full = data_loader.validate_training_data(file_path, ["text", "label"], chunk_rows=128)
+    assert (full.rows, full.duplicate_rows, full.sampled) == (1000, 100, False)
+    sample = data_loader.validate_training_data(file_path, chunk_rows=128, sample_fraction=0.1, seed=0)
+    assert sample.sampled and 50 < sample.rows < 150
+    chunks = list(iter_training_chunks(file_path, chunk_rows=50, sample_fraction=0.1, seed=0))
+    rows = pd.concat(chunks)
+    assert rows["text"].tolist() == [f"row {i % 900}" for i in rows.index]
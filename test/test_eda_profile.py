@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pandas as pd
+from src.data.eda_profile import EDAProfiler, LengthHistogram, ReservoirSample
+
+
+def _frame(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "context": [" ".join(["word"] * k) for k in rng.integers(1, 60, n)],
+        "question": [" ".join(["why"] * k) for k in rng.integers(1, 12, n)],
+        "answer": [" ".join(["yes"] * k) for k in rng.integers(1, 5, n)],
+        "type": np.array(["factual", "reasoning", "definition"])[rng.integers(0, 3, n)],
+    })
+    df.loc[::50, "answer"] = None
+    return pd.concat([df, df.iloc[:10]], ignore_index=True)
+
+
+def test_profile_matches_full_frame_statistics(tmp_path):
+    df = _frame()
+    profiler = EDAProfiler(sample_size=100)
+    for start in range(0, len(df), 137):
+        profiler.update(df.iloc[start:start + 137])
+    summary = profiler.summary().set_index("column")
+
+    assert summary.loc["answer", "nulls"] == df["answer"].isna().sum()
+    assert (summary["duplicate_rows"] == df.duplicated().sum()).all()
+    lengths = df["context"].str.split().str.len()
+    for q in (25, 50, 75, 95, 99):
+        assert summary.loc["context", f"length_p{q}"] == np.quantile(lengths, q / 100, method="lower")
+    assert np.isclose(summary.loc["context", "length_mean"], lengths.mean())
+    assert summary.loc["type", "distinct"] == 3
+    assert profiler.label_balance()["count"].to_dict() == df["type"].value_counts().to_dict()
+
+    paths = profiler.save(str(tmp_path))
+    assert all(os.path.isfile(path) for path in paths.values())
+    assert len(pd.read_csv(paths["summary"])) == 4
+
+
+def test_reservoir_sample_is_uniform():
+    hits = np.zeros(1000)
+    for seed in range(100):
+        sample = ReservoirSample(size=50, seed=seed)
+        for start in range(0, 1000, 64):
+            sample.update(pd.DataFrame({"row": np.arange(start, min(start + 64, 1000))}))
+        assert len(sample.frame) == 50 and sample.frame["row"].is_unique
+        hits[sample.frame["row"].to_numpy()] += 1
+    # Every row is kept with probability 50 / 1000
+    first, last = hits[:500].mean() / 100, hits[500:].mean() / 100
+    assert abs(first - 0.05) < 0.01 and abs(last - 0.05) < 0.01
+
+
+def test_length_histogram_grows_with_longer_texts():
+    histogram = LengthHistogram()
+    histogram.update(np.array([1, 2, -1]))
+    histogram.update(np.array([10]))
+    assert histogram.count == 3 and histogram.quantile(1.0) == 10
@@ -1,7 +1,11 @@
 # Import functions to test from helpers.py
-from src.utils.helpers import load_json, save_json
+from src.utils.helpers import load_json, save_json, load_csv_chunks, save_csv_chunks
+from src.utils.helpers import CSVArtifactStore, ParquetArtifactStore
+from src.utils.config import StorageConfig
 # Import standard libraries for JSON handling and OS operations
 import json, os
+import pandas as pd
+import pytest
 
 # Test function for load_json and save_json
 # Uses pytest's tmp_path fixture to create a temporary directory for testing
@@ -15,3 +19,32 @@ def test_load_json(tmp_path):
     save_json(data, path)
     loaded_data = load_json(path)
     assert loaded_data == data
+
+# Test function for save_csv_chunks and load_csv_chunks
+# Writes two chunks to one file and reads them back in chunks of 2 rows
+def test_csv_chunks_roundtrip(tmp_path):
+    path = tmp_path / "chunks.csv"
+    chunks = [pd.DataFrame({"a": [1, 2]}), pd.DataFrame({"a": [3]})]
+    assert save_csv_chunks(chunks, path) == 3
+    loaded = list(load_csv_chunks(path, 2))
+    assert [chunk["a"].tolist() for chunk in loaded] == [[1, 2], [3]]
+
+# Test the CSV and Parquet artifact stores
+# Writes two chunks, then reads back all rows, a column subset and chunks
+@pytest.mark.parametrize("store_cls", [CSVArtifactStore, ParquetArtifactStore])
+def test_artifact_store_roundtrip(tmp_path, store_cls):
+    store = store_cls(str(tmp_path), StorageConfig(row_group_size=2))
+    chunks = [pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}), pd.DataFrame({"a": [3], "b": ["z"]})]
+    assert store.write_chunks(chunks, "artifact") == 3
+    assert store.exists("artifact")
+    assert store.columns("artifact") == ["a", "b"]
+    assert store.num_rows("artifact") == 3
+    assert store.read("artifact")["a"].tolist() == [1, 2, 3]
+    assert store.read("artifact", columns=["b"]).columns.tolist() == ["b"]
+    assert [len(c) for c in store.iter_chunks("artifact", 2, columns=["a"])] == [2, 1]
+
+def test_parquet_export_csv(tmp_path):
+    store = ParquetArtifactStore(str(tmp_path))
+    store.write(pd.DataFrame({"a": [1, 2]}), "artifact")
+    path = store.export_csv("artifact")
+    assert pd.read_csv(path)["a"].tolist() == [1, 2]
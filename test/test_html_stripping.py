@@ -0,0 +1,61 @@
+import random
+import pytest
+from src.data.preprocessing import remove_html
+
+# Inputs covering each tier of the 'auto' strategy: plain text, simple
+# tags and entities, and markup that must go through BeautifulSoup
+PARITY_CASES = [
+    "plain text without markup",
+    "",
+    "\t",
+    " \r\n",
+    "hello <b>world</b>",
+    "<p>first</p>\r\n<p>second</p>",
+    "<a href='http://example.com'>link</a> and <br/> break",
+    '<div class="a b"><img src=x alt=y>caption</div>',
+    "tom &amp; jerry &lt;3 &nbsp;end",
+    "&copy 2020 &notit; a&b",
+    "a < b and c > d",
+    "<script>var x = 1;</script>visible",
+    "<style>p { color: red }</style>text",
+    "before<!-- comment -->after",
+    "<![CDATA[raw]]> data",
+    "<!doctype html><title>t</title>",
+    "<pre>  keep  </pre>",
+    "&#65;&#x42; numeric",
+    "<a title='x>y'>quoted</a>",
+    "<b>unclosed",
+    "</ p>odd end tag",
+    # '</br>' after '<br>' does not end the text node, so the blank text
+    # around it is not collapsed
+    "<br>\t</br>;",
+    "a<br>b</b>\r</br>'",
+    "<br>;</br>\t<p>a>",
+    "</br>\t",
+    "<img src=x>\t</IMG>\t<br/>\t</br>",
+]
+
+
+@pytest.mark.parametrize("text", PARITY_CASES)
+def test_auto_matches_bs4(text):
+    assert remove_html(text, strategy="auto") == remove_html(text, strategy="bs4")
+
+
+def test_auto_matches_bs4_random_markup():
+    rng = random.Random(0)
+    atoms = list("ab <>&;/='\"\t\n\r") + [
+        "<b>", "</b>", "<br/>", "&amp;", "&lt;", "&nbsp;", "&copy", "<!-- c -->",
+        "<a href='x'>", "<br>", "</br>", "<img src=x>", "</img>", "<script>", "</script>", "<pre>", "&#65;", "< p>",
+    ]
+    for _ in range(2000):
+        text = "".join(rng.choice(atoms) for _ in range(rng.randint(0, 12)))
+        assert remove_html(text, strategy="auto") == remove_html(text, strategy="bs4")
+
+
+def test_regex_strategy_strips_simple_markup():
+    assert remove_html("<p>tom &amp; jerry</p>", strategy="regex") == "tom & jerry"
+
+
+def test_unknown_strategy_raises():
+    with pytest.raises(ValueError):
+        remove_html("text", strategy="unknown")
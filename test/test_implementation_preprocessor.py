@@ -0,0 +1,67 @@
+import json
+import pandas as pd
+import src.data.implementation_preprocessor as implementation_preprocessor
+from src.data.preprocessing import TextPreprocessor
+from src.data.implementation_preprocessor import preprocess_dataframe
+from src.utils.config import config
+from src.utils.helpers import ParquetArtifactStore
+
+
+def _sample_df():
+    return pd.DataFrame({
+        "question": ["What is <b>HTML</b>?", "Where is Paris?", "Who wrote it?"] * 5,
+        "context": ["Paris is the capital of France.", "Visit http://x.org now!", "It was written in 1851."] * 5,
+    })
+
+
+def test_parallel_matches_serial():
+    processor = TextPreprocessor()
+    serial = preprocess_dataframe(_sample_df(), processor)
+    parallel = preprocess_dataframe(_sample_df(), processor, n_jobs=2, chunk_size=4)
+    pd.testing.assert_frame_equal(serial, parallel)
+
+
+def test_parallel_keeps_row_order():
+    words = ["apple", "banana", "cherry", "damson", "elder", "fig", "grape"]
+    df = pd.DataFrame({"text": [f"{w} {words[i % 7]}" for i, w in enumerate(words * 3)]})
+    out = preprocess_dataframe(df, TextPreprocessor(), n_jobs=2, chunk_size=3)
+    assert list(out["text_clean"]) == [TextPreprocessor().preprocess(t) for t in df["text"]]
+
+
+def test_parallel_merges_worker_token_cache():
+    processor = TextPreprocessor()
+    preprocess_dataframe(_sample_df(), processor, n_jobs=2, chunk_size=4)
+    stats = processor.token_cache.stats()
+    assert stats["size"] > 0
+    assert stats["hits"] + stats["misses"] > 0
+
+
+def test_deduplicated_matches_row_by_row():
+    processor = TextPreprocessor()
+    deduped = preprocess_dataframe(_sample_df(), processor)
+    full = preprocess_dataframe(_sample_df(), processor, deduplicate=False)
+    pd.testing.assert_frame_equal(deduped, full)
+
+
+def test_optimized_chunks_share_the_parquet_schema(tmp_path, monkeypatch):
+    # The second chunk has more labels than an int8 category code can index
+    records = [{"question": "Where is Paris?", "type": "factual"}] * 150
+    records += [{"question": f"Question {i}?", "type": f"label {i}"} for i in range(150)]
+    input_path = tmp_path / "train.json"
+    input_path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    monkeypatch.setattr(implementation_preprocessor, "INPUT_PATH", str(input_path))
+    monkeypatch.setattr(implementation_preprocessor, "TOKEN_CACHE_PATH", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(implementation_preprocessor, "CHUNK_ROWS", 150)
+    monkeypatch.setattr(implementation_preprocessor, "N_JOBS", 1)
+    (tmp_path / "processed").mkdir()
+    monkeypatch.setitem(config.paths, "processed_data", str(tmp_path / "processed"))
+    monkeypatch.setattr(config.storage, "format", "parquet")
+    monkeypatch.setattr(config.storage, "optimize_dtypes", True)
+
+    assert implementation_preprocessor.main() == 300
+    store = ParquetArtifactStore(str(tmp_path / "processed"))
+    df = store.read("train_clean")
+    assert store.read_metadata("train_clean") == {"preprocessing": TextPreprocessor().settings()}
+    assert isinstance(df["type_clean"].dtype, pd.CategoricalDtype)
+    assert df["type"].astype(str).tolist() == [record["type"] for record in records]
+    assert df["type_clean"].iloc[-1] == "label"
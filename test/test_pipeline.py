@@ -0,0 +1,97 @@
+import os
+import pytest
+from src.utils.pipeline import Stage, PipelineRunner, file_digests
+
+
+def _copy_stage(tmp_path, calls, params=None):
+    """Stage that upper-cases input.txt into output.txt and records its runs."""
+    source, target = str(tmp_path / "input.txt"), str(tmp_path / "output.txt")
+
+    def run(stage_run):
+        calls.append(stage_run)
+        with open(source, "rb") as f:
+            f.seek(stage_run.previous_bytes)
+            new = f.read().upper()
+        previous = b""
+        if stage_run.previous_dir is not None:
+            with open(os.path.join(stage_run.previous_dir, "output.txt"), "rb") as f:
+                previous = f.read()
+        with open(target, "wb") as f:
+            f.write(previous + new)
+
+    return Stage(name="upper", run=run, inputs=[source], appendable_input=source,
+                 outputs=[target], code=["src.utils.pipeline"], params=params or {})
+
+
+def test_unchanged_stage_is_skipped(tmp_path):
+    (tmp_path / "input.txt").write_text("a\n")
+    calls = []
+    runner = PipelineRunner([_copy_stage(tmp_path, calls)], cache_dir=str(tmp_path / "cache"))
+    first = runner.run()
+    second = runner.run()
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_changed_params_rerun_stage(tmp_path):
+    (tmp_path / "input.txt").write_text("a\n")
+    calls = []
+    cache = str(tmp_path / "cache")
+    PipelineRunner([_copy_stage(tmp_path, calls, {"x": 1})], cache_dir=cache).run()
+    PipelineRunner([_copy_stage(tmp_path, calls, {"x": 2})], cache_dir=cache).run()
+    assert len(calls) == 2
+    assert calls[1].previous_dir is None
+
+
+def test_appended_input_resumes_previous_run(tmp_path):
+    (tmp_path / "input.txt").write_text("a\n")
+    calls = []
+    runner = PipelineRunner([_copy_stage(tmp_path, calls)], cache_dir=str(tmp_path / "cache"))
+    runner.run()
+    with open(tmp_path / "input.txt", "a") as f:
+        f.write("b\n")
+    runner.run()
+    assert calls[1].previous_bytes == 2
+    assert (tmp_path / "output.txt").read_text() == "A\nB\n"
+
+
+def test_cached_outputs_are_restored(tmp_path):
+    (tmp_path / "input.txt").write_text("a\n")
+    calls = []
+    runner = PipelineRunner([_copy_stage(tmp_path, calls)], cache_dir=str(tmp_path / "cache"))
+    runner.run()
+    os.remove(tmp_path / "output.txt")
+    runner.run()
+    assert len(calls) == 1
+    assert (tmp_path / "output.txt").read_text() == "A\n"
+
+
+def test_unknown_dependency_raises(tmp_path):
+    stage = Stage(name="b", run=lambda run: None, outputs=[], depends_on=["a"])
+    with pytest.raises(ValueError):
+        PipelineRunner([stage], cache_dir=str(tmp_path))
+
+
+def test_file_digests_prefix(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"hello")
+    prefix = tmp_path / "prefix.bin"
+    prefix.write_bytes(b"he")
+    full, prefixes = file_digests(str(path), [2])
+    assert prefixes[2] == file_digests(str(prefix))[0]
+    assert full != prefixes[2]
+
+
+def test_runner_records_stage_telemetry(tmp_path):
+    (tmp_path / "input.txt").write_text("a\nb\n")
+    calls = []
+    stage = _copy_stage(tmp_path, calls)
+    run = stage.run
+    stage.run = lambda stage_run: run(stage_run) or 2
+    runner = PipelineRunner([stage], cache_dir=str(tmp_path / "cache"))
+    runner.run()
+    runner.run()
+    first, second = runner.report.stages
+    assert (first.status, first.rows, first.bytes_read, first.bytes_written) == ("ran", 2, 4, 4)
+    assert first.rss_peak_mb > 0
+    assert second.status == "cached"
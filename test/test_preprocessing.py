@@ -1,7 +1,9 @@
 import pytest
+import pandas as pd
 from src.data.preprocessing import (
-    clean_text, remove_special_characters, remove_html,
-    tokenize_text, remove_stopwords, lemmatize_tokens, TextPreprocessor
+    clean_text, clean_series, remove_special_characters, remove_html,
+    tokenize_text, remove_stopwords, lemmatize_tokens, stem_tokens,
+    TextPreprocessor, TokenCache
 )
 
 def test_clean_text_basic():
@@ -19,3 +21,45 @@ def test_pipeline():
     result = preprocessor.preprocess("This is a <b>TEST</b>!!!")
     assert isinstance(result, str)
     assert "test" in result
+
+def test_clean_series_matches_clean_text():
+    texts = [
+        "Hello <b>World!</b>", "Visit http://example.com or www.test.org today",
+        "Tom &amp; Jerry", "Plain   text\twith\nspaces", "", "Caf\u00e9 50% off!!",
+    ]
+    assert clean_series(pd.Series(texts)).tolist() == [clean_text(t) for t in texts]
+
+def test_preprocess_series_matches_preprocess():
+    preprocessor = TextPreprocessor()
+    texts = ["This is a <b>TEST</b>!!!", "Another simple sentence here."]
+    result = preprocessor.preprocess_series(pd.Series(texts))
+    assert result.tolist() == [preprocessor.preprocess(t) for t in texts]
+
+def test_stem_tokens():
+    assert stem_tokens(["running", "cats"]) == ["run", "cat"]
+
+def test_token_cache_counts_hits_and_evictions():
+    cache = TokenCache(maxsize=2, name="lemma")
+    for token in ["a", "b", "a", "c", "b"]:
+        cache.get(token, str.upper)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 4, 2)
+    assert len(cache) == 2
+
+def test_token_cache_save_and_load(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = TokenCache(maxsize=10, name="stem")
+    stem_tokens(["running", "jumps"], cache)
+    cache.save(path)
+    warmed = TokenCache(maxsize=10, name="stem")
+    warmed.load(path)
+    assert stem_tokens(["running"], warmed) == ["run"]
+    assert warmed.hits == 1
+    with pytest.raises(ValueError):
+        TokenCache(maxsize=10, name="lemma").load(path)
+
+def test_pipeline_with_stemming_uses_cache():
+    preprocessor = TextPreprocessor(use_stemming=True)
+    result = preprocessor.preprocess("Running runners running")
+    assert result.split()[0] == "run"
+    assert preprocessor.token_cache.hits > 0
@@ -0,0 +1,50 @@
+# Import the profiler and timer decorator to test
+import json
+from src.utils.profiling import Profiler, FunctionStats, profiler, enable_profiling, timer
+
+@timer
+def _square(x):
+    return x * x
+
+# Test that timed functions only record calls while profiling is enabled
+def test_timer_records_only_when_enabled():
+    profiler.reset()
+    enable_profiling(False)
+    assert _square(3) == 9
+    assert profiler.stats == {}
+    enable_profiling(True)
+    try:
+        for i in range(10):
+            _square(i)
+    finally:
+        enable_profiling(False)
+    stats = profiler.pop_stats()["_square"]
+    assert stats.count == 10
+    assert 0 < stats.max_ns <= stats.total_ns
+
+# Test the percentile estimates against known durations (1..1000 microseconds)
+def test_percentiles_are_approximate():
+    stats = FunctionStats()
+    for us in range(1, 1001):
+        stats.record(us * 1000)
+    summary = stats.summary()
+    assert summary["count"] == 1000
+    assert summary["max_s"] == 1e-3
+    for q in (50, 95, 99):
+        assert abs(summary[f"p{q}_s"] - q * 1e-5) <= 0.07 * q * 1e-5
+
+# Test merging stats from another process and saving the JSON report
+def test_merge_and_report(tmp_path):
+    worker = Profiler(enabled=True)
+    worker.record("f", 2000)
+    parent = Profiler(enabled=True)
+    parent.record("f", 1000)
+    parent.merge(worker.pop_stats())
+    assert worker.stats == {}
+    assert "f" in parent.format_table()
+    path = parent.report("profile", results_dir=str(tmp_path))
+    with open(path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["f"]["count"] == 2
+    assert summary["f"]["total_s"] == 3e-6
+    assert Profiler().report(results_dir=str(tmp_path)) is None
@@ -0,0 +1,48 @@
+import os
+import pytest
+from src.features.sparse_features import SparseFeatureBuilder
+from src.models.search import candidates, search
+
+SPACES = {"logistic_regression": {"C": [0.001, 0.1, 10.0]},
+          "random_forest": {"n_estimators": [10], "max_depth": [2]}}
+
+
+def _search(tmp_path, df, **kwargs):
+    return search(df, model_names=["logistic_regression", "random_forest"], spaces=SPACES,
+                  builder=SparseFeatureBuilder(params={"min_df": 1}, use_dense=False),
+                  cache_dir=str(tmp_path / "cache"), results_dir=str(tmp_path / "results"), **kwargs)
+
+
+def test_candidates_expand_the_search_spaces():
+    grid = candidates(["logistic_regression", "random_forest"], SPACES)
+    assert len(grid) == 4
+    assert grid[0] == {"model": "logistic_regression", "params": {"C": 0.001}}
+
+
+@pytest.fixture(scope="module")
+def search_frame(make_training_frame):
+    return make_training_frame(600)
+
+
+@pytest.fixture(scope="module")
+def serial_report(tmp_path_factory, search_frame):
+    return _search(tmp_path_factory.mktemp("search"), search_frame, n_jobs=1)
+
+
+def test_successive_halving_drops_weak_candidates(serial_report):
+    rounds = serial_report["rounds"]
+    assert [r["candidates"] for r in rounds] == [4, 2, 1]
+    assert rounds[0]["rows"] < rounds[1]["rows"] < rounds[2]["rows"]
+    assert len(serial_report["trials"]) == (4 + 2 + 1) * serial_report["folds"]
+    assert serial_report["best"]["mean_macro_f1"] > 0.9
+    # The weakest regularization setting (candidate 0) is dropped after the first round
+    assert 0 not in {t["candidate"] for t in serial_report["trials"] if t["round"] > 0}
+
+
+def test_fold_features_are_cached_and_parallel_matches_serial(tmp_path, search_frame, serial_report):
+    first = _search(tmp_path, search_frame, n_jobs=1)
+    assert not first["timings"]["features_cached"]
+    parallel = _search(tmp_path, search_frame, n_jobs=2)
+    assert parallel["timings"]["features_cached"]
+    assert parallel["final_round"] == first["final_round"] == serial_report["final_round"]
+    assert os.listdir(tmp_path / "results")
@@ -0,0 +1,55 @@
+import json
+import asyncio
+import pytest
+from src.models.predict import Predictor
+from src.models.serve import InferenceServer
+
+
+@pytest.fixture(scope="module")
+def predictor(trained_models_dir):
+    return Predictor.load(trained_models_dir)
+
+
+def test_predictor_applies_training_transforms(predictor, factual_record, reasoning_record):
+    results = predictor.predict([factual_record, reasoning_record])
+    assert [r["label"] for r in results] == ["factual", "reasoning"]
+    assert all(0.5 < r["confidence"] <= 1 for r in results)
+    assert predictor.stats.snapshot()["items"] >= 2
+    with pytest.raises(ValueError):
+        predictor.predict([{"question": 3}])
+
+
+async def _request(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def test_server_micro_batches_concurrent_requests(predictor, factual_record, reasoning_record):
+    async def scenario():
+        server = await InferenceServer(predictor, port=0, max_batch_size=32, max_wait_ms=50).start()
+        try:
+            responses = await asyncio.gather(
+                *(_request(server.port, "POST", "/predict", factual_record) for _ in range(20)),
+                _request(server.port, "POST", "/predict", {"instances": [reasoning_record, factual_record]}),
+            )
+            errors = [await _request(server.port, "GET", "/missing"),
+                      await _request(server.port, "POST", "/predict", {"question": ["not text"]})]
+            stats = await _request(server.port, "GET", "/stats")
+        finally:
+            await server.stop()
+        return responses, errors, stats
+
+    responses, errors, (_, stats) = asyncio.run(scenario())
+    assert all(status == 200 and body["label"] == "factual" for status, body in responses[:20])
+    assert [p["label"] for p in responses[20][1]["predictions"]] == ["reasoning", "factual"]
+    assert [status for status, _ in errors] == [404, 400]
+    assert stats["requests"]["count"] == 21 and stats["batches"]["items"] == 22
+    assert stats["batches"]["count"] < 21
+    assert stats["requests"]["p99_ms"] >= stats["requests"]["p50_ms"] > 0
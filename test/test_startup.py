@@ -0,0 +1,42 @@
+# Import standard libraries to run a fresh interpreter
+import os
+import subprocess
+import sys
+import json
+
+# Root of the repository, put on the PYTHONPATH of the child interpreter
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules that must only be imported when they are first used
+HEAVY_MODULES = ["nltk", "bs4", "matplotlib", "psutil"]
+# Time allowed for importing the project modules on top of numpy/pandas
+IMPORT_BUDGET_SECONDS = 0.5
+
+STARTUP_SCRIPT = """
+import json, sys, time
+import numpy, pandas
+start = time.perf_counter()
+import src.data.preprocessing
+import src.features.text_features
+import src.data.implementation_preprocessor
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+# Test the startup cost of the project modules
+# Imports them in a fresh interpreter and checks that the heavy
+# dependencies stay unloaded and the import fits in the time budget
+def test_import_is_lazy_and_fast():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    loaded = [name for name in HEAVY_MODULES if name in result["modules"]]
+    assert loaded == []
+    assert result["elapsed"] < IMPORT_BUDGET_SECONDS
+
+# Test that the lazily loaded NLTK resources are created once per process
+def test_nltk_resources_are_cached():
+    from src.data.preprocessing import get_lemmatizer, get_stemmer, get_stop_words
+    assert get_lemmatizer() is get_lemmatizer()
+    assert get_stemmer() is get_stemmer()
+    assert "the" in get_stop_words()
@@ -0,0 +1,40 @@
+# Import the telemetry helpers to test
+import json
+import pytest
+from src.utils.telemetry import MemorySampler, RunReport, stage_telemetry
+
+# Test that a stage is measured and added to the run report
+# Writes an output file inside the stage and reports 100 rows
+def test_stage_telemetry_measures_stage(tmp_path):
+    source, target = tmp_path / "in.txt", tmp_path / "out.txt"
+    source.write_text("x" * 10)
+    report = RunReport()
+    with stage_telemetry("copy", [str(source)], [str(target)], report, interval=0.01) as telemetry:
+        target.write_text("y" * 20)
+        telemetry.rows = 100
+    assert report.stages == [telemetry]
+    assert (telemetry.status, telemetry.bytes_read, telemetry.bytes_written) == ("ran", 10, 20)
+    assert telemetry.rows_per_sec > 0
+    assert telemetry.rss_peak_mb >= telemetry.rss_start_mb > 0
+
+# Test that a failing stage is still recorded and the error propagates
+def test_stage_telemetry_records_failures():
+    report = RunReport()
+    with pytest.raises(RuntimeError):
+        with stage_telemetry("broken", report=report):
+            raise RuntimeError("boom")
+    assert report.stages[0].status == "failed"
+
+# Test the memory sampler thread and saving a run report as JSON
+def test_sampler_and_report(tmp_path):
+    with MemorySampler(interval=0.01) as sampler:
+        data = bytearray(20 * 1024 * 1024)
+    assert sampler.peak_mb > 20
+    del data
+    report = RunReport()
+    with stage_telemetry("noop", report=report):
+        pass
+    with open(report.save("run_report", results_dir=str(tmp_path)), "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert [stage["name"] for stage in saved["stages"]] == ["noop"]
+    assert saved["peak_rss_mb"] > 0
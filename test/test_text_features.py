@@ -1,6 +1,7 @@
 import pytest
 from src.features.text_features import (
-    char_count, word_count, avg_word_length, TextFeatureExtractor
+    char_count, word_count, avg_word_length, TextFeatureExtractor,
+    extract_feature_matrix, feature_names
 )
 import pandas as pd
 
@@ -19,3 +20,29 @@ def test_transform_pipeline():
     df_out = extractor.transform(df, "text")
     assert "word_count" in df_out.columns
     assert df_out.shape[1] > 1
+
+def test_fused_and_vectorized_match_apply():
+    texts = pd.Series(["Hello world! How are you?", "", "UPPER lower 123 ...", "tab\tand  spaces"])
+    extractor = TextFeatureExtractor()
+    expected = extractor.compute(texts, mode="apply")
+    assert (extractor.compute(texts, mode="fused") == expected).all()
+    assert (extractor.compute(texts, mode="vectorized") == expected).all()
+
+def test_compute_returns_feature_matrix():
+    extractor = TextFeatureExtractor()
+    values = extractor.compute(pd.Series(["abc", "de"]))
+    assert values.shape == (2, len(extractor.features))
+    assert list(values[:, 0]) == [3, 2]
+
+def test_extract_feature_matrix_parallel_matches_serial():
+    df = pd.DataFrame({
+        "a": ["Hello world!", "Second text here.", "x"] * 4,
+        "b": ["Another one.", "", "Third, fourth; fifth."] * 4,
+    })
+    extractor = TextFeatureExtractor()
+    serial = extract_feature_matrix(df, ["a", "b"], extractor, job_rows=5)
+    parallel = extract_feature_matrix(df, ["a", "b"], extractor, n_jobs=2, job_rows=5)
+    assert serial.dtype == "float32"
+    assert serial.shape == (12, len(feature_names(extractor, ["a", "b"])))
+    assert (serial == parallel).all()
+    assert (serial[:, :7] == extractor.compute(df["a"]).astype("float32")).all()
@@ -0,0 +1,42 @@
+import pytest
+from src.data.tokenizers import TOKENIZERS, Tokenizer, get_tokenizer, register_tokenizer
+
+
+def test_registry_contains_backends():
+    assert {"nltk", "regex", "whitespace"} <= set(TOKENIZERS)
+
+
+def test_fast_backends_match_nltk_on_clean_text():
+    text = "paris is the capital and most populous city of france"
+    expected = get_tokenizer("nltk").words(text)
+    assert get_tokenizer("whitespace").words(text) == expected
+    assert get_tokenizer("regex").words(text) == expected
+
+
+def test_regex_words_and_sentences():
+    tokenizer = get_tokenizer("regex")
+    assert tokenizer.words("Hello, world!") == ["Hello", ",", "world", "!"]
+    assert tokenizer.sentences("One. Two? Three") == ["One.", "Two?", "Three"]
+    assert tokenizer.counts("One. Two?") == (4, 2)
+
+
+def test_nltk_counts_match_words_and_sentences():
+    tokenizer = get_tokenizer("nltk")
+    text = "Hello world. This is a test!"
+    assert tokenizer.counts(text) == (len(tokenizer.words(text)), len(tokenizer.sentences(text)))
+
+
+def test_unknown_tokenizer_raises():
+    with pytest.raises(ValueError):
+        get_tokenizer("unknown")
+
+
+def test_incomplete_backend_fails_when_instantiated(monkeypatch):
+    monkeypatch.setattr("src.data.tokenizers.TOKENIZERS", dict(TOKENIZERS))
+
+    @register_tokenizer("incomplete")
+    class IncompleteTokenizer(Tokenizer):
+        pass
+
+    with pytest.raises(TypeError):
+        get_tokenizer("incomplete")
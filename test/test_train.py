@@ -0,0 +1,42 @@
+import os
+import numpy as np
+import scipy.sparse as sp
+from src.features.sparse_features import SparseFeatureBuilder
+from src.models.train import assign_splits, build_model, train
+
+
+def test_assign_splits_is_deterministic_and_proportional(make_training_frame):
+    df = make_training_frame(5000)
+    splits = assign_splits(df)
+    assert (splits == assign_splits(df.iloc[::-1])[::-1]).all()
+    assert 0.17 < (splits == "test").mean() < 0.23
+    assert 0.08 < (splits == "validation").mean() < 0.12
+
+
+def test_builder_output_is_csr(make_training_frame):
+    df = make_training_frame()
+    for kind in ("tfidf", "hashing"):
+        builder = SparseFeatureBuilder(kind=kind, params={"min_df": 1} if kind == "tfidf" else None)
+        X = builder.fit_transform(df)
+        assert sp.isspmatrix_csr(X) and X.dtype == np.float32
+        assert X.shape == (len(df), builder.n_features)
+        assert (builder.transform(df.head(5)) != X[:5]).nnz == 0
+
+
+def test_build_model_drops_multi_class_and_sets_n_jobs():
+    model = build_model("random_forest", n_jobs=2)
+    assert model.n_jobs == 2
+    assert "multi_class" not in build_model("logistic_regression").get_params()
+
+
+def test_train_saves_models_and_reports_stats(tmp_path, make_training_frame):
+    df = make_training_frame()
+    builder = SparseFeatureBuilder(params={"min_df": 1})
+    report = train(df, model_names=["logistic_regression"], builder=builder, n_jobs=1,
+                   models_dir=str(tmp_path))
+    stats = report["models"]["logistic_regression"]
+    assert stats["fit_seconds"] > 0 and stats["peak_rss_mb"] > 0
+    assert stats["accuracy"] > 0.9
+    assert report["labels"] == ["factual", "reasoning"]
+    for name in ("logistic_regression.joblib", "feature_builder.joblib", "metadata.json"):
+        assert os.path.isfile(tmp_path / name)
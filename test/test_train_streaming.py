@@ -0,0 +1,53 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from src.features.sparse_features import SparseFeatureBuilder, StreamingFeaturizer
+from src.models.train import train
+from src.models.train_streaming import CHECKPOINT_FILE, StreamingTrainer, rechunk
+from src.utils.config import StorageConfig
+from src.utils.helpers import ParquetArtifactStore
+
+
+def _store(tmp_path, df):
+    store = ParquetArtifactStore(str(tmp_path), StorageConfig(format="parquet", row_group_size=70))
+    store.write(df, "train_no_nulls")
+    return store
+
+
+def _trainer(store, models_dir, **kwargs):
+    featurizer = StreamingFeaturizer(params={"n_features": 2 ** 10}, use_dense=False)
+    return StreamingTrainer(store, featurizer=featurizer, chunk_rows=50, epochs=2,
+                            checkpoint_every=2, models_dir=str(models_dir), **kwargs)
+
+
+def test_rechunk_yields_exact_sizes():
+    chunks = [pd.DataFrame({"a": range(n)}) for n in (3, 7, 1, 4)]
+    assert [len(c) for c in rechunk(chunks, 5)] == [5, 5, 5]
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path, make_training_frame):
+    store = _store(tmp_path, make_training_frame())
+    full = _trainer(store, tmp_path / "full").run()
+    assert full["done"] and full["accuracy"] > 0.9
+
+    interrupted = _trainer(store, tmp_path / "resumed").run(max_chunks=3)
+    assert not interrupted["done"]
+    assert os.path.isfile(tmp_path / "resumed" / CHECKPOINT_FILE)
+    resumed = _trainer(store, tmp_path / "resumed").run()
+    assert resumed["done"] and resumed["rows_trained"] == full["rows_trained"]
+    assert not os.path.isfile(tmp_path / "resumed" / CHECKPOINT_FILE)
+
+    a = joblib.load(tmp_path / "full" / "sgd_classifier.joblib")
+    b = joblib.load(tmp_path / "resumed" / "sgd_classifier.joblib")
+    np.testing.assert_allclose(a.coef_, b.coef_)
+
+
+def test_labels_match_batch_trainer_and_naive_bayes_works(tmp_path, make_training_frame):
+    df = make_training_frame()
+    store = _store(tmp_path, df)
+    batch = train(df, model_names=["logistic_regression"], n_jobs=1, models_dir=str(tmp_path / "batch"),
+                  builder=SparseFeatureBuilder(params={"min_df": 1}, use_dense=False))
+    report = _trainer(store, tmp_path / "nb", model_name="multinomial_nb").run()
+    assert report["labels"] == batch["labels"]
+    assert report["accuracy"] > 0.9